@@ -8,6 +8,12 @@ import json
 import pathlib
 import shlex
 
+# The dedupe engine is shared with src/py/pathutil.py and insert-path.py.
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, "src", "py")
+)
+from pathdedupe import LEVELS, DedupeResult, Level, Merge, dedupe_paths, path_key
+
 
 class PathValue:
     def __init__(self, items: list[str] | str, pathsep: str = os.pathsep):
@@ -97,27 +103,16 @@ class PathUtil:
     def __lst__(self):
         return self.__path.lst
 
-    def find_duplicates(self) -> list[str]:
-        fresh: set[str] = set()
-        duplicates = []
-        for item in self:
-            if item in fresh:
-                if item not in duplicates:
-                    duplicates.append(item)
-            else:
-                fresh.add(item)
-        return duplicates
-
-    def __remove_duplicates(self) -> list[str]:
-        fresh: list[str] = []
-        for item in self:
-            if item not in fresh:
-                fresh.append(item)
-        return fresh
+    def find_duplicates(self, level: Level = "lexical") -> list[str]:
+        return self.__remove_duplicates(level).duplicates
+
+    def __remove_duplicates(self, level: Level = "lexical") -> DedupeResult:
+        return dedupe_paths(self, level=level)
 
-    def remove_duplicates(self) -> None:
-        fresh = self.__remove_duplicates()
-        self.__register_change("remove_duplicates", fresh)
+    def remove_duplicates(self, level: Level = "lexical") -> list[Merge]:
+        result = self.__remove_duplicates(level)
+        self.__register_change("remove_duplicates", result.paths)
+        return result.merged
 
     def __find_invalid(self) -> list[str]:
         invalid: set[str] = set()
@@ -131,12 +126,18 @@ class PathUtil:
         new_path = [item for item in self if item not in invalid_items]
         self.__register_change("remove_invalid", new_path)
 
-    def ensure_sys_path_order(self) -> None:
-        new_path = [p for p in self if p not in self.__sys_path]
-        other_sys_paths = [p for p in new_path if p.startswith("/usr")]
-        new_path = [p for p in new_path if p not in other_sys_paths]
+    def ensure_sys_path_order(self, level: Level = "lexical") -> None:
+        sys_keys = {path_key(p, level) for p in self.__sys_path}
+        new_path: list[str] = []
+        other_sys_paths: list[str] = []
+        for p in self:
+            if path_key(p, level) in sys_keys:
+                continue
+            (other_sys_paths if p.startswith("/usr") else new_path).append(p)
         new_path.extend(other_sys_paths)
         new_path.extend(self.__sys_path)
+        # /bin and /usr/bin collapse into one entry above the lexical level
+        new_path = dedupe_paths(new_path, level=level).paths
         self.__register_change("ensure_sys_path_order", new_path)
 
     def revert_change(self, steps: int = 1) -> None:
@@ -202,15 +203,30 @@ parser.add_argument(
     action="store_true",
     help="Output as JSON",
 )
+# dedupe
+parser.add_argument(
+    "--level",
+    choices=LEVELS,
+    help="How entries are compared for duplicates",
+    default="lexical",
+)
+parser.add_argument(
+    "--report",
+    action="store_true",
+    help="Report merged duplicate entries on stderr",
+)
 
 if __name__ == "__main__":
         
     args = parser.parse_args()
 
     p = PathUtil(args.path)
-    p.remove_duplicates()
+    merged = p.remove_duplicates(args.level)
+    if args.report:
+        for merge in merged:
+            print(f"merged: {merge}", file=sys.stderr)
     p.remove_invalid()
-    p.ensure_sys_path_order()
+    p.ensure_sys_path_order(args.level)
     if args.json:
         if args.output:
             p.to_json(args.output)
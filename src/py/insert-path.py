@@ -14,6 +14,7 @@ Optional Arguments:
     --diff          Show the difference between the old PATH and the new PATH using a diff command.
     -l, --list      Output the result as a list of paths (one path per line).
     -j, --json      Output the result as a JSON formatted string.
+    --level         How PATH entries are compared for duplicates: lexical (default), realpath or inode.
 
 Description:
     The script performs the following steps:
@@ -21,7 +22,7 @@ Description:
       2. Validates that the provided directory exists.
       3. Converts the directory path to its absolute form.
       4. Splits the given PATH into individual directory components using the OS-specific separator.
-      5. Removes any duplicates of the directory from the PATH.
+      5. Removes any duplicates of the directory, and of every other entry, from the PATH.
       6. Inserts the directory at the specified index within the PATH components.
       7. Formats the updated PATH based on the chosen output format (shellscript, json, or list).
       8. If requested (--diff), displays a diff between the original and new PATH values.
@@ -45,6 +46,8 @@ from os import pathsep as psep
 from typing import Literal
 import copy
 
+from pathdedupe import LEVELS, dedupe_paths
+
 
 def format_path(path: str, fmt: Literal["shellscript", "json", "list"]) -> str:
     """
@@ -126,6 +129,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         default=False,
     )
+    parser.add_argument(
+        "--level",
+        help="How PATH entries are compared for duplicates",
+        choices=LEVELS,
+        default="lexical",
+    )
     return parser.parse_args()
 
 
@@ -150,7 +159,7 @@ def main() -> Literal[0, 1]:
         1. Parse command-line arguments.
         2. Validate that a directory (to be inserted) is provided; otherwise, print an error and exit.
         3. Normalize and resolve the absolute path of the directory.
-        4. Create a list of existing paths from the current PATH environment variable, excluding any instance of the directory.
+        4. Create a list of unique, existing paths from the current PATH environment variable, excluding any instance of the directory.
         5. Ensure the provided index is within the valid range of the paths list.
         6. Insert the directory at the provided index.
         7. Format both the original and updated PATH values according to the specified output format (shellscript, json, or list).
@@ -171,7 +180,8 @@ def main() -> Literal[0, 1]:
 
         path_original = copy.deepcopy(args.PATH)
         # list of paths in PATH. Remove dir to insert if it exists, so can be reinserted at index i
-        paths = [absp(p) for p in args.PATH.split(psep) if absp(p) != _dir and isdir(p)]
+        existing = (absp(p) for p in args.PATH.split(psep) if isdir(p))
+        paths = dedupe_paths(existing, level=args.level, exclude=[_dir]).paths
         # assert args.i <= len(paths) and args.i >= 0, f"Index {args.i} out of range"
         try:
             rng = ['foo' for _ in range(args.i)]
@@ -0,0 +1,134 @@
+"""
+Order-preserving dedupe of PATH-like directory lists.
+
+Shared by pathutil.py, insert-path.py and bin/path-util.py. Entries are
+compared by a canonical key rather than by their text, and every entry is
+looked up in a dict keyed on that, so a list with thousands of entries is
+deduped in a single linear pass. Only the standard library may be imported
+here, since bin/path-util.py and insert-path.py have no other dependencies.
+
+Canonicalization levels:
+    lexical: `~` expanded, made absolute and normalized, so `/usr/bin/`,
+        `/usr//bin` and `/usr/./bin` are one entry. No filesystem access.
+    realpath: symlinks resolved as well, so `/bin` and `/usr/bin` are one
+        entry on a merged-usr system.
+    inode: the (device, inode) pair of the directory, which also catches
+        bind mounts and hard-to-resolve aliases. Entries that can't be
+        stat'ed fall back to their realpath.
+"""
+
+import os
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Literal
+
+Level = Literal["lexical", "realpath", "inode"]
+
+LEVELS: tuple[str, ...] = ("lexical", "realpath", "inode")
+
+
+@dataclass(frozen=True)
+class Merge:
+    """An entry dropped because an earlier entry has the same canonical key."""
+
+    path: str
+    kept: str
+    index: int
+
+    def __str__(self) -> str:
+        return f"{self.path} (#{self.index}) merged into {self.kept}"
+
+
+@dataclass
+class DedupeResult:
+    """The deduped entries, in their original order, and what was dropped."""
+
+    paths: list[str] = field(default_factory=list)
+    merged: list[Merge] = field(default_factory=list)
+
+    @property
+    def duplicates(self) -> list[str]:
+        """Kept entries that had at least one duplicate, in order of first merge."""
+        return list(dict.fromkeys(m.kept for m in self.merged))
+
+
+def lexical_path(path: str) -> str:
+    """
+    Canonicalize a path without touching the filesystem.
+
+    Args:
+        path (str): The PATH entry. An empty entry means the current directory.
+
+    Returns:
+        str: The absolute, normalized path with `~` expanded.
+    """
+    return os.path.abspath(os.path.expanduser(path or os.curdir))
+
+
+def path_key(path: str, level: Level = "lexical") -> Hashable:
+    """
+    Compute the key two PATH entries must share to be considered duplicates.
+
+    Args:
+        path (str): The PATH entry.
+        level (Level): The canonicalization level. Defaults to "lexical".
+
+    Returns:
+        Hashable: The canonical key.
+
+    Raises:
+        ValueError: If `level` is not one of `LEVELS`.
+    """
+    lexical = lexical_path(path)
+    if level == "lexical":
+        return lexical
+    if level == "realpath":
+        return os.path.realpath(lexical)
+    if level == "inode":
+        try:
+            st = os.stat(lexical)
+        except (OSError, ValueError):
+            return os.path.realpath(lexical)
+        return (st.st_dev, st.st_ino)
+    raise ValueError(f"Invalid level: '{level}'. Must be one of {', '.join(LEVELS)}.")
+
+
+def dedupe_paths(
+    paths: Iterable[str],
+    level: Level = "lexical",
+    exclude: Iterable[str] = (),
+) -> DedupeResult:
+    """
+    Drop repeated entries from a PATH-like list, keeping the first occurrence.
+
+    Keys are computed once per distinct entry, so repeated text costs a dict
+    lookup rather than another round of stat/readlink calls.
+
+    Args:
+        paths (Iterable[str]): The entries, in PATH order.
+        level (Level): The canonicalization level. Defaults to "lexical".
+        exclude (Iterable[str]): Entries to drop entirely, compared at the same
+            level (e.g. a directory about to be re-inserted elsewhere).
+
+    Returns:
+        DedupeResult: The kept entries, unchanged, and the merges made.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Invalid level: '{level}'. Must be one of {', '.join(LEVELS)}.")
+    keys: dict[str, Hashable] = {}
+    excluded = {path_key(p, level) for p in exclude}
+    seen: dict[Hashable, str] = {}
+    result = DedupeResult()
+    for i, p in enumerate(paths):
+        key = keys.get(p)
+        if key is None:
+            key = keys[p] = path_key(p, level)
+        if key in excluded:
+            continue
+        kept = seen.get(key)
+        if kept is None:
+            seen[key] = p
+            result.paths.append(p)
+        else:
+            result.merged.append(Merge(path=p, kept=kept, index=i))
+    return result
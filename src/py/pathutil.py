@@ -12,6 +12,8 @@ import logging
 import yaml
 import toml
 
+from pathdedupe import Level, dedupe_paths
+
 
 app = typer.Typer(
     name="pathutil",
@@ -29,6 +31,12 @@ class Format(StrEnum):
     toml: str = "toml"
 
 
+class DedupeLevel(StrEnum):
+    lexical = "lexical"
+    realpath = "realpath"
+    inode = "inode"
+
+
 def clean_path(
     path: str | Path,
     must_exist: bool = False,
@@ -58,26 +66,34 @@ def clean_path(
     return str(p)
 
 
-def get_paths(path: str | Path | List[str | Path], must_exist: bool = False, abs_path: bool = True, resolve: bool = False) -> list[str]:
+def get_paths(
+    path: str | Path | List[str | Path],
+    must_exist: bool = False,
+    abs_path: bool = True,
+    resolve: bool = False,
+    level: Level = "lexical",
+) -> list[str]:
     """
-    Get a list of paths.
+    Get a list of unique paths.
 
     Args:
         path (str | Path | List[str | Path]): Path or list of paths.
         must_exist (bool, optional): Check if the path exists. Defaults to False.
         abs_path (bool, optional): Return the absolute path. Defaults to True.
         resolve (bool, optional): Resolve the path. Defaults to False.
+        level (Level, optional): How paths are canonicalized when looking for
+            duplicates; see `pathdedupe`. Defaults to "lexical".
 
     Returns:
-        List[str]: List of paths.
+        List[str]: List of paths, first occurrences only.
     """
     if isinstance(path, (str, Path)):
         path = [path]
-    paths: list[str] = []
-    for p in path:
-        p: str | None = clean_path(path=p, must_exist=must_exist, abs_path=abs_path, resolve=resolve)
-        if p and p not in paths:
-            paths.append(p)
+    cleaned = (
+        clean_path(path=p, must_exist=must_exist, abs_path=abs_path, resolve=resolve)
+        for p in path
+    )
+    return dedupe_paths((p for p in cleaned if p), level=level).paths
 
 
 def format_paths(
@@ -133,6 +149,24 @@ def clean(
             case_sensitive=False,
         ),
     ] = Format.path,
+    level: Annotated[
+        DedupeLevel,
+        typer.Option(
+            "-l",
+            "--level",
+            help="How entries are compared for duplicates: lexical (~, trailing slashes, '.'), realpath (symlinks, e.g. /bin -> /usr/bin) or inode",
+            show_default=True,
+            case_sensitive=False,
+        ),
+    ] = DedupeLevel.lexical,
+    report: Annotated[
+        bool,
+        typer.Option(
+            "-r",
+            "--report",
+            help="Report merged duplicate entries on stderr",
+        ),
+    ] = False,
 ) -> None:
     """
     Process the PATH.
@@ -140,13 +174,17 @@ def clean(
     Args:
         path (Annotated[str, typer.Argument, optional): _description_. Defaults to " to process", envvar="PATH", metavar="PATH", show_envvar=True)]=os.getenv("PATH").
         fmt (Annotated[Format, typer.Option, optional): _description_. Defaults to "Output format", default=Format.path, show_default=True, case_sensitive=False)]=Format.path.
+        level (Annotated[DedupeLevel, typer.Option]): Canonicalization level used to find duplicates.
+        report (Annotated[bool, typer.Option]): Report merged duplicate entries on stderr.
     """
     paths: List[str] = path.split(os.pathsep)
-    new_paths: List[str] = []
-    for p in paths:
-        p = clean_path(path=p, must_exist=True, abs_path=True)
-        if p and p not in new_paths:
-            new_paths.append(p)
+    # Dedupe the raw entries so the report refers to them as given.
+    result = dedupe_paths(paths, level=str(level))
+    cleaned = (clean_path(path=p, must_exist=True, abs_path=True) for p in result.paths)
+    new_paths: List[str] = [p for p in cleaned if p]
+    if report:
+        for merge in result.merged:
+            typer.echo(f"merged: {merge}", err=True)
 
     formatted_paths = format_paths(paths=new_paths, fmt=fmt)
     typer.echo(formatted_paths)
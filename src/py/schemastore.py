@@ -1,30 +1,61 @@
 #!/home/tim/.local/share/micromamba/envs/py-default-313/bin/python
 
+import fnmatch
 import functools
+import gzip
 import hashlib
+import io
+import itertools
 import json
+import marshal
+import os
+import re
+import shutil
+import sqlite3
+import struct
+import sys
+import textwrap
+import threading
 import time
+import warnings
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass, field
 from enum import StrEnum
 from pathlib import Path
-from typing import Any, Optional, cast, Type, TypeAlias
-import re
+from typing import TYPE_CHECKING, Annotated, Any, TypeAlias, cast
+from urllib.parse import urlsplit
+
 import click
 import platformdirs
 import requests
 import typer
 import yaml
 from click import Option
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from rich.console import Console
+from rich.progress import Progress
 from rich.syntax import Syntax
 from rich.table import Table
-from thefuzz import fuzz
-from typing import Annotated
+from schemastore_complete import NAMES_INDEX_FILENAME, complete_names, write_names_index
+from thefuzz import fuzz, process
+
+if TYPE_CHECKING:
+    from schemastore_bundle import Bundle
+    from schemastore_lock import Lockfile
 
-CATALOG_URL: str = "https://www.schemastore.org/api/json/catalog.json"
+if __name__ == "__main__":
+    # The modules split out of this one (schemastore_server.py and the like)
+    # import it by name; give them this instance rather than a second copy.
+    sys.modules.setdefault("schemastore", sys.modules[__name__])
+
+CATALOG_URL: str = os.environ.get(
+    "SCHEMASTORE_CATALOG_URL", "https://www.schemastore.org/api/json/catalog.json"
+)
 
 
-SchemaStoreRecord: TypeAlias = dict[str, str | None | list[str] | dict[str, str]]
+SchemaStoreRecord: TypeAlias = dict[str, str | list[str] | dict[str, str] | None]
 
 
 def get_cache_dir() -> Path:
@@ -34,11 +65,130 @@ def get_cache_dir() -> Path:
     Returns:
         Path: The cache directory.
     """
-    cache_dir = platformdirs.user_cache_dir("schemastore")
+    cache_dir = os.environ.get("SCHEMASTORE_CACHE_DIR") or platformdirs.user_cache_dir(
+        "schemastore"
+    )
     Path(cache_dir).mkdir(parents=True, exist_ok=True)
     return Path(cache_dir)
 
 
+@dataclass
+class Stats:
+    """
+    Cache counters and per-phase wall times collected by this process.
+
+    Counters:
+        hit: cached copy within max_age, used without a request.
+        miss: no cached copy, downloaded.
+        stale: cached copy past max_age, so a request was made.
+        revalidated: stale copy confirmed unchanged by a 304.
+        stale_while_revalidate: stale copy served while refreshed in the background.
+        refresh_spawned: background refreshers started.
+        stale_if_error: stale copy served because the request failed.
+        snapshot_hit: parsed content loaded from a binary snapshot.
+        contents_indexed: schemas (re)parsed into the contents index.
+        coalesced: calls that waited on an identical call in flight, in this
+            process or another one.
+        evicted: cache files removed by `prune_cache`.
+        validator_hit: generated validator loaded from the cache.
+        bundled_hit: bundled schema read back from the cache.
+        lock_hit: schema pinned by the lockfile served after checking its hash.
+        bytes_downloaded, bytes_read, bytes_written: payload sizes.
+
+    hit, miss, stale, stale_while_revalidate and coalesced are counted per
+    document through `lookup`: once for its first lookup in the process, and
+    afterwards only when a lookup makes a request. Helpers that read the same
+    schema again (prefetch, digests, validator builds) don't inflate them.
+
+    Phases are keyed by name (`http`, `lock_wait`, `json_load`, `snapshot_load`,
+    `json_save`, `catalog`, `index`, `contents_index`, `validator_load`,
+    `validator_compile`, `serialize`, `render`) and hold a call count and
+    total seconds.
+    """
+
+    counters: dict[str, int] = field(default_factory=dict)
+    phases: dict[str, list[float]] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _looked_up: set[str] = field(default_factory=set, repr=False)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def lookup(self, url: str, outcome: str) -> None:
+        """
+        Count the outcome of a cache lookup of `url`, unless the document was
+        already looked up in this process and this lookup made no request.
+        """
+        with self._lock:
+            if url in self._looked_up and outcome not in ("miss", "stale"):
+                return
+            self._looked_up.add(url)
+            self.counters[outcome] = self.counters.get(outcome, 0) + 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                calls_seconds = self.phases.setdefault(name, [0, 0.0])
+                calls_seconds[0] += 1
+                calls_seconds[1] += elapsed
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.phases.clear()
+            self._looked_up.clear()
+            self.started = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "wall_seconds": round(time.perf_counter() - self.started, 6),
+                "counters": dict(self.counters),
+                "phases": {
+                    name: {"calls": int(calls), "seconds": round(seconds, 6)}
+                    for name, (calls, seconds) in self.phases.items()
+                },
+            }
+
+
+_stats = Stats()
+
+
+def get_stats() -> Stats:
+    """
+    Get the counters and timings collected so far in this process.
+
+    Work done in `validate_files` worker processes is not included.
+
+    Returns:
+        Stats: The process-wide statistics.
+    """
+    return _stats
+
+
+def _timed(phase: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorate a function so its calls are recorded under `phase`.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _stats.phase(phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 @functools.lru_cache
 def download_json(
     url: str,
@@ -55,28 +205,197 @@ def download_json(
     Returns:
         dict: The JSON data.
     """
-    with requests.get(
+    with _stats.phase("http"), requests.get(
         url, allow_redirects=allow_redirects, timeout=timeout, headers=headers
     ) as r:
         r.raise_for_status()
+        _stats.count("bytes_downloaded", len(r.content))
         return r.json()
 
 
-def _save_json(data: dict, path: Path):
+# Indentation of JSON files written to the cache. It matches the CLI's
+# default output, so that output is copied straight from the file.
+CACHE_INDENT: int = 2
+
+# Schemas are cached gzip-compressed. Readers detect the gzip header, so
+# uncompressed files (older caches, the catalog) stay readable.
+GZIP_MAGIC: bytes = b"\x1f\x8b"
+COMPRESS_LEVEL: int = 6
+
+
+def _temp_path(path: Path) -> Path:
+    """
+    A temporary file next to `path`, unique to this process and thread.
+    """
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+@contextmanager
+def _atomic_open(path: Path, mode: str = "w") -> Iterator[Any]:
+    """
+    Open a temporary file that replaces `path` when the block completes, so
+    readers see either the old or the new content, never a partial file.
+    """
+    tmp_file = _temp_path(path)
+    try:
+        with open(tmp_file, mode) as f:
+            yield f
+        os.replace(tmp_file, path)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+
+def _save_json(data: dict, path: Path, compress: bool = False):
     """
-    Save a dictionary to a JSON file.
+    Save a dictionary to a JSON file, atomically.
 
     Args:
         data (dict): The dictionary to save.
         path (Path): The path to save the JSON file.
+        compress (bool): Write gzip-compressed JSON.
+    """
+    with _stats.phase("json_save"):
+        if compress:
+            raw = json.dumps(data, indent=CACHE_INDENT).encode()
+            with _atomic_open(path, "wb") as f:
+                f.write(gzip.compress(raw, COMPRESS_LEVEL, mtime=0))
+                _stats.count("bytes_written", f.tell())
+            return
+        with _atomic_open(path) as f:
+            json.dump(data, f, indent=CACHE_INDENT)
+            _stats.count("bytes_written", f.tell())
+
+
+def _is_compressed(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) == GZIP_MAGIC
+    except OSError:
+        return False
+
+
+def _open_cached(path: Path) -> Any:
+    """
+    Open a cache file for binary reading, decompressing it if needed.
+    """
+    if _is_compressed(path):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _read_cache_bytes(source: Path | bytes) -> bytes:
+    """
+    Get the JSON bytes of a cache file (or of content read from one).
+    """
+    data = source if isinstance(source, bytes) else source.read_bytes()
+    return gzip.decompress(data) if data[:2] == GZIP_MAGIC else data
+
+
+def _source_indent(source: Path | bytes) -> int | None:
+    """
+    Get the layout of a cached JSON document: CACHE_INDENT, or None if minified.
     """
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    if isinstance(source, bytes):
+        head = _read_cache_bytes(source)[:2]
+    else:
+        with _open_cached(source) as f:
+            head = f.read(2)
+    return CACHE_INDENT if head[1:2] == b"\n" else None
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on `<path>.lock`.
+
+    Locking is skipped where fcntl is unavailable (Windows).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path.with_name(f"{path.name}.lock"), "a") as f:
+        with _stats.phase("lock_wait"):
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@_timed("render")
+def _copy_to_stdout(source: Path | bytes) -> None:
+    """
+    Write a cache file (or bytes) to stdout, with sendfile where the platform
+    allows. Compressed content is decompressed on the way.
+
+    Args:
+        source (Path | bytes): The file or content.
+    """
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    out.flush()
+    if isinstance(source, bytes):
+        out.write(_read_cache_bytes(source))
+        out.flush()
+        return
+    if _is_compressed(source):
+        with gzip.open(source, "rb") as f:
+            shutil.copyfileobj(f, out)
+        out.flush()
+        return
+    with open(source, "rb") as f:
+        offset = 0
+        try:
+            fd = out.fileno()
+            size = os.fstat(f.fileno()).st_size
+            while offset < size:
+                sent = os.sendfile(fd, f.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            f.seek(offset)
+            shutil.copyfileobj(f, out)
+            out.flush()
+
+
+def _copy_file(source: Path | bytes, dest: Path) -> None:
+    """
+    Copy a cache file (or bytes) to `dest`, with copy_file_range where the
+    platform allows. Compressed content is decompressed on the way.
+
+    Args:
+        source (Path | bytes): The file or content.
+        dest (Path): The destination file.
+    """
+    if isinstance(source, bytes):
+        dest.write_bytes(_read_cache_bytes(source))
+        return
+    if _is_compressed(source):
+        with gzip.open(source, "rb") as fin, open(dest, "wb") as fout:
+            shutil.copyfileobj(fin, fout)
+        return
+    with open(source, "rb") as fin, open(dest, "wb") as fout:
+        size = os.fstat(fin.fileno()).st_size
+        copied = 0
+        try:
+            while copied < size:
+                n = os.copy_file_range(fin.fileno(), fout.fileno(), size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except (AttributeError, OSError):
+            fin.seek(copied)
+            fout.seek(copied)
+            shutil.copyfileobj(fin, fout)
 
 
 def _load_json(path: Path) -> dict:
     """
-    Load a JSON file into a dictionary.
+    Load a JSON file into a dictionary, decompressing it if needed.
 
     Args:
         path (Path): The path to the JSON file.
@@ -84,546 +403,3832 @@ def _load_json(path: Path) -> dict:
     Returns:
         dict: The dictionary.
     """
-    with open(path) as f:
+    with _stats.phase("json_load"), _open_cached(path) as f:
+        _stats.count("bytes_read", os.fstat(f.fileno()).st_size)
         return json.load(f)
 
 
-def _ensure_catalog(catalog_cache_file: str | Path | None = None) -> None:
-    """
-    Ensure the catalog is downloaded and up to date.
-    """
-    if not catalog_cache_file:
-        cache_dir = get_cache_dir()
-        catalog_cache_file = cache_dir / "catalog.json"
-    else:
-        catalog_cache_file = Path(catalog_cache_file).absolute()
+# Cache files at least this large are loaded through a marshal snapshot of
+# their parsed content; below it json.load is as fast as reading the snapshot.
+SNAPSHOT_MIN_SIZE: int = int(os.environ.get("SCHEMASTORE_SNAPSHOT_MIN_SIZE", "16384"))
+SNAPSHOT_SUFFIX: str = ".snap"
+# marshal's format is only stable within a Python version.
+SNAPSHOT_MAGIC: bytes = b"SSNAP" + bytes([marshal.version, *sys.version_info[:2]])
+# magic, source size, source mtime_ns, source SHA-256
+_SNAPSHOT_HEADER = struct.Struct("<8sQq32s")
 
-    if not catalog_cache_file.exists():
-        catalog = download_json(CATALOG_URL)
-        _save_json(catalog, catalog_cache_file)
 
-    # ensure from last 24 hours
-    if time.time() - catalog_cache_file.stat().st_mtime > 86400:
-        catalog = download_json(CATALOG_URL)
-        _save_json(catalog, catalog_cache_file)
+def _snapshot_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}{SNAPSHOT_SUFFIX}")
 
 
-def get_catalog() -> dict:
+def _read_snapshot(path: Path, st: os.stat_result) -> Any:
     """
-    Get the catalog of schemas.
+    Read the snapshot of `path` if it matches the file's current content.
 
-    Returns:
-        dict: The catalog.
+    The size and mtime are checked first; if only the mtime differs (e.g. the
+    file was revalidated and touched) the content hash decides, and the
+    snapshot header is updated so the next check is cheap again.
+
+    Raises:
+        LookupError: If there is no usable snapshot.
     """
-    _ensure_catalog()
-    cache_dir = get_cache_dir()
-    catalog_cache_file = cache_dir / "catalog.json"
-    return _load_json(catalog_cache_file)
+    try:
+        with open(_snapshot_path(path), "r+b") as f:
+            header = f.read(_SNAPSHOT_HEADER.size)
+            magic, size, mtime_ns, digest = _SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or size != st.st_size:
+                raise LookupError(path)
+            if mtime_ns != st.st_mtime_ns:
+                if digest.hex() != _file_digest(path):
+                    raise LookupError(path)
+                f.seek(0)
+                f.write(_SNAPSHOT_HEADER.pack(magic, size, st.st_mtime_ns, digest))
+                f.seek(_SNAPSHOT_HEADER.size)
+            return marshal.loads(f.read())
+    except (OSError, struct.error, EOFError, ValueError, TypeError) as e:
+        raise LookupError(path) from e
 
 
-class Version(BaseModel):
-    id: str
-    url: HttpUrl
+def _write_snapshot(data: Any, path: Path, st: os.stat_result, digest: bytes) -> None:
+    with suppress(OSError, ValueError), _atomic_open(_snapshot_path(path), "wb") as f:
+        f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, st.st_size, st.st_mtime_ns, digest))
+        marshal.dump(data, f)
 
 
-class Schema(BaseModel):
-    name: str
-    description: Optional[str] = None
-    file_match: list[str] = Field(default_factory=list, alias="fileMatch")
-    url: HttpUrl
-    versions: dict[str, HttpUrl] = Field(default_factory=dict)
+def _load_cached_json(path: Path) -> Any:
+    """
+    Load a cache file, through its binary snapshot when it is large enough.
 
-    class Config:
-        allow_mutation = False
+    The snapshot is (re)generated whenever it is missing or no longer matches
+    the file's size, mtime and content hash.
 
-    @property
-    def url_filename(self) -> str:
-        return Path(str(self.url)).name
-    
-    @property
-    def name_clean(self) -> str:
-        name = self.name.lower().strip()
-        name = re.sub(r"[-\s]{1,}", "_", name)
-        name = re.sub(r"_+", "_", name)
-        name = re.sub(r"[^a-z0-9_]", "", name)
-        return name
+    Args:
+        path (Path): The cached JSON file.
 
-    @property
-    def schema_data(self) -> dict:
-        schemas_cache_dir = get_cache_dir() / "schemas"
-        schemas_cache_dir.mkdir(parents=True, exist_ok=True)
-        schema_cache_file = schemas_cache_dir / self.url_filename
+    Returns:
+        Any: The parsed document.
+    """
+    st = path.stat()
+    if st.st_size < SNAPSHOT_MIN_SIZE:
+        return _load_json(path)
+    with suppress(LookupError):
+        with _stats.phase("snapshot_load"):
+            data = _read_snapshot(path, st)
+        _stats.count("snapshot_hit")
+        return data
 
-        if schema_cache_file.exists():
-            # if under 24 hours old
-            if time.time() - schema_cache_file.stat().st_mtime < 86400:
-                return _load_json(schema_cache_file)
+    with _stats.phase("json_load"), open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        raw = f.read()
+        _stats.count("bytes_read", len(raw))
+        data = json.loads(_read_cache_bytes(raw))
+    _write_snapshot(data, path, st, hashlib.sha256(raw).digest())
+    return data
 
-        data = download_json(str(self.url))
-        _save_json(data, schema_cache_file)
-        return data.copy()
 
-    def to_json(
-        self,
-        path: str | Path | None = None,
-        indent: int = 2,
-        default_name: bool = False,
-    ) -> Optional[str]:
-        if isinstance(path, str):
-            path = Path(path)
-        if not path and default_name:
-            path = Path.cwd().joinpath(self.url_filename)
-        if isinstance(path, str):
-            path = Path(path)
+def _env_seconds(name: str, default: float) -> float:
+    """
+    Read a duration in seconds from the environment.
 
-        if not path:
-            return json.dumps(self.schema_data, indent=indent)
-        with open(path, "w") as f:
-            json.dump(self.schema_data, f, indent=indent)
+    Args:
+        name (str): The environment variable.
+        default (float): Used when the variable is unset or invalid.
 
-    def to_yaml(
-        self,
-        path: str | Path | None = None,
-        indent: int = 2,
-        default_name: bool = False,
-    ) -> Optional[str]:
-        if not path and default_name:
-            path = Path.cwd().joinpath(self.url_filename).with_suffix(".yaml")
-        if not path and not default_name:
-            return yaml.dump(
-                self.schema_data,
-                default_flow_style=False,
-                sort_keys=False,
-                indent=indent,
-            )
-        with open(str(path), "w") as f:
-            yaml.dump(
-                self.schema_data,
-                f,
-                default_flow_style=False,
-                sort_keys=False,
-                indent=indent,
-            )
+    Returns:
+        float: The duration.
+    """
+    try:
+        return float(os.environ[name])
+    except (KeyError, ValueError):
+        return default
 
-    def to_dict(self) -> dict:
-        return {
-            "name": self.name,
-            "description": self.description,
-            "fileMatch": self.file_match,
-            "url": str(self.url),
-            "versions": self.versions,
-        }
 
-    def __str__(self) -> str:
-        return self.name
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Freshness rules for a cached resource.
 
-    def __repr__(self) -> str:
-        return f"Schema(name={self.name}, url={self.url})"
+    Attributes:
+        max_age (float): Seconds a cached copy is used without revalidation.
+        stale_if_error (float): Extra seconds past max_age a stale copy may
+            still be served when revalidation fails.
+        stale_while_revalidate (float): Extra seconds past max_age a stale
+            copy is served immediately while a background process refreshes it.
+    """
 
-    def __contains__(self, term: str) -> bool:
-        return term.lower() in self.name.lower() or (
-            term.lower() in self.description.lower() if self.description else False
-        )
+    max_age: float
+    stale_if_error: float = 0.0
+    stale_while_revalidate: float = 0.0
 
-    def __eq__(self, other: "Schema") -> bool:
-        return self.name == other.name and self.url == other.url
+    def in_grace(self, age: float | None) -> bool:
+        """
+        Whether a copy of this age may be served while it is refreshed.
+        """
+        return age is not None and self.max_age <= age < self.max_age + self.stale_while_revalidate
 
-    def __hash__(self) -> int:
-        h = hashlib.sha256()
-        h.update(str(self.url).encode())
-        return int(h.hexdigest(), 16)
+    def usable_on_error(self, age: float | None) -> bool:
+        """
+        Whether a copy of this age may be served when revalidation fails.
+        """
+        return age is not None and age < self.max_age + self.stale_if_error
 
-    def __getitem__(self, key: str) -> Any:
-        return self.to_dict()[key]
 
-    def __iter__(self):
-        return iter(self.to_dict())
+CATALOG_POLICY = CachePolicy(
+    max_age=_env_seconds("SCHEMASTORE_CATALOG_MAX_AGE", 86400),
+    stale_if_error=_env_seconds("SCHEMASTORE_CATALOG_STALE_IF_ERROR", 7 * 86400),
+    stale_while_revalidate=_env_seconds(
+        "SCHEMASTORE_CATALOG_STALE_WHILE_REVALIDATE", 7 * 86400
+    ),
+)
+SCHEMA_POLICY = CachePolicy(
+    max_age=_env_seconds("SCHEMASTORE_SCHEMA_MAX_AGE", 86400),
+    stale_if_error=_env_seconds("SCHEMASTORE_SCHEMA_STALE_IF_ERROR", 7 * 86400),
+    stale_while_revalidate=_env_seconds(
+        "SCHEMASTORE_SCHEMA_STALE_WHILE_REVALIDATE", 7 * 86400
+    ),
+)
 
-    @classmethod
-    def from_dict(cls, data: SchemaStoreRecord) -> "Schema":
-        return cls(
-            name=data["name"],
-            description=data.get("description"),
-            file_match=[str(item) for item in data.get("fileMatch", [])],  # type: ignore
-            url=data["url"],
-            versions=data.get("versions", {}),
-        )
+# A refresh lock older than this is assumed to belong to a dead refresher.
+REFRESH_LOCK_TIMEOUT: float = 120.0
 
 
-@functools.lru_cache(maxsize=5000)
-def _get_schemas(as_obj: bool = True) -> SchemaStoreRecord | list[Schema]:
+def _spawn_refresh(kind: str, url: str, path: Path) -> bool:
     """
-    Get the list of schemas.
+    Start a detached process that refreshes a cache file, unless one is running.
+
+    Refreshers are deduplicated across processes with an exclusively created
+    `<file>.refresh` lock file, which the refresher removes when it is done.
+
+    Args:
+        kind (str): "catalog" or "schema".
+        url (str): The URL of the cached document.
+        path (Path): The cache file.
 
     Returns:
-        List[Dict[str, Any]]: The list of schemas.
+        bool: True if a refresher was started.
     """
-    catalog = get_catalog()
-    schemas = catalog["schemas"]
+    import subprocess
 
-    if as_obj:
-        return [Schema.from_dict(schema) for schema in schemas]
-    return schemas
+    lock = path.with_name(f"{path.name}.refresh")
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        age = _cache_age(lock)
+        if age is None or age < REFRESH_LOCK_TIMEOUT:
+            return False
+        lock.unlink(missing_ok=True)
+        return _spawn_refresh(kind, url, path)
+    directory = str(Path(__file__).resolve().parent)
+    code = (
+        f"import sys; sys.path.insert(0, {directory!r}); import schemastore; "
+        f"schemastore._refresh({kind!r}, {url!r}, {str(path)!r})"
+    )
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, "-c", code],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, "SCHEMASTORE_CACHE_DIR": str(get_cache_dir())},
+            start_new_session=True,
+        )
+        os.write(fd, str(proc.pid).encode())
+    except OSError:
+        lock.unlink(missing_ok=True)
+        return False
+    finally:
+        os.close(fd)
+    _stats.count("refresh_spawned")
+    return True
 
 
-def get_schemas() -> list[Schema]:
+def _refresh(kind: str, url: str, path: str) -> None:
     """
-    Get the list of schemas.
+    Body of the background refresher started by `_spawn_refresh`.
+    """
+    cache_file = Path(path)
+    try:
+        if kind == "catalog":
+            _ensure_catalog(cache_file, background=False)
+            if cache_file == get_cache_dir() / "catalog.json":
+                get_index()
+        else:
+            _fetch_cached(url, cache_file, SCHEMA_POLICY, compress=True)
+        prune_cache()
+    finally:
+        cache_file.with_name(f"{cache_file.name}.refresh").unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Get the shared HTTP session, so connections are kept alive between requests.
 
     Returns:
-        List[Schema]: The list of schemas.
+        requests.Session: The session.
     """
-    schemas = _get_schemas(as_obj=True)
-    return cast(list[Schema], schemas)
+    return requests.Session()
 
 
-def get_schemas_raw() -> SchemaStoreRecord:
+def _meta_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.meta")
+
+
+def _load_meta(path: Path) -> dict:
     """
-    Get the list of schemas.
+    Load the response validators stored next to a cached file.
+
+    Args:
+        path (Path): The cached file.
 
     Returns:
-        List[Dict[str, Any]]: The list of schemas.
+        dict: The metadata, empty if there is none.
     """
-    schemas = _get_schemas(as_obj=False)
-    return cast(SchemaStoreRecord, schemas)
+    try:
+        return _load_json(_meta_path(path))
+    except (OSError, ValueError):
+        return {}
 
 
-def name_completion(incomplete: str) -> list[str]:
+def _cache_age(path: Path) -> float | None:
     """
-    Click completion function for schema names.
+    Get the age of a cache file in seconds, or None if it doesn't exist.
     """
-    schemas = get_schemas()
-    names = [schema["name"] for schema in schemas]
-    names = sorted(list(set(names)))
-    return [name for name in names if incomplete.lower() in name.lower()]
+    try:
+        return time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
 
 
-def get_schema(
-    name: str, raw: bool = False, raise_error: bool = False
-) -> Schema | None:
+def _fetch_cached(
+    url: str,
+    path: Path,
+    policy: CachePolicy,
+    session: requests.Session | None = None,
+    timeout: int = 10,
+    background: bool = False,
+    compress: bool = False,
+) -> bool:
     """
-    Get a schema by name.
+    Make sure `path` holds an up to date copy of the JSON document at `url`.
+
+    Once the cached copy is older than the policy's max_age it is revalidated
+    with a conditional request; a 304 only refreshes the file's mtime. If the
+    request fails, a copy still within stale_if_error is kept. With
+    `background`, a copy within stale_while_revalidate is kept as is and
+    revalidated by a detached process instead.
+
+    Writes are atomic, and concurrent fetches of the same URL, across threads
+    and processes, are coalesced through an advisory lock on `<file>.lock`.
 
     Args:
-        name (str): The name of the schema.
+        url (str): The URL of the JSON document.
+        path (Path): The cache file.
+        policy (CachePolicy): The freshness rules.
+        session (requests.Session | None): The session to use.
+        timeout (int): Request timeout in seconds.
+        background (bool): Allow stale-while-revalidate.
+        compress (bool): Store the document compressed.
 
     Returns:
-        Schema: The schema.
+        bool: True if new content was written to `path`.
     """
-    schemas = get_schemas_raw()
-    for schema in schemas:
-        try:
-            schema["name"]
-        except KeyError:
-            raise ValueError(f"Schema '{name}' not found.")
-        assert isinstance(schema["name"], str)
-        if schema["name"].lower() == name.lower():
-            return (
-                schema
-                if raw
-                else Schema(
-                    name=schema["name"],
-                    description=schema.get("description"),
-                    file_match=schema.get("fileMatch", []),
-                    url=schema["url"],
-                    versions=schema.get("versions", {}),
-                )
-            )
+    if _use_cached(url, path, policy, background):
+        return False
+    # Only one process (or thread) fetches a URL at a time; the others wait
+    # for it and then find a fresh copy.
+    with _file_lock(path):
+        request = _plan_request(url, path, policy)
+        if request is None:
+            return False
+        return _download_cached(
+            url, path, policy, request, session or get_session(), timeout, compress
+        )
 
-    if raise_error:
-        raise ValueError(f"Schema '{name}' not found.")
 
+# The decisions of a cached fetch, shared by this module's requests transport
+# and the httpx one in schemastore_async.py, which only make the request:
+#
+#   if _use_cached(...): done
+#   under the cache file's lock:
+#       request = _plan_request(...); if None: done
+#       response = GET with request.headers
+#       if _not_modified(...): done
+#       check the status; data = _parse_download(response body)
+#       on a transport error, bad status or bad JSON: _download_failed(...)
+#       _store_download(...)
 
-def fuzzy_search(name: str) -> Schema:
-    schemas = get_schemas()
 
-    schema_names = [s.name for s in schemas]
+@dataclass(frozen=True)
+class _PlannedRequest:
+    """
+    A request `_plan_request` decided to make: the age of the cached copy it
+    revalidates (None if there is none) and the conditional headers.
+    """
 
-    result = fuzz.partial_token_set_ratio(name, schema_names)
-    schema = schemas[result[0]]
-    return schema
+    age: float | None
+    headers: dict[str, str]
 
 
-app = typer.Typer(
-    name="schemastore",
-    help="A CLI for the SchemaStore.",
-    add_completion=True,
-    no_args_is_help=True,
-)
+def _use_cached(url: str, path: Path, policy: CachePolicy, background: bool) -> bool:
+    """
+    Decide, before taking the lock, whether the cached copy is used as is:
+    when it is within max_age, or within stale_while_revalidate with
+    `background`, in which case a detached refresher is started.
+    """
+    age = _cache_age(path)
+    if age is not None and age < policy.max_age:
+        _stats.lookup(url, "hit")
+        return True
+    if background and policy.in_grace(age):
+        _stats.lookup(url, "stale_while_revalidate")
+        _spawn_refresh("schema", url, path)
+        return True
+    return False
 
 
-class OutputFormat(StrEnum):
-    JSON = "json"
-    YAML = "yaml"
-    LIST = "list"
-    TABLE = "table"
+def _plan_request(url: str, path: Path, policy: CachePolicy) -> _PlannedRequest | None:
+    """
+    Decide, under the lock, whether a request is still needed; another fetch
+    may have refreshed the copy while this one waited.
+    """
+    age = _cache_age(path)
+    if age is not None and age < policy.max_age:
+        _stats.lookup(url, "coalesced")
+        return None
+    _stats.lookup(url, "miss" if age is None else "stale")
+    return _PlannedRequest(age, _conditional_headers(url, path, age))
 
 
-class SingleObjectFormat(StrEnum):
-    JSON = "json"
-    YAML = "yaml"
+def _not_modified(path: Path, request: _PlannedRequest, status: int) -> bool:
+    """
+    Handle a 304: the cached copy is confirmed and its mtime refreshed.
+    """
+    if status != 304 or request.age is None:
+        return False
+    _stats.count("revalidated")
+    path.touch()
+    return True
 
 
-def get_console() -> Console:
-    c: Console = Console()
-    return c
+def _parse_download(content: bytes) -> Any:
+    _stats.count("bytes_downloaded", len(content))
+    return json.loads(content)
 
 
-@app.command(
-    "list",
-    help="List all schemas names.",
-)
+def _download_failed(policy: CachePolicy, request: _PlannedRequest, error: Exception) -> bool:
+    """
+    Handle a failed request: keep a copy within stale_if_error, or raise.
+    """
+    if policy.usable_on_error(request.age):
+        _stats.count("stale_if_error")
+        return False
+    raise error
+
+
+def _conditional_headers(url: str, path: Path, age: float | None) -> dict[str, str]:
+    """
+    Get the request headers that revalidate the cached copy of `url`, if any.
+    """
+    headers = {}
+    if age is not None:
+        meta = _load_meta(path)
+        if meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def _download_cached(
+    url: str,
+    path: Path,
+    policy: CachePolicy,
+    request: _PlannedRequest,
+    session: requests.Session,
+    timeout: int,
+    compress: bool,
+) -> bool:
+    try:
+        with _stats.phase("http"), session.get(
+            url, headers=request.headers, timeout=timeout
+        ) as r:
+            if _not_modified(path, request, r.status_code):
+                return False
+            r.raise_for_status()
+            data = _parse_download(r.content)
+            response_headers = r.headers
+    except (requests.RequestException, ValueError) as e:
+        return _download_failed(policy, request, e)
+
+    _store_download(url, path, data, response_headers, compress)
+    return True
+
+
+def _store_download(
+    url: str, path: Path, data: Any, headers: Mapping[str, str], compress: bool
+) -> None:
+    """
+    Save a downloaded document and the response validators for revalidating it.
+    """
+    _save_json(data, path, compress=compress)
+    meta = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+    _save_json(meta, _meta_path(path))
+
+
+def _schema_cache_name(url: str) -> str:
+    """
+    Get the name of the cache file for a schema URL.
+
+    Versions of a schema usually share the URL's file name, so the name is
+    the file name's stem followed by a hash of the whole URL.
+
+    Args:
+        url (str): The schema URL.
+
+    Returns:
+        str: The file name, e.g. `tsconfig-1f2e3d4c5b6a7988.json`.
+    """
+    stem = re.sub(r"[^A-Za-z0-9_.-]", "_", Path(urlsplit(url).path).stem) or "schema"
+    return f"{stem}-{hashlib.sha256(url.encode()).hexdigest()[:16]}.json"
+
+
+_SCHEMA_CACHE_NAME = re.compile(r".+-[0-9a-f]{16}\.json")
+
+
+def _schema_cache_path(url: str) -> Path:
+    """
+    Get the cache file for a schema URL.
+
+    Args:
+        url (str): The schema URL.
+
+    Returns:
+        Path: The cache file.
+    """
+    schemas_cache_dir = get_cache_dir() / "schemas"
+    schemas_cache_dir.mkdir(parents=True, exist_ok=True)
+    return schemas_cache_dir / _schema_cache_name(url)
+
+
+# 2: schemas stored compressed; 3: schema files named by `_schema_cache_name`;
+# 4: schemas stored at CACHE_INDENT rather than minified.
+CACHE_FORMAT: int = 4
+CACHE_FORMAT_FILENAME: str = "format"
+# Upper bound for the schemas, their sidecars and the files derived from them,
+# enforced by `prune_cache` (512 MiB by default). The catalog and indexes
+# don't count against it.
+CACHE_MAX_SIZE: int = int(os.environ.get("SCHEMASTORE_CACHE_MAX_SIZE", "536870912"))
+# Cache subdirectories of files derived from schemas: generated validators
+# (schemastore_codegen.py) and bundled schemas (schemastore_refs.py).
+VALIDATORS_DIRNAME: str = "validators"
+BUNDLED_DIRNAME: str = "bundled"
+
+
+def _touch_access(path: Path) -> None:
+    """
+    Record a use of a cache file in its atime, for LRU eviction. The mtime,
+    which drives freshness, is kept.
+    """
+    with suppress(OSError):
+        os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+
+
+def migrate_cache() -> int:
+    """
+    Convert cached schemas written by older versions to the current format.
+
+    Files named after the URL's file name are renamed to their
+    `_schema_cache_name`, using the URL recorded in their metadata; those
+    without one can't be attributed to a URL and are removed. Uncompressed
+    or minified files are rewritten compressed, at CACHE_INDENT. Access and
+    modification times are kept, so freshness and LRU order are unaffected.
+
+    Returns:
+        int: Number of schemas converted.
+    """
+    cache_dir = get_cache_dir()
+    count = 0
+    for path in sorted((cache_dir / "schemas").glob("*.json")):
+        url = _load_meta(path).get("url")
+        if url:
+            target = _schema_cache_path(url)
+        else:
+            # Imported from a bundle, which carries no metadata.
+            target = path if _SCHEMA_CACHE_NAME.fullmatch(path.name) else None
+        renamed = target != path
+        if renamed:
+            for suffix in ("", ".meta", SNAPSHOT_SUFFIX, ".lock"):
+                file = path.with_name(f"{path.name}{suffix}")
+                if target is None or suffix == ".lock":
+                    file.unlink(missing_ok=True)
+                elif file.exists():
+                    os.replace(file, target.with_name(f"{target.name}{suffix}"))
+            if target is None:
+                count += 1
+                continue
+            path = target
+        if _is_compressed(path) and _source_indent(path) == CACHE_INDENT:
+            count += renamed
+            continue
+        try:
+            st = path.stat()
+            data = _load_json(path)
+        except (OSError, ValueError):  # noqa: S112
+            # Unreadable; left for `prune_cache` or the next download.
+            continue
+        _save_json(data, path, compress=True)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        count += 1
+    (cache_dir / CACHE_FORMAT_FILENAME).write_text(f"{CACHE_FORMAT}\n")
+    return count
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_cache_format() -> None:
+    try:
+        current = (get_cache_dir() / CACHE_FORMAT_FILENAME).read_text().strip()
+    except FileNotFoundError:
+        current = ""
+    if current != str(CACHE_FORMAT):
+        migrate_cache()
+
+
+def _schema_cache_groups() -> list[tuple[Path, list[Path], os.stat_result, int]]:
+    """
+    Group each cached schema with its sidecar files.
+
+    Returns:
+        list[tuple[Path, list[Path], os.stat_result, int]]: The schema file,
+        all of its files, its stat result and their total size.
+    """
+    groups = []
+    schemas_dir = get_cache_dir() / "schemas"
+    if not schemas_dir.is_dir():
+        return groups
+    for path in schemas_dir.glob("*.json"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:  # noqa: S112
+            # Removed by another process since it was listed.
+            continue
+        files = [path]
+        size = st.st_size
+        for suffix in (".meta", SNAPSHOT_SUFFIX, ".lock"):
+            sidecar = path.with_name(f"{path.name}{suffix}")
+            with suppress(FileNotFoundError):
+                size += sidecar.stat().st_size
+                files.append(sidecar)
+        groups.append((path, files, st, size))
+    return groups
+
+
+def _derived_cache_files() -> list[tuple[Path, list[Path], os.stat_result, int]]:
+    """
+    List the files derived from cached schemas (generated validators and
+    bundled schemas) in the same shape as `_schema_cache_groups`.
+    """
+    files = []
+    cache_dir = get_cache_dir()
+    for path in itertools.chain(
+        (cache_dir / VALIDATORS_DIRNAME).glob("*.bin"),
+        (cache_dir / BUNDLED_DIRNAME).glob("*.json"),
+    ):
+        try:
+            st = path.stat()
+        except FileNotFoundError:  # noqa: S112
+            # Removed by another process since it was listed.
+            continue
+        files.append((path, [path], st, st.st_size))
+    return files
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def prune_cache(max_size: int | None = None, dry_run: bool = False) -> list[Path]:
+    """
+    Evict the least recently used schemas, generated validators and bundled
+    schemas until they fit in `max_size` bytes.
+
+    Only the evictable files (schemas with their sidecars, validators and
+    bundled schemas) are measured; the catalog and indexes are neither
+    counted nor evicted.
+
+    Args:
+        max_size (int | None): The size bound; defaults to CACHE_MAX_SIZE
+            (SCHEMASTORE_CACHE_MAX_SIZE).
+        dry_run (bool): Only report what would be evicted.
+
+    Returns:
+        list[Path]: The evicted files.
+    """
+    max_size = CACHE_MAX_SIZE if max_size is None else max_size
+    evicted = []
+    groups = _schema_cache_groups() + _derived_cache_files()
+    total = sum(size for *_, size in groups)
+    for path, files, _, size in sorted(groups, key=lambda g: g[2].st_atime):
+        if total <= max_size:
+            break
+        if not dry_run:
+            for file in files:
+                file.unlink(missing_ok=True)
+        evicted.append(path)
+        total -= size
+    _stats.count("evicted", len(evicted))
+    return evicted
+
+
+def _uncompressed_size(path: Path, st: os.stat_result) -> int:
+    """
+    Size of a cache file's JSON, read from the gzip trailer when compressed.
+    """
+    with open(path, "rb") as f:
+        if f.read(2) != GZIP_MAGIC:
+            return st.st_size
+        f.seek(-4, os.SEEK_END)
+        return struct.unpack("<I", f.read(4))[0]
+
+
+def cache_stats() -> dict:
+    """
+    Summarize the cache: sizes by kind, compression, freshness and last use.
+
+    Returns:
+        dict: The statistics.
+    """
+    cache_dir = get_cache_dir()
+    now = time.time()
+    groups = _schema_cache_groups()
+    derived = _derived_cache_files()
+    validators = [group for group in derived if group[0].parent.name == VALIDATORS_DIRNAME]
+    bundled = [group for group in derived if group[0].parent.name == BUNDLED_DIRNAME]
+    schema_bytes = sum(st.st_size for _, _, st, _ in groups)
+    json_bytes = sum(_uncompressed_size(path, st) for path, _, st, _ in groups)
+    age_buckets = {"<1h": 3600, "<1d": 86400, "<7d": 7 * 86400, "<30d": 30 * 86400}
+    last_used = dict.fromkeys([*age_buckets, "older"], 0)
+    for _, _, st, _ in groups:
+        age = now - st.st_atime
+        bucket = next((name for name, limit in age_buckets.items() if age < limit), "older")
+        last_used[bucket] += 1
+
+    def size(*names: str) -> int:
+        return sum((cache_dir / name).stat().st_size for name in names if (cache_dir / name).exists())
+
+    return {
+        "cache_dir": str(cache_dir),
+        "total_bytes": _dir_size(cache_dir),
+        "evictable_bytes": sum(size for *_, size in groups + derived),
+        "max_bytes": CACHE_MAX_SIZE,
+        "schemas": len(groups),
+        "compressed": sum(1 for path, *_ in groups if _is_compressed(path)),
+        "schema_bytes": schema_bytes,
+        "schema_json_bytes": json_bytes,
+        "sidecar_bytes": sum(size for *_, size in groups) - schema_bytes,
+        "catalog_bytes": size("catalog.json", "catalog.json.meta", f"catalog.json{SNAPSHOT_SUFFIX}"),
+        "index_bytes": size("catalog.db", NAMES_INDEX_FILENAME, CONTENTS_INDEX_FILENAME),
+        "validators": len(validators),
+        "validator_bytes": sum(size for *_, size in validators),
+        "bundled": len(bundled),
+        "bundled_bytes": sum(size for *_, size in bundled),
+        "fresh": sum(1 for _, _, st, _ in groups if now - st.st_mtime < SCHEMA_POLICY.max_age),
+        "last_used": last_used,
+    }
+
+
+_bundle_path: str | None = None
+
+
+def use_bundle(path: str | Path | None) -> None:
+    """
+    Serve the catalog and schemas from a bundle instead of the cache and network.
+
+    Offline mode can also be enabled with the SCHEMASTORE_BUNDLE environment
+    variable.
+
+    Args:
+        path (str | Path | None): The bundle, or None to go back online.
+    """
+    global _bundle_path
+    _bundle_path = str(path) if path else None
+    get_bundle.cache_clear()
+    get_index.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def get_bundle() -> "Bundle | None":
+    """
+    Get the bundle used in offline mode.
+
+    Returns:
+        Bundle | None: The bundle, or None when online.
+    """
+    path = _bundle_path or os.environ.get("SCHEMASTORE_BUNDLE")
+    if not path:
+        return None
+    from schemastore_bundle import Bundle
+
+    return Bundle(path)
+
+
+CHANGES_FILENAME: str = "changes.json"
+
+
+@dataclass
+class CatalogDelta:
+    """
+    What changed between two versions of the catalog.
+
+    Entries are matched by name; an entry is changed when its URL or versions
+    differ. `invalidated` holds the cached schema URLs that were marked stale
+    and `deleted` those whose cache files were removed.
+    """
+
+    fetched: float = 0.0
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    invalidated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _catalog_entries(catalog: dict) -> dict[str, SchemaStoreRecord]:
+    entries: dict[str, SchemaStoreRecord] = {}
+    for entry in catalog.get("schemas", []):
+        entries.setdefault(entry["name"], entry)
+    return entries
+
+
+def _entry_urls(entry: SchemaStoreRecord) -> set[str]:
+    return {str(entry["url"]), *map(str, (entry.get("versions") or {}).values())}
+
+
+def diff_catalogs(previous: dict, current: dict) -> CatalogDelta:
+    """
+    Compare two catalogs.
+
+    Args:
+        previous (dict): The older catalog.
+        current (dict): The newer catalog.
+
+    Returns:
+        CatalogDelta: The added, removed and changed entries, with the
+        schema URLs whose cached copies are affected (not yet checked
+        against the cache).
+    """
+    old = _catalog_entries(previous)
+    new = _catalog_entries(current)
+    delta = CatalogDelta(fetched=time.time())
+    stale: dict[str, None] = {}
+    for name, entry in new.items():
+        before = old.get(name)
+        if before is None:
+            delta.added.append(name)
+        elif before["url"] != entry["url"] or (before.get("versions") or {}) != (
+            entry.get("versions") or {}
+        ):
+            delta.changed.append(name)
+            # A new release usually updates the main URL in place.
+            stale[str(entry["url"])] = None
+            for url in _entry_urls(entry) - _entry_urls(before):
+                stale[url] = None
+    delta.removed = [name for name in old if name not in new]
+
+    current_urls = set().union(*map(_entry_urls, new.values()))
+    previous_urls = set().union(*map(_entry_urls, old.values()))
+    delta.deleted = sorted(previous_urls - current_urls)
+    delta.invalidated = list(stale)
+    return delta
+
+
+def _apply_delta(delta: CatalogDelta) -> None:
+    """
+    Mark the cached copies of changed schemas stale and delete removed ones.
+
+    Stale copies keep their validators, so the next use is a conditional
+    request. `delta.invalidated` and `delta.deleted` are narrowed to the URLs
+    that were actually cached.
+    """
+    invalidated = []
+    for url in delta.invalidated:
+        path = _schema_cache_path(url)
+        try:
+            st = path.stat()
+        except FileNotFoundError:  # noqa: S112
+            # Not cached; there is nothing to invalidate.
+            continue
+        # Only the mtime drives freshness; the atime keeps the LRU position.
+        os.utime(path, ns=(st.st_atime_ns, 0))
+        invalidated.append(url)
+    deleted = []
+    for url in delta.deleted:
+        path = _schema_cache_path(url)
+        if path.exists():
+            path.unlink()
+            _meta_path(path).unlink(missing_ok=True)
+            _snapshot_path(path).unlink(missing_ok=True)
+            deleted.append(url)
+    delta.invalidated = invalidated
+    delta.deleted = deleted
+
+
+def _ensure_catalog(
+    catalog_cache_file: str | Path | None = None,
+    prefetch: bool | None = None,
+    background: bool = True,
+) -> CatalogDelta | None:
+    """
+    Ensure the catalog is downloaded and up to date.
+
+    When a refresh brings new content, the delta against the previous catalog
+    is applied to the schema cache and saved next to the catalog. A catalog
+    within its stale_while_revalidate window is refreshed by a detached
+    process instead, so the caller never waits on the network.
+
+    Args:
+        catalog_cache_file (str | Path | None): The catalog cache file.
+        prefetch (bool | None): Download the invalidated schemas right away;
+            defaults to the SCHEMASTORE_PREFETCH_CHANGED environment variable.
+        background (bool): Allow stale-while-revalidate.
+
+    Returns:
+        CatalogDelta | None: The delta, if the catalog was refreshed.
+    """
+    if get_bundle() is not None:
+        return None
+    if not catalog_cache_file:
+        cache_dir = get_cache_dir()
+        catalog_cache_file = cache_dir / "catalog.json"
+    else:
+        catalog_cache_file = Path(catalog_cache_file).absolute()
+
+    refresh, previous = _begin_catalog_refresh(catalog_cache_file, background)
+    if not refresh:
+        return None
+    if not _fetch_cached(CATALOG_URL, catalog_cache_file, CATALOG_POLICY) or previous is None:
+        return None
+    delta = _record_catalog_delta(previous, catalog_cache_file)
+    urls = _prefetch_urls(delta, prefetch)
+    if urls:
+        mirror_schemas(urls)
+    return delta
+
+
+def _begin_catalog_refresh(catalog_cache_file: Path, background: bool) -> tuple[bool, dict | None]:
+    """
+    Decide how to bring the catalog up to date, for the sync and async
+    `ensure_catalog`.
+
+    Returns:
+        tuple[bool, dict | None]: Whether to fetch it now (False when a copy
+        within stale_while_revalidate is served while a detached process
+        refreshes it), and the stale copy a refresh would replace, to diff
+        against.
+    """
+    age = _cache_age(catalog_cache_file)
+    if background and CATALOG_POLICY.in_grace(age):
+        _stats.lookup(CATALOG_URL, "stale_while_revalidate")
+        _spawn_refresh("catalog", CATALOG_URL, catalog_cache_file)
+        return False, None
+    previous = None
+    if age is not None and age >= CATALOG_POLICY.max_age:
+        with suppress(ValueError):
+            previous = _load_cached_json(catalog_cache_file)
+    return True, previous
+
+
+def _prefetch_urls(delta: CatalogDelta, prefetch: bool | None) -> list[str]:
+    """
+    Get the schemas to download right after a catalog refresh.
+    """
+    if prefetch is None:
+        prefetch = _prefetch_changed()
+    return delta.invalidated if prefetch else []
+
+
+def _prefetch_changed() -> bool:
+    return os.environ.get("SCHEMASTORE_PREFETCH_CHANGED", "") not in ("", "0")
+
+
+def _record_catalog_delta(previous: dict, catalog_cache_file: Path) -> CatalogDelta:
+    """
+    Diff a freshly downloaded catalog against the previous one, apply the
+    delta to the schema cache and save it next to the catalog.
+    """
+    delta = diff_catalogs(previous, _load_cached_json(catalog_cache_file))
+    _apply_delta(delta)
+    _save_json(asdict(delta), catalog_cache_file.with_name(CHANGES_FILENAME))
+    return delta
+
+
+def get_changes() -> CatalogDelta | None:
+    """
+    Get the delta recorded at the last catalog refresh.
+
+    Returns:
+        CatalogDelta | None: The delta, or None if none was recorded.
+    """
+    try:
+        return CatalogDelta(**_load_json(get_cache_dir() / CHANGES_FILENAME))
+    except FileNotFoundError:
+        return None
+
+
+def get_catalog() -> dict:
+    """
+    Get the catalog of schemas.
+
+    Returns:
+        dict: The catalog.
+    """
+    bundle = get_bundle()
+    if bundle is not None:
+        return bundle.load_json("catalog.json")
+    _ensure_catalog()
+    cache_dir = get_cache_dir()
+    catalog_cache_file = cache_dir / "catalog.json"
+    return _load_cached_json(catalog_cache_file)
+
+
+INDEX_VERSION: int = 6
+
+_INDEX_DDL: str = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE schemas (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    description TEXT,
+    file_match TEXT NOT NULL,
+    url TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX schemas_name_lower ON schemas (name_lower);
+CREATE TABLE grams (
+    gram TEXT NOT NULL,
+    schema_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, schema_id)
+) WITHOUT ROWID;
+CREATE TABLE file_match (
+    pattern TEXT NOT NULL,
+    schema_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT,
+    parent TEXT
+);
+"""
+
+
+def _trigrams(text: str) -> set[str]:
+    """
+    Split text into the word-padded, lowercased trigrams used by fuzzy search.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        set[str]: The trigrams.
+    """
+    grams = set()
+    for word in re.sub(r"[^a-z0-9]+", " ", text.lower()).split():
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _file_fingerprint(path: Path) -> str:
+    """
+    Cheap change marker for a file, based on its size and mtime.
+
+    Args:
+        path (Path): The file.
+
+    Returns:
+        str: The fingerprint.
+    """
+    st = path.stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _file_digest(path: Path) -> str:
+    """
+    SHA-256 of a file's contents.
+
+    Args:
+        path (Path): The file.
+
+    Returns:
+        str: The hex digest.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _has_fts5(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._fts5_probe")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+_GLOB_CHARS = re.compile(r"[*?\[{]")
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    """
+    Compile a fileMatch glob.
+
+    Patterns are matched against the end of a path at a directory boundary,
+    like an implicit leading `**/`. Supports `*`, `**`, `?`, `[...]` and
+    `{a,b}` alternatives.
+
+    Args:
+        pattern (str): The glob.
+
+    Returns:
+        re.Pattern: The compiled pattern.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in pattern[i + 1 :]:
+            j = pattern.index("]", i + 1)
+            body = pattern[i + 1 : j].replace("\\", "\\\\")
+            out.append("[^" + body[1:] + "]" if body.startswith("!") else "[" + body + "]")
+            i = j
+        elif c == "{" and "}" in pattern[i + 1 :]:
+            j = pattern.index("}", i + 1)
+            alternatives = pattern[i + 1 : j].split(",")
+            out.append("(?:" + "|".join(re.escape(a) for a in alternatives) + ")")
+            i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("(?:^|/)" + "".join(out) + "$")
+
+
+def _classify_file_match(pattern: str) -> tuple[str, str | None, str | None]:
+    """
+    Pick the lookup bucket of a fileMatch glob.
+
+    Returns:
+        tuple[str, str | None, str | None]: The kind and key: `("name", basename)`
+        when the last path segment is literal, `("suffix", key)` when it is
+        `*` followed by a literal containing a dot (keyed from the first dot),
+        otherwise `("glob", None)`. Then the parent directory the glob
+        requires, if that segment is literal.
+    """
+    segments = pattern.removeprefix("./").split("/")
+    basename = segments[-1]
+    parent = segments[-2] if len(segments) > 1 else None
+    if parent is not None and _GLOB_CHARS.search(parent):
+        parent = None
+
+    if not _GLOB_CHARS.search(basename):
+        return "name", basename, parent
+    rest = basename[1:]
+    if basename.startswith("*") and not _GLOB_CHARS.search(rest) and "." in rest:
+        return "suffix", rest[rest.index(".") :], parent
+    return "glob", None, None
+
+
+class FileMatchIndex:
+    """
+    The catalog's fileMatch globs, bucketed for near-constant time lookups.
+
+    Globs whose last segment is literal are keyed by basename, and `*<literal>`
+    globs by the literal from its first dot on; both are further keyed by the
+    literal parent directory they require, if any. A path is only tested
+    against the globs in the buckets of its basename, basename suffixes and
+    parent directory, plus the few globs that fit no bucket.
+    """
+
+    def __init__(self, rows: Iterable[tuple[str, int, str, str | None, str | None]]):
+        self.names: dict[tuple[str | None, str], list[tuple[str, int]]] = {}
+        self.suffixes: dict[tuple[str | None, str], list[tuple[str, int]]] = {}
+        self.residual: list[tuple[str, int]] = []
+        for pattern, schema_id, kind, key, parent in rows:
+            if kind == "name":
+                self.names.setdefault((parent, key), []).append((pattern, schema_id))
+            elif kind == "suffix":
+                self.suffixes.setdefault((parent, key), []).append((pattern, schema_id))
+            else:
+                self.residual.append((pattern, schema_id))
+
+    @staticmethod
+    @functools.cache
+    def _compile(pattern: str) -> re.Pattern:
+        return _glob_to_regex(pattern.removeprefix("./"))
+
+    def candidates(self, parent: str | None, basename: str) -> Iterator[tuple[str, int]]:
+        for directory in (None, parent) if parent else (None,):
+            yield from self.names.get((directory, basename), ())
+            dot = basename.find(".")
+            while dot != -1:
+                yield from self.suffixes.get((directory, basename[dot:]), ())
+                dot = basename.find(".", dot + 1)
+        yield from self.residual
+
+    def match(self, path: str) -> list[int]:
+        """
+        Find the schemas whose fileMatch globs match a path.
+
+        Args:
+            path (str): The file path, relative or absolute.
+
+        Returns:
+            list[int]: Matching schema ids, in catalog order.
+        """
+        segments = path.replace(os.sep, "/").rsplit("/", 2)
+        parent = segments[-2] if len(segments) > 1 else None
+        path = "/".join(segments)
+        ids = {
+            schema_id
+            for pattern, schema_id in self.candidates(parent, segments[-1])
+            if self._compile(pattern).search(path)
+        }
+        return sorted(ids)
+
+
+@functools.lru_cache(maxsize=1)
+def get_file_match_index() -> FileMatchIndex:
+    """
+    Get the fileMatch index of the catalog.
+
+    Returns:
+        FileMatchIndex: The index.
+    """
+    return FileMatchIndex(
+        get_index().execute("SELECT pattern, schema_id, kind, key, parent FROM file_match")
+    )
+
+
+def iter_paths(
+    paths: Iterable[str], exclude: Iterable[str] = (".git", "node_modules")
+) -> Iterator[str]:
+    """
+    Expand paths for matching: directories are walked, `-` reads paths from stdin.
+
+    Args:
+        paths (Iterable[str]): Files, directories or `-`.
+        exclude (Iterable[str]): Directory names not to descend into.
+
+    Yields:
+        str: File paths.
+    """
+    exclude = set(exclude)
+    for path in paths:
+        if path == "-":
+            yield from (line.rstrip("\n") for line in sys.stdin if line.strip())
+        elif os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if d not in exclude]
+                yield from (os.path.join(root, f) for f in files)
+        else:
+            yield path
+
+
+def match_files(paths: Iterable[str]) -> Iterator[tuple[str, list[str]]]:
+    """
+    Resolve the schemas that apply to files, using their fileMatch globs.
+
+    Args:
+        paths (Iterable[str]): The file paths.
+
+    Yields:
+        tuple[str, list[str]]: Each path with the names of matching schemas.
+    """
+    index = get_file_match_index()
+    names = dict(get_index().execute("SELECT id, name FROM schemas"))
+    for path in paths:
+        yield path, [names[i] for i in index.match(path)]
+
+
+@_timed("index")
+def _build_index(catalog: dict, index_file: Path, fingerprint: str, digest: str) -> None:
+    """
+    Build the SQLite index of the catalog.
+
+    The index is written to a temporary file and moved into place, so readers
+    never see a partially built database.
+
+    Args:
+        catalog (dict): The catalog.
+        index_file (Path): Where to write the index.
+        fingerprint (str): Cheap change marker of the catalog's source.
+        digest (str): SHA-256 of the catalog's source.
+    """
+    rows = []
+    # Only for the entries in `rows`, so every match resolves to a schema.
+    file_match_rows = []
+    for i, entry in enumerate(catalog.get("schemas", [])):
+        name = entry.get("name")
+        if not isinstance(name, str) or "url" not in entry:
+            continue
+        file_match_rows.extend(
+            (pattern, i, *_classify_file_match(pattern))
+            for pattern in entry.get("fileMatch", [])
+            if isinstance(pattern, str) and pattern and not pattern.startswith("!")
+        )
+        rows.append(
+            (
+                i,
+                name,
+                name.lower(),
+                entry.get("description"),
+                " ".join(str(p) for p in entry.get("fileMatch", [])),
+                entry["url"],
+                json.dumps(entry),
+            )
+        )
+
+    write_names_index(
+        sorted({(name_lower, name) for _, name, name_lower, *_ in rows}),
+        index_file.with_name(NAMES_INDEX_FILENAME),
+    )
+
+    tmp_file = _temp_path(index_file)
+    tmp_file.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_file)
+    try:
+        conn.executescript(_INDEX_DDL)
+        conn.executemany("INSERT INTO schemas VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO file_match VALUES (?, ?, ?, ?, ?)", file_match_rows)
+        conn.executemany(
+            "INSERT INTO grams VALUES (?, ?)",
+            (
+                (gram, i)
+                for i, name, _, description, file_match, *_ in rows
+                for gram in _trigrams(f"{name} {description or ''} {file_match}")
+            ),
+        )
+        fts = _has_fts5(conn)
+        if fts:
+            conn.execute(
+                "CREATE VIRTUAL TABLE schemas_fts USING fts5(name, description, file_match)"
+            )
+            conn.execute(
+                "INSERT INTO schemas_fts (rowid, name, description, file_match) "
+                "SELECT id, name, coalesce(description, ''), file_match FROM schemas"
+            )
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("version", str(INDEX_VERSION)),
+                ("fingerprint", fingerprint),
+                ("sha256", digest),
+                ("fts", "1" if fts else "0"),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_file, index_file)
+
+
+def _open_index(
+    index_file: Path, fingerprint: str, digest: Callable[[], str]
+) -> sqlite3.Connection | None:
+    """
+    Open an existing index if it still describes the catalog.
+
+    A changed fingerprint alone does not force a rebuild: when the content hash
+    still matches, only the stored fingerprint is refreshed.
+
+    Args:
+        index_file (Path): The index.
+        fingerprint (str): Cheap change marker of the catalog's source.
+        digest (Callable[[], str]): Computes the SHA-256 of the catalog's source.
+
+    Returns:
+        sqlite3.Connection | None: The connection, or None if a rebuild is needed.
+    """
+    if not index_file.exists() or not index_file.with_name(NAMES_INDEX_FILENAME).exists():
+        return None
+    conn = sqlite3.connect(index_file, check_same_thread=False)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        conn.close()
+        return None
+
+    if meta.get("version") != str(INDEX_VERSION):
+        conn.close()
+        return None
+    if meta.get("fingerprint") == fingerprint:
+        return conn
+    if meta.get("sha256") == digest():
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'fingerprint'", (fingerprint,))
+        conn.commit()
+        return conn
+    conn.close()
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_index() -> sqlite3.Connection:
+    """
+    Get a connection to the catalog index, rebuilding it if the catalog changed.
+
+    Returns:
+        sqlite3.Connection: The index connection.
+    """
+    cache_dir = get_cache_dir()
+    catalog_file = cache_dir / "catalog.json"
+    index_file = cache_dir / "catalog.db"
+
+    bundle = get_bundle()
+    if bundle is not None:
+        bundle_digest = bundle.digest("catalog.json")
+        fingerprint = f"bundle:{bundle_digest}"
+        conn = _open_index(index_file, fingerprint, lambda: bundle_digest)
+        if conn is None:
+            catalog = bundle.load_json("catalog.json")
+            _build_index(catalog, index_file, fingerprint, bundle_digest)
+    else:
+        _ensure_catalog()
+        fingerprint = _file_fingerprint(catalog_file)
+        conn = _open_index(index_file, fingerprint, lambda: _file_digest(catalog_file))
+        if conn is None:
+            catalog = _load_cached_json(catalog_file)
+            _build_index(catalog, index_file, fingerprint, _file_digest(catalog_file))
+
+    if conn is None:
+        conn = sqlite3.connect(index_file, check_same_thread=False)
+    return conn
+
+
+def iter_schemas_raw(term: str | None = None) -> Iterator[SchemaStoreRecord]:
+    """
+    Iterate over catalog entries in catalog order.
+
+    Args:
+        term (str | None): Only yield entries whose name contains this
+            (case-insensitive).
+
+    Yields:
+        SchemaStoreRecord: The catalog entries.
+    """
+    conn = get_index()
+    if term:
+        cur = conn.execute(
+            "SELECT record FROM schemas WHERE instr(name_lower, ?) > 0 ORDER BY id",
+            (term.lower(),),
+        )
+    else:
+        cur = conn.execute("SELECT record FROM schemas ORDER BY id")
+    for (record,) in cur:
+        yield json.loads(record)
+
+
+def search_index(query: str, limit: int | None = None) -> list[SchemaStoreRecord]:
+    """
+    Full-text search over schema names, descriptions and fileMatch patterns.
+
+    Every word in the query is matched as a prefix. Falls back to a substring
+    scan when SQLite was built without FTS5.
+
+    Args:
+        query (str): The search terms.
+        limit (int | None): Maximum number of results.
+
+    Returns:
+        list[SchemaStoreRecord]: Matching entries, best first.
+    """
+    conn = get_index()
+    terms = query.split()
+    if not terms:
+        return []
+
+    (fts,) = conn.execute("SELECT value FROM meta WHERE key = 'fts'").fetchone()
+    if fts == "1":
+        match = " ".join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+        sql = (
+            "SELECT s.record FROM schemas_fts f JOIN schemas s ON s.id = f.rowid "
+            "WHERE schemas_fts MATCH ? ORDER BY bm25(schemas_fts, 10.0, 1.0, 5.0)"
+        )
+        params: list[Any] = [match]
+    else:
+        clauses = " AND ".join(
+            "(instr(name_lower, ?) > 0 OR instr(lower(coalesce(description, '')), ?) > 0 "
+            "OR instr(lower(file_match), ?) > 0)"
+            for _ in terms
+        )
+        sql = f"SELECT record FROM schemas WHERE {clauses} ORDER BY id"
+        params = [t.lower() for t in terms for _ in range(3)]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [json.loads(record) for (record,) in conn.execute(sql, params)]
+
+
+CONTENTS_INDEX_VERSION: int = 1
+CONTENTS_INDEX_FILENAME: str = "contents.db"
+
+_CONTENTS_DDL: str = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    fingerprint TEXT NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    pointer TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX entries_file ON entries (file_id);
+"""
+
+_CONTENTS_FTS_DDL: str = """
+CREATE VIRTUAL TABLE entries_fts USING fts5(text, content='entries', content_rowid='id');
+CREATE TRIGGER entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Entry kinds: property names, titles, descriptions and enum values.
+CONTENT_KINDS: tuple[str, ...] = ("property", "title", "description", "enum")
+
+
+@dataclass
+class ContentMatch:
+    schema: str
+    file: str
+    pointer: str
+    kind: str
+    text: str
+
+
+def _pointer_token(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _schema_entries(node: Any, pointer: str = "") -> Iterator[tuple[str, str, str]]:
+    """
+    Walk a schema and yield its searchable (pointer, kind, text) entries.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            child = f"{pointer}/{_pointer_token(key)}"
+            if key in ("properties", "patternProperties") and isinstance(value, dict):
+                for name in value:
+                    yield f"{child}/{_pointer_token(name)}", "property", name
+            elif key == "title" and isinstance(value, str):
+                yield pointer, "title", value
+                continue
+            elif key in ("description", "markdownDescription") and isinstance(value, str):
+                yield pointer, "description", value
+                continue
+            elif key == "enum" and isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, (str, int, float)) and not isinstance(item, bool):
+                        yield f"{child}/{i}", "enum", str(item)
+                continue
+            yield from _schema_entries(value, child)
+    elif isinstance(node, list):
+        for i, item in enumerate(node):
+            yield from _schema_entries(item, f"{pointer}/{i}")
+
+
+def _open_contents_index(index_file: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(index_file, timeout=30, check_same_thread=False)
+    try:
+        version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    except sqlite3.DatabaseError:
+        version = None
+    if version == (str(CONTENTS_INDEX_VERSION),):
+        return conn
+    conn.close()
+    index_file.unlink(missing_ok=True)
+    conn = sqlite3.connect(index_file, timeout=30, check_same_thread=False)
+    conn.executescript(_CONTENTS_DDL)
+    fts = _has_fts5(conn)
+    if fts:
+        conn.executescript(_CONTENTS_FTS_DDL)
+    conn.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        [("version", str(CONTENTS_INDEX_VERSION)), ("fts", "1" if fts else "0")],
+    )
+    conn.commit()
+    return conn
+
+
+def update_contents_index() -> sqlite3.Connection:
+    """
+    Bring the schema contents index up to date with the schema cache.
+
+    Only schemas whose cache file is new or changed are parsed again; a file
+    whose size or mtime changed but whose content hash did not is skipped.
+    In offline mode the bundle's schemas are indexed instead.
+
+    Returns:
+        sqlite3.Connection: The contents index.
+    """
+    _ensure_cache_format()
+    with _stats.phase("contents_index"):
+        return _update_contents_index(
+            _open_contents_index(get_cache_dir() / CONTENTS_INDEX_FILENAME)
+        )
+
+
+def _update_contents_index(conn: sqlite3.Connection) -> sqlite3.Connection:
+    known = {
+        name: (file_id, fingerprint, digest)
+        for file_id, name, fingerprint, digest in conn.execute(
+            "SELECT id, name, fingerprint, sha256 FROM files"
+        )
+    }
+
+    # name -> (fingerprint, digest, load)
+    sources: dict[str, tuple[str, Callable[[], str], Callable[[], Any]]] = {}
+    bundle = get_bundle()
+    if bundle is not None:
+        for name in bundle.files:
+            if name.startswith("schemas/") and name.endswith(".json"):
+                digest = bundle.digest(name)
+                sources[name.removeprefix("schemas/")] = (
+                    f"bundle:{digest}",
+                    lambda digest=digest: digest,
+                    lambda name=name: bundle.load_json(name),
+                )
+    schemas_dir = get_cache_dir() / "schemas"
+    if schemas_dir.is_dir():
+        for path in schemas_dir.glob("*.json"):
+            if path.name not in sources:
+                sources[path.name] = (
+                    _file_fingerprint(path),
+                    lambda path=path: _file_digest(path),
+                    lambda path=path: _load_cached_json(path),
+                )
+
+    with conn:
+        for name in known.keys() - sources.keys():
+            file_id = known[name][0]
+            conn.execute("DELETE FROM entries WHERE file_id = ?", (file_id,))
+            conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        for name, (fingerprint, digest, load) in sources.items():
+            current = known.get(name)
+            if current is not None and current[1] == fingerprint:
+                continue
+            sha256 = digest()
+            if current is not None and current[2] == sha256:
+                conn.execute(
+                    "UPDATE files SET fingerprint = ? WHERE id = ?", (fingerprint, current[0])
+                )
+                continue
+            try:
+                entries = list(_schema_entries(load()))
+            except (OSError, ValueError):  # noqa: S112
+                # Unreadable or not JSON; indexed again once it changes.
+                continue
+            if current is not None:
+                file_id = current[0]
+                conn.execute("DELETE FROM entries WHERE file_id = ?", (file_id,))
+                conn.execute(
+                    "UPDATE files SET fingerprint = ?, sha256 = ? WHERE id = ?",
+                    (fingerprint, sha256, file_id),
+                )
+            else:
+                file_id = conn.execute(
+                    "INSERT INTO files (name, fingerprint, sha256) VALUES (?, ?, ?)",
+                    (name, fingerprint, sha256),
+                ).lastrowid
+            _stats.count("contents_indexed")
+            conn.executemany(
+                "INSERT INTO entries (file_id, pointer, kind, text) VALUES (?, ?, ?, ?)",
+                ((file_id, pointer, kind, text) for pointer, kind, text in entries),
+            )
+    return conn
+
+
+def grep_schemas(
+    query: str, kind: str | None = None, limit: int | None = None
+) -> list[ContentMatch]:
+    """
+    Search the contents of the cached schemas.
+
+    Matches property names, titles, descriptions and enum values; every word
+    in the query is matched as a prefix. Only schemas in the cache (or the
+    offline bundle) are searched. Falls back to a substring scan when SQLite
+    was built without FTS5.
+
+    Args:
+        query (str): The search terms.
+        kind (str | None): Only match entries of this kind (see CONTENT_KINDS).
+        limit (int | None): Maximum number of results.
+
+    Returns:
+        list[ContentMatch]: The matches, best first.
+    """
+    terms = query.split()
+    if not terms:
+        return []
+    conn = update_contents_index()
+
+    (fts,) = conn.execute("SELECT value FROM meta WHERE key = 'fts'").fetchone()
+    if fts == "1":
+        match = " ".join('"{}"*'.format(t.replace('"', '""')) for t in terms)
+        sql = (
+            "SELECT f.name, e.pointer, e.kind, e.text FROM entries_fts "
+            "JOIN entries e ON e.id = entries_fts.rowid JOIN files f ON f.id = e.file_id "
+            "WHERE entries_fts MATCH ?"
+        )
+        params: list[Any] = [match]
+        order = " ORDER BY bm25(entries_fts), f.name, e.id"
+    else:
+        sql = (
+            "SELECT f.name, e.pointer, e.kind, e.text FROM entries e "
+            "JOIN files f ON f.id = e.file_id WHERE "
+            + " AND ".join("instr(lower(e.text), ?) > 0" for _ in terms)
+        )
+        params = [t.lower() for t in terms]
+        order = " ORDER BY f.name, e.id"
+    if kind:
+        sql += " AND e.kind = ?"
+        params.append(kind)
+    sql += order
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    schema_names: dict[str, str] = {}
+    for (record,) in get_index().execute("SELECT record FROM schemas ORDER BY id DESC"):
+        entry = json.loads(record)
+        for version, url in (entry.get("versions") or {}).items():
+            schema_names[_schema_cache_name(url)] = f"{entry['name']}@{version}"
+        schema_names[_schema_cache_name(entry["url"])] = entry["name"]
+    return [
+        ContentMatch(schema_names.get(file, file), file, pointer, entry_kind, text)
+        for file, pointer, entry_kind, text in conn.execute(sql, params)
+    ]
+
+
+def _schema_source(url: str) -> Path | bytes:
+    """
+    Locate the cached content of a schema, fetching it if needed.
+
+    Args:
+        url (str): The schema URL.
+
+    Returns:
+        Path | bytes: The cache file, or the content itself when it is served
+        from the offline bundle.
+    """
+    path = _schema_cache_path(url)
+    bundle = get_bundle()
+    lock = get_lockfile()
+    pinned = lock.digest(url) if lock is not None else None
+    if bundle is None:
+        _ensure_cache_format()
+        if pinned is None:
+            _fetch_cached(url, path, SCHEMA_POLICY, background=True, compress=True)
+        elif _cached_digest(path) == pinned:
+            # Pinned content is never revalidated by age.
+            _stats.count("lock_hit")
+        else:
+            _fetch_cached(url, path, CachePolicy(max_age=0), compress=True)
+            _check_pinned(url, _cached_digest(path), pinned)
+        _touch_access(path)
+        return path
+    name = path.relative_to(get_cache_dir()).as_posix()
+    if name in bundle:
+        if pinned is not None:
+            _check_pinned(url, bundle.digest(name), pinned)
+        return bundle.read(name)
+    if path.exists():
+        if pinned is not None:
+            _check_pinned(url, _cached_digest(path), pinned)
+        return path
+    raise FileNotFoundError(f"{url} is not in bundle {bundle.path}.")
+
+
+def _load_source(source: Path | bytes) -> Any:
+    """
+    Parse content returned by `_schema_source`.
+    """
+    return json.loads(source) if isinstance(source, bytes) else _load_cached_json(source)
+
+
+def _load_schema_url(url: str) -> dict:
+    return _load_source(_schema_source(url))
+
+
+class Version(BaseModel):
+    id: str
+    url: HttpUrl
+
+
+# Catalog keys and the attributes that hold them.
+_RECORD_FIELDS: dict[str, str] = {
+    "name": "name",
+    "description": "description",
+    "fileMatch": "file_match",
+    "url": "url",
+    "versions": "versions",
+}
+
+
+class _SchemaMethods:
+    """
+    Behaviour shared by `SchemaRecord` and the `Schema` model.
+    """
+
+    __slots__ = ()
+
+    @property
+    def url_filename(self) -> str:
+        return Path(str(self.url)).name
+
+    @property
+    def name_clean(self) -> str:
+        name = self.name.lower().strip()
+        name = re.sub(r"[-\s]{1,}", "_", name)
+        name = re.sub(r"_+", "_", name)
+        name = re.sub(r"[^a-z0-9_]", "", name)
+        return name
+
+    @property
+    def schema_data(self) -> dict:
+        return _load_schema_url(str(self.url))
+
+    @property
+    def bundled_data(self) -> dict:
+        from schemastore_refs import bundle_schema
+
+        return bundle_schema(str(self.url))
+
+    def to_json(
+        self,
+        path: str | Path | None = None,
+        indent: int = 2,
+        default_name: bool = False,
+        minify: bool = False,
+    ) -> str | None:
+        if isinstance(path, str):
+            path = Path(path)
+        if not path and default_name:
+            path = Path.cwd().joinpath(self.url_filename)
+        if isinstance(path, str):
+            path = Path(path)
+
+        separators = (",", ":") if minify else None
+        if minify:
+            indent = None
+        if not path:
+            return json.dumps(self.schema_data, indent=indent, separators=separators)
+        source = _schema_source(str(self.url))
+        if _source_indent(source) == indent:
+            # The cache file already has the requested layout.
+            _copy_file(source, path)
+            return
+        with open(path, "w") as f:
+            json.dump(self.schema_data, f, indent=indent, separators=separators)
+
+    def to_yaml(
+        self,
+        path: str | Path | None = None,
+        indent: int = 2,
+        default_name: bool = False,
+    ) -> str | None:
+        if not path and default_name:
+            path = Path.cwd().joinpath(self.url_filename).with_suffix(".yaml")
+        if not path and not default_name:
+            return yaml.dump(
+                self.schema_data,
+                default_flow_style=False,
+                sort_keys=False,
+                indent=indent,
+            )
+        with open(str(path), "w") as f:
+            yaml.dump(
+                self.schema_data,
+                f,
+                default_flow_style=False,
+                sort_keys=False,
+                indent=indent,
+            )
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "fileMatch": list(self.file_match),
+            "url": str(self.url),
+            "versions": {k: str(v) for k, v in self.versions.items()},
+        }
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name}, url={self.url})"
+
+    def __contains__(self, term: str) -> bool:
+        return term.lower() in self.name.lower() or (
+            term.lower() in self.description.lower() if self.description else False
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _RECORD_FIELDS:
+            raise KeyError(key)
+        value = getattr(self, _RECORD_FIELDS[key])
+        return str(value) if key == "url" else value
+
+    def __iter__(self):
+        return iter(_RECORD_FIELDS)
+
+
+class Schema(_SchemaMethods, BaseModel):
+    """
+    Validated catalog entry, for callers that want pydantic models.
+
+    Catalog lookups return `SchemaRecord`; use `SchemaRecord.to_model` to get
+    one of these.
+    """
+
+    name: str
+    description: str | None = None
+    file_match: list[str] = Field(default_factory=list, alias="fileMatch")
+    url: HttpUrl
+    versions: dict[str, HttpUrl] = Field(default_factory=dict)
+
+    model_config = ConfigDict(frozen=True, populate_by_name=True)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _SchemaMethods):
+            return NotImplemented
+        return self.name == other.name and str(self.url) == str(other.url)
+
+    def __hash__(self) -> int:
+        return hash(str(self.url))
+
+    def __iter__(self):
+        return iter(_RECORD_FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: SchemaStoreRecord) -> "Schema":
+        return cls.model_validate(data)
+
+
+class SchemaRecord(_SchemaMethods):
+    """
+    Catalog entry as loaded from the index, without validation.
+
+    Fields are plain attributes holding the catalog values; `url` and the
+    `versions` values are strings and are only validated by `to_model`.
+    """
+
+    __slots__ = ("_hash", "description", "file_match", "name", "url", "versions")
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        description: str | None = None,
+        file_match: list[str] | None = None,
+        versions: dict[str, str] | None = None,
+    ):
+        self.name = name
+        self.url = url
+        self.description = description
+        self.file_match = file_match if file_match is not None else []
+        self.versions = versions if versions is not None else {}
+        self._hash: int | None = None
+
+    def to_model(self) -> Schema:
+        """
+        Validate the record.
+
+        Returns:
+            Schema: The equivalent pydantic model.
+
+        Raises:
+            pydantic.ValidationError: If a URL is invalid.
+        """
+        return Schema.model_validate(self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _SchemaMethods):
+            return NotImplemented
+        return self.name == other.name and self.url == str(other.url)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self.url)
+        return self._hash
+
+    @classmethod
+    def from_dict(cls, data: SchemaStoreRecord) -> "SchemaRecord":
+        return cls(
+            data["name"],
+            data["url"],
+            data.get("description"),
+            data.get("fileMatch"),
+            data.get("versions"),
+        )
+
+
+@functools.lru_cache(maxsize=5000)
+@_timed("catalog")
+def _get_schemas(as_obj: bool = True) -> SchemaStoreRecord | list[SchemaRecord]:
+    """
+    Get the list of schemas.
+
+    Returns:
+        List[Dict[str, Any]]: The list of schemas.
+    """
+    schemas = list(iter_schemas_raw())
+
+    if as_obj:
+        return [SchemaRecord.from_dict(schema) for schema in schemas]
+    return schemas
+
+
+def get_schemas() -> list[SchemaRecord]:
+    """
+    Get the list of schemas.
+
+    Returns:
+        List[SchemaRecord]: The list of schemas.
+    """
+    schemas = _get_schemas(as_obj=True)
+    return cast(list[SchemaRecord], schemas)
+
+
+def get_schemas_raw() -> SchemaStoreRecord:
+    """
+    Get the list of schemas.
+
+    Returns:
+        List[Dict[str, Any]]: The list of schemas.
+    """
+    schemas = _get_schemas(as_obj=False)
+    return cast(SchemaStoreRecord, schemas)
+
+
+def name_completion(incomplete: str) -> list[str]:
+    """
+    Click completion function for schema names.
+    """
+    get_index()
+    return complete_names(incomplete, get_cache_dir() / NAMES_INDEX_FILENAME)
+
+
+def get_schema(
+    name: str, raw: bool = False, raise_error: bool = False
+) -> SchemaRecord | None:
+    """
+    Get a schema by name.
+
+    Names pinned in the lockfile (`NAME` or `NAME@VERSION`) are resolved from
+    it, without the catalog.
+
+    Args:
+        name (str): The name of the schema.
+
+    Returns:
+        SchemaRecord: The schema.
+    """
+    lock = get_lockfile()
+    entry = lock.find(name) if lock is not None else None
+    if entry is not None:
+        schema = dict(entry["record"])
+    else:
+        schema = _catalog_record(name)
+    if schema is not None:
+        return (
+            schema
+            if raw
+            else SchemaRecord.from_dict(schema)
+        )
+
+    if raise_error:
+        raise ValueError(f"Schema '{name}' not found.")
+
+
+def _catalog_record(name: str) -> SchemaStoreRecord | None:
+    row = (
+        get_index()
+        .execute(
+            "SELECT record FROM schemas WHERE name_lower = ? ORDER BY id LIMIT 1",
+            (name.lower(),),
+        )
+        .fetchone()
+    )
+    return json.loads(row[0]) if row is not None else None
+
+
+FUZZY_CANDIDATES: int = 250
+
+
+def fuzzy_search(name: str, limit: int = 10) -> list[tuple[SchemaStoreRecord, float]]:
+    """
+    Rank schemas by fuzzy similarity to a query.
+
+    Candidates are preselected from the trigram index by the number of
+    trigrams they share with the query, so only plausible entries are scored.
+    Names, fileMatch patterns and descriptions are each scored in one batch;
+    a schema's score is its best field score, with fileMatch and description
+    matches weighted below name matches.
+
+    Args:
+        name (str): The query.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list[tuple[SchemaStoreRecord, float]]: (entry, score) pairs, best first.
+    """
+    conn = get_index()
+    grams = sorted(_trigrams(name))
+    if grams:
+        placeholders = ", ".join("?" * len(grams))
+        cur = conn.execute(
+            f"SELECT s.id, s.name, s.description, s.file_match, s.record FROM schemas s "
+            f"JOIN (SELECT schema_id, count(*) AS hits FROM grams WHERE gram IN ({placeholders}) "
+            f"GROUP BY schema_id ORDER BY hits DESC LIMIT ?) g ON g.schema_id = s.id",
+            [*grams, FUZZY_CANDIDATES],
+        )
+    else:
+        cur = conn.execute(
+            "SELECT id, name, description, file_match, record FROM schemas "
+            "WHERE instr(name_lower, ?) > 0 LIMIT ?",
+            (name.lower(), FUZZY_CANDIDATES),
+        )
+    candidates = {row[0]: row for row in cur}
+    if not candidates:
+        return []
+
+    scores: dict[int, float] = dict.fromkeys(candidates, 0.0)
+    fields = (
+        (1, fuzz.WRatio, 1.0),
+        (3, fuzz.partial_ratio, 0.9),
+        (2, fuzz.partial_token_set_ratio, 0.8),
+    )
+    for column, scorer, weight in fields:
+        choices = {i: row[column] for i, row in candidates.items() if row[column]}
+        for _, score, i in process.extract(name, choices, scorer=scorer, limit=None):
+            scores[i] = max(scores[i], score * weight)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(json.loads(candidates[i][4]), round(score, 1)) for i, score in ranked]
+
+
+@dataclass
+class MirrorResult:
+    """
+    Outcome of mirroring one schema URL.
+
+    Attributes:
+        url (str): The schema URL.
+        downloaded (bool): Whether new content was written to the cache.
+        size (int): Bytes written to the cache.
+        retries (int): Number of retried attempts.
+        error (str | None): The last error, if the URL could not be fetched.
+        sha256 (str | None): SHA-256 of the cached copy, taken right after
+            the fetch, or None if there is none.
+    """
+
+    url: str
+    downloaded: bool = False
+    size: int = 0
+    retries: int = 0
+    error: str | None = None
+    sha256: str | None = None
+
+
+def _mirror_session(workers: int) -> requests.Session:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _mirror_one(
+    url: str, session: requests.Session, policy: CachePolicy, retries: int
+) -> MirrorResult:
+    result = MirrorResult(url=url)
+    path = _schema_cache_path(url)
+    for attempt in range(retries + 1):
+        try:
+            result.downloaded = _fetch_cached(
+                url, path, policy, session=session, compress=True
+            )
+            result.error = None
+            break
+        except (requests.RequestException, ValueError) as e:
+            result.error = str(e)
+            if attempt < retries:
+                result.retries += 1
+                time.sleep(0.5 * 2**attempt)
+    if result.downloaded:
+        result.size = path.stat().st_size
+    result.sha256 = _cached_digest(path)
+    return result
+
+
+def mirror_urls(
+    pattern: str | None = None, include_versions: bool = False
+) -> list[str]:
+    """
+    Get the schema URLs to mirror.
+
+    Args:
+        pattern (str | None): Glob matched case-insensitively against schema names.
+        include_versions (bool): Also include the URLs of versioned schemas.
+
+    Returns:
+        list[str]: The unique URLs, in catalog order.
+    """
+    urls: dict[str, None] = {}
+    for schema in get_schemas():
+        if pattern and not fnmatch.fnmatch(schema.name.lower(), pattern.lower()):
+            continue
+        urls[str(schema.url)] = None
+        if include_versions:
+            for url in schema.versions.values():
+                urls[str(url)] = None
+    return list(urls)
+
+
+def mirror_schemas(
+    urls: list[str],
+    workers: int = 16,
+    retries: int = 2,
+    force: bool = False,
+    callback: Callable[[MirrorResult], None] | None = None,
+) -> list[MirrorResult]:
+    """
+    Fetch many schemas into the cache concurrently.
+
+    A bounded thread pool shares one pooled keep-alive session. Failed
+    downloads are retried with exponential backoff.
+
+    Args:
+        urls (list[str]): The schema URLs.
+        workers (int): Number of concurrent downloads.
+        retries (int): Retries per URL after the first attempt.
+        force (bool): Revalidate every cached copy, regardless of its age.
+            Otherwise URLs pinned by the lockfile are skipped while the cached
+            copy matches the pinned hash.
+        callback (Callable[[MirrorResult], None] | None): Called as each URL finishes.
+
+    Returns:
+        list[MirrorResult]: The results, in completion order.
+    """
+    _ensure_cache_format()
+    lock = get_lockfile()
+    if lock is not None and not force:
+        urls = [
+            url
+            for url in urls
+            if lock.digest(url) is None
+            or _cached_digest(_schema_cache_path(url)) != lock.digest(url)
+        ]
+    policy = CachePolicy(max_age=0) if force else SCHEMA_POLICY
+    session = _mirror_session(workers)
+    results = []
+    with session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_mirror_one, url, session, policy, retries) for url in urls]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if callback:
+                callback(result)
+    if any(result.downloaded for result in results):
+        prune_cache()
+    return results
+
+
+def load_document(path: str | Path) -> Any:
+    """
+    Load a JSON, YAML or TOML document, chosen by file extension.
+
+    Unknown extensions are read as JSON, then YAML.
+
+    Args:
+        path (str | Path): The document.
+
+    Returns:
+        Any: The parsed document.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".toml":
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if suffix in (".yaml", ".yml"):
+        return yaml.safe_load(text)
+    try:
+        return json.loads(text)
+    except ValueError:
+        if suffix == ".json":
+            raise
+        return yaml.safe_load(text)
+
+
+@functools.cache
+def _retrieve_resource(uri: str):
+    """
+    Resolve a remote `$ref` through the schema cache.
+    """
+    from referencing import Resource
+    from referencing.jsonschema import DRAFT7
+
+    return Resource.from_contents(_load_schema_url(uri), default_specification=DRAFT7)
+
+
+@functools.cache
+def get_validator(url: str):
+    """
+    Get a compiled validator for a schema URL.
+
+    Validators are built once per process and reuse the schema cache for the
+    schema itself and for any remote `$ref`. Requires `jsonschema`.
+
+    Args:
+        url (str): The schema URL.
+
+    Returns:
+        jsonschema.protocols.Validator: The validator.
+    """
+    from jsonschema import Draft7Validator
+    from jsonschema.validators import validator_for
+    from referencing import Registry
+
+    schema = _load_schema_url(url)
+    cls = validator_for(schema, default=Draft7Validator)
+    registry = Registry(retrieve=_retrieve_resource).with_resource(
+        url, _retrieve_resource(url)
+    )
+    return cls({"$ref": url}, registry=registry, format_checker=cls.FORMAT_CHECKER)
+
+
+def _source_digest(source: Path | bytes) -> str:
+    """
+    SHA-256 of the JSON of content returned by `_schema_source`, whether or
+    not it is stored compressed.
+    """
+    if isinstance(source, bytes):
+        return hashlib.sha256(_read_cache_bytes(source)).hexdigest()
+    return _cached_digest(source)
+
+
+def _schema_digest(url: str) -> str | None:
+    """
+    SHA-256 of the cached copy of a schema (in the offline bundle, or the
+    cache), without fetching or revalidating it.
+
+    Returns:
+        str | None: The digest, or None if the schema is not cached.
+    """
+    path = _schema_cache_path(url)
+    bundle = get_bundle()
+    if bundle is not None:
+        name = path.relative_to(get_cache_dir()).as_posix()
+        if name in bundle:
+            return bundle.digest(name)
+    return _cached_digest(path)
+
+
+def _validate_batch(schema_name: str, url: str, paths: list[str]) -> list[dict]:
+    """
+    Validate files against one schema. Runs in pool workers.
+
+    Returns:
+        list[dict]: One result per file.
+    """
+    from schemastore_codegen import get_compiled_validator
+
+    results = []
+    is_valid = get_compiled_validator(url)
+    for path in paths:
+        result: dict[str, Any] = {"path": path, "schema": schema_name, "valid": False}
+        try:
+            document = load_document(path)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            result["errors"] = [{"pointer": "", "message": f"cannot load: {e}"}]
+        else:
+            if is_valid is not None and is_valid(document):
+                result["errors"] = []
+            else:
+                result["errors"] = [
+                    {
+                        "pointer": "".join(f"/{p}" for p in error.absolute_path),
+                        "message": error.message,
+                    }
+                    for error in get_validator(url).iter_errors(document)
+                ]
+            result["valid"] = not result["errors"]
+        results.append(result)
+    return results
+
+
+def _reset_worker() -> None:
+    # Forked workers must not share the parent's sockets or SQLite handle.
+    get_session.cache_clear()
+    get_index.cache_clear()
+
+
+def validate_files(
+    paths: Iterable[str],
+    schema: str | None = None,
+    jobs: int | None = None,
+    chunk_size: int = 32,
+) -> Iterator[dict]:
+    """
+    Validate files against their schemas across a process pool.
+
+    Each file is validated against `schema` if given, otherwise against every
+    schema whose fileMatch applies to it. Schemas are fetched and their
+    validators generated (see `schemastore_codegen.get_compiled_validator`)
+    once up front; every worker builds each jsonschema validator, needed only
+    to report errors, at most once.
+
+    Args:
+        paths (Iterable[str]): The files.
+        schema (str | None): Name of the schema to validate every file against.
+        jobs (int | None): Worker processes; 1 validates in this process.
+        chunk_size (int): Files per work item.
+
+    Yields:
+        dict: Results with `path`, `schema`, `valid` and `errors` (each with a
+        JSON `pointer` into the document and a `message`). Files without a
+        schema have `schema` and `valid` set to None.
+    """
+    if schema is not None:
+        entry = get_schema(schema, raw=True, raise_error=True)
+        urls = {entry["name"]: entry["url"]}
+        groups: dict[str, list[str]] = {entry["name"]: list(paths)}
+    else:
+        urls = dict(get_index().execute("SELECT name, url FROM schemas ORDER BY id DESC"))
+        groups = {}
+        for path, names in match_files(paths):
+            if not names:
+                yield {"path": path, "schema": None, "valid": None, "errors": []}
+            for name in names:
+                groups.setdefault(name, []).append(path)
+
+    if get_bundle() is None:
+        mirror_schemas([urls[name] for name in groups])
+    from schemastore_codegen import get_compiled_validator
+
+    for name in groups:
+        get_compiled_validator(urls[name])
+    work = [
+        (name, urls[name], files[i : i + chunk_size])
+        for name, files in groups.items()
+        for i in range(0, len(files), chunk_size)
+    ]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(work) == 1:
+        for item in work:
+            yield from _validate_batch(*item)
+        return
+
+    import multiprocessing
+
+    context = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(work)), mp_context=context, initializer=_reset_worker
+    ) as pool:
+        futures = [pool.submit(_validate_batch, *item) for item in work]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+LOCKFILE_NAME: str = "schemastore.lock"
+
+# Per process: cache file -> (mtime_ns, size, SHA-256 of its JSON).
+_digest_memo: dict[Path, tuple[int, int, str]] = {}
+
+
+def _cached_digest(path: Path) -> str | None:
+    """
+    SHA-256 of a cache file's JSON, or None if there is no such file.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    memo = _digest_memo.get(path)
+    if memo is not None and memo[:2] == (st.st_mtime_ns, st.st_size):
+        return memo[2]
+    digest = hashlib.sha256(_read_cache_bytes(path)).hexdigest()
+    _digest_memo[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def _check_pinned(url: str, digest: str | None, pinned: str) -> None:
+    if digest is None:
+        raise FileNotFoundError(f"{url} is pinned by the lockfile but not cached.")
+    if digest != pinned:
+        raise ValueError(
+            f"{url} does not match the lockfile (sha256 {digest}, locked {pinned}); "
+            "run 'schemastore lock' to update it."
+        )
+
+
+_lockfile_path: str | None = None
+
+
+def use_lockfile(path: str | Path | None) -> None:
+    """
+    Choose the lockfile that pins schemas.
+
+    Args:
+        path (str | Path | None): The lockfile; "" to ignore lockfiles; None
+            to use SCHEMASTORE_LOCKFILE or else the nearest `schemastore.lock`
+            in the current directory or its parents.
+    """
+    global _lockfile_path
+    _lockfile_path = None if path is None else str(path)
+    get_lockfile.cache_clear()
+
+
+@contextmanager
+def _without_lockfile() -> Iterator[None]:
+    """
+    Ignore lockfiles within the block.
+    """
+    saved_path = _lockfile_path
+    use_lockfile("")
+    try:
+        yield
+    finally:
+        use_lockfile(saved_path)
+
+
+def find_lockfile() -> Path | None:
+    """
+    Locate the lockfile chosen by `use_lockfile`.
+
+    Returns:
+        Path | None: The lockfile, or None if there is none.
+    """
+    path = _lockfile_path
+    if path is None:
+        path = os.environ.get("SCHEMASTORE_LOCKFILE")
+    if path is not None:
+        return Path(path) if path else None
+    cwd = Path.cwd()
+    for directory in (cwd, *cwd.parents):
+        if (directory / LOCKFILE_NAME).is_file():
+            return directory / LOCKFILE_NAME
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_lockfile() -> "Lockfile | None":
+    """
+    Get the lockfile that pins schemas.
+
+    While a lockfile is in use, pinned schemas are served from the cache
+    whenever the cached copy has the pinned hash, however old it is, and are
+    only fetched when missing or different. Content that doesn't match the
+    lock is an error. A stale lockfile, of an older version, pins nothing and
+    is ignored with a warning until `lock_schemas` pins its schemas again.
+
+    Returns:
+        Lockfile | None: The lockfile, or None if there is none.
+    """
+    path = find_lockfile()
+    if path is None:
+        return None
+    from schemastore_lock import Lockfile
+
+    lock = Lockfile.load(path)
+    if lock.stale:
+        warnings.warn(_stale_message(path), stacklevel=2)
+        return None
+    return lock
+
+
+def _stale_message(path: Path) -> str:
+    return (
+        f"{path} is from an older version and pins nothing; "
+        "run 'schemastore lock' to pin its schemas again."
+    )
+
+
+app = typer.Typer(
+    name="schemastore",
+    help="A CLI for the SchemaStore.",
+    add_completion=True,
+    no_args_is_help=True,
+)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    offline: Annotated[
+        Path | None,
+        typer.Option(
+            "--offline",
+            envvar="SCHEMASTORE_BUNDLE",
+            help="Serve the catalog and schemas from this bundle, without network access.",
+        ),
+    ] = None,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            "--profile",
+            envvar="SCHEMASTORE_PROFILE",
+            help="Print cache counters and phase timings as JSON on stderr.",
+        ),
+    ] = False,
+    lockfile: Annotated[
+        Path | None,
+        typer.Option(
+            "--lockfile",
+            help=(
+                "Pin schemas to this lockfile (default: SCHEMASTORE_LOCKFILE, or the "
+                "nearest schemastore.lock)."
+            ),
+        ),
+    ] = None,
+):
+    """
+    A CLI for the SchemaStore.
+    """
+    # Library warnings (e.g. a stale lockfile) as one line, without the source.
+    warnings.formatwarning = lambda message, *_args, **_kwargs: f"warning: {message}\n"
+    if offline:
+        use_bundle(offline)
+    if lockfile:
+        use_lockfile(lockfile)
+    if profile:
+        ctx.call_on_close(
+            lambda: sys.stderr.write(json.dumps(get_stats().to_dict()) + "\n")
+        )
+
+
+class OutputFormat(StrEnum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    YAML = "yaml"
+    LIST = "list"
+    TABLE = "table"
+
+
+class SingleObjectFormat(StrEnum):
+    JSON = "json"
+    YAML = "yaml"
+
+
+def get_console() -> Console:
+    c: Console = Console()
+    return c
+
+
+@_timed("render")
+def _print_syntax(console: Console, data: str, lexer: str) -> None:
+    """
+    Print a JSON or YAML document, highlighted only when writing to a terminal.
+    """
+    if console.is_terminal:
+        console.print(Syntax(data, lexer=lexer, line_numbers=False))
+    else:
+        sys.stdout.write(data if data.endswith("\n") else f"{data}\n")
+
+
+@_timed("render")
+def _print_lines(console: Console, lines: Iterable[str]) -> None:
+    """
+    Print lines, through rich only when writing to a terminal.
+    """
+    if console.is_terminal:
+        for line in lines:
+            console.print(line)
+    else:
+        sys.stdout.writelines(f"{line}\n" for line in lines)
+
+
+@_timed("render")
+def _print_rows(
+    console: Console, title: str, columns: list[str], rows: Iterable[tuple[Any, ...]]
+) -> None:
+    """
+    Print a table to a terminal, or tab-separated rows without a header otherwise.
+    """
+    if console.is_terminal:
+        table = Table(title=title)
+        for column in columns:
+            table.add_column(column)
+        for row in rows:
+            table.add_row(*("" if v is None else str(v) for v in row))
+        console.print(table)
+    else:
+        sys.stdout.writelines(
+            "\t".join("" if v is None else str(v) for v in row) + "\n" for row in rows
+        )
+
+
+@_timed("render")
+def _write_ndjson(records: Iterable[Any]) -> None:
+    """
+    Stream records as newline-delimited JSON, one line per record as it arrives.
+    """
+    for record in records:
+        sys.stdout.write(json.dumps(record) + "\n")
+
+
+@_timed("render")
+def _write_json_array(records: Iterable[Any], indent: int = 2) -> None:
+    """
+    Stream records as a JSON array, formatted like `json.dumps(list, indent=indent)`.
+    """
+    pad = " " * indent
+    sep = "["
+    for record in records:
+        sys.stdout.write(f"{sep}\n{textwrap.indent(json.dumps(record, indent=indent), pad)}")
+        sep = ","
+    sys.stdout.write("[]\n" if sep == "[" else "\n]\n")
+
+
+def _record_dict(schema: SchemaStoreRecord) -> dict:
+    """
+    Normalize a catalog entry to the shape of `SchemaRecord.to_dict()`.
+    """
+    return {
+        "name": schema["name"],
+        "description": schema.get("description"),
+        "fileMatch": schema.get("fileMatch", []),
+        "url": schema["url"],
+        "versions": schema.get("versions", {}),
+    }
+
+
+@app.command(
+    "list",
+    help="List all schemas names.",
+)
 def list_schemas(
     names: Annotated[
         bool, typer.Option("-n", "--names", help="List only names.")
     ] = False,
     fmt: Annotated[
         OutputFormat, typer.Option("-f", "--format", help="Output format.")
-    ] = OutputFormat.TABLE,
+    ] = OutputFormat.TABLE,
+):
+    """
+    List all schemas names.
+    """
+    console = get_console()
+
+    if names:
+        schema_names = (
+            name for (name,) in get_index().execute("SELECT name FROM schemas ORDER BY name")
+        )
+        if fmt == OutputFormat.JSON:
+            if console.is_terminal:
+                _print_syntax(console, json.dumps(list(schema_names), indent=2), "json")
+            else:
+                _write_json_array(schema_names)
+        elif fmt == OutputFormat.NDJSON:
+            _write_ndjson(schema_names)
+        elif fmt == OutputFormat.YAML:
+            data = yaml.dump(list(schema_names), default_flow_style=False, sort_keys=False)
+            _print_syntax(console, data, "yaml")
+        elif fmt == OutputFormat.LIST:
+            _print_lines(console, schema_names)
+        elif fmt == OutputFormat.TABLE:
+            _print_rows(console, "Schema Names", ["Name"], ((name,) for name in schema_names))
+    else:
+        schemas = (_record_dict(schema) for schema in iter_schemas_raw())
+        if fmt == OutputFormat.JSON:
+            if console.is_terminal:
+                _print_syntax(console, json.dumps(list(schemas), indent=2), "json")
+            else:
+                _write_json_array(schemas)
+        elif fmt == OutputFormat.NDJSON:
+            _write_ndjson(schemas)
+        elif fmt == OutputFormat.YAML:
+            data = yaml.dump(list(schemas), default_flow_style=False, sort_keys=False)
+            _print_syntax(console, data, "yaml")
+        elif fmt == OutputFormat.LIST:
+            _print_lines(console, (schema["name"] for schema in schemas))
+        elif fmt == OutputFormat.TABLE:
+            _print_rows(
+                console,
+                "Schemas",
+                ["Name", "Description", "URL"],
+                ((s["name"], s["description"], s["url"]) for s in schemas),
+            )
+
+
+@app.command("search", help="Search for a schema by name.")
+def search_schema(
+    name: Annotated[
+        str,
+        typer.Argument(
+            ...,
+            help="The name of the schema to search for.",
+            autocompletion=name_completion,
+        ),
+    ],
+    fuzzy: Annotated[bool, typer.Option("--fuzzy", help="Fuzzy search.")] = False,
+    text: Annotated[
+        bool,
+        typer.Option(
+            "-t", "--text", help="Full-text search names, descriptions and fileMatch."
+        ),
+    ] = False,
+    fmt: Annotated[
+        OutputFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = OutputFormat.YAML,
+    indent: Annotated[
+        int, typer.Option("-i", "--indent", help="Indentation level.")
+    ] = 2,
+    raw: Annotated[
+        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
+    ] = False,
+    limit: Annotated[
+        int | None,
+        typer.Option(
+            "-l", "--limit", help="Maximum number of results (default 10 with --fuzzy)."
+        ),
+    ] = None,
+) -> None:
+    """
+    Search for a schema by name.
+    """
+    console = get_console()
+
+    results: Iterable[SchemaStoreRecord]
+    if fuzzy:
+        results = [
+            {**schema, "score": score}
+            for schema, score in fuzzy_search(name, limit=limit or 10)
+        ]
+    elif text:
+        results = search_index(name, limit=limit)
+    else:
+        results = itertools.islice(iter_schemas_raw(name), limit)
+
+    if fmt == OutputFormat.NDJSON:
+        _write_ndjson(results)
+        return
+    result = list(results)
+
+    if not result:
+        typer.Exit(code=1)
+
+    if fmt == OutputFormat.JSON:
+        data = json.dumps(result, indent=indent)
+        if raw:
+            typer.echo(data)
+            return
+        _print_syntax(console, data, "json")
+    elif fmt == OutputFormat.YAML:
+        data = yaml.dump(
+            result, default_flow_style=False, sort_keys=False, indent=indent
+        )
+        if raw:
+            typer.echo(data)
+            return
+        _print_syntax(console, data, "yaml")
+    elif fmt == OutputFormat.LIST:
+        _print_lines(console, (s["name"] for s in result))
+    elif fmt == OutputFormat.TABLE:
+        _print_rows(
+            console,
+            "Schema",
+            ["Name", "Description", "URL", *(["Score"] if fuzzy else [])],
+            (
+                (
+                    schema["name"],
+                    schema.get("description", ""),
+                    schema["url"],
+                    *([schema["score"]] if fuzzy else []),
+                )
+                for schema in result
+            ),
+        )
+
+
+@app.command("show", help="Show a schemastore entry.")
+def show_entry(
+    name: Annotated[
+        str,
+        typer.Argument(
+            ...,
+            help="The name of the schema to show.",
+            autocompletion=name_completion,
+            case_sensitive=False,
+            shell_complete=True,
+            atomic=True,
+            parser=None,
+        ),
+    ],
+    fmt: Annotated[
+        SingleObjectFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = SingleObjectFormat.JSON,
+    raw: Annotated[
+        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
+    ] = False,
+    indent: Annotated[
+        int, typer.Option("-i", "--indent", help="Indentation level.")
+    ] = 2,
+):
+    """
+    Show a schemastore entry.
+    """
+    console = get_console()
+
+    schema = get_schema(name, raw=True)
+    if fmt == SingleObjectFormat.JSON:
+        data = json.dumps(schema, indent=indent)
+        if raw:
+            typer.echo(data)
+            return
+
+        _print_syntax(console, data, "json")
+    elif fmt == SingleObjectFormat.YAML:
+        data = yaml.dump(
+            schema, default_flow_style=False, sort_keys=False, indent=indent
+        )
+        if raw:
+            typer.echo(data)
+            return
+        _print_syntax(console, data, "yaml")
+    elif fmt == OutputFormat.LIST:
+        console.print(schema)
+    else:
+        raise ValueError(f"Invalid output format: {fmt}")
+
+
+@app.command("schema", help="Get a schema by name.")
+def get_schema_entry(
+    name: Annotated[
+        str,
+        typer.Argument(
+            ..., help="The name of the schema to get.", autocompletion=name_completion
+        ),
+    ],
+    fmt: Annotated[
+        SingleObjectFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = SingleObjectFormat.JSON,
+    raw: Annotated[
+        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
+    ] = False,
+    indent: Annotated[
+        int, typer.Option("-i", "--indent", help="Indentation level.")
+    ] = 2,
+    minify: Annotated[
+        bool, typer.Option("-m", "--minify", help="Print compact JSON.")
+    ] = False,
+    passthrough: Annotated[
+        bool,
+        typer.Option(
+            "-p",
+            "--passthrough",
+            help="Copy the cached schema to stdout without reformatting it.",
+        ),
+    ] = False,
+):
+    """
+    Get a schema by name.
+    """
+    console = get_console()
+
+    schema = get_schema(name)
+    if fmt == SingleObjectFormat.JSON and (passthrough or raw):
+        source = _schema_source(str(schema.url))
+        if passthrough or _source_indent(source) == (None if minify else indent):
+            _copy_to_stdout(source)
+            sys.stdout.write("\n")
+            return
+    data = schema.schema_data
+
+    if fmt == SingleObjectFormat.JSON:
+        with _stats.phase("serialize"):
+            if minify:
+                data = json.dumps(data, separators=(",", ":"))
+            else:
+                data = json.dumps(data, indent=indent)
+        if raw:
+            typer.echo(data)
+            return
+        _print_syntax(console, data, "json")
+    elif fmt == SingleObjectFormat.YAML:
+        with _stats.phase("serialize"):
+            data: str = yaml.dump(
+                data, default_flow_style=False, sort_keys=False, indent=indent
+            )
+        if raw:
+            typer.echo(data)
+            return
+        _print_syntax(console, data, "yaml")
+    else:
+        raise ValueError(f"Invalid output format: {fmt}")
+
+
+@app.command(
+    "bundle-schema", help="Get a schema with all of its $refs resolved into one document."
+)
+def bundle_schema_entry(
+    name: Annotated[
+        str,
+        typer.Argument(
+            ..., help="The name of the schema to bundle.", autocompletion=name_completion
+        ),
+    ],
+    fmt: Annotated[
+        SingleObjectFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = SingleObjectFormat.JSON,
+    raw: Annotated[
+        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
+    ] = False,
+    indent: Annotated[
+        int, typer.Option("-i", "--indent", help="Indentation level.")
+    ] = 2,
+    minify: Annotated[
+        bool, typer.Option("-m", "--minify", help="Print compact JSON.")
+    ] = False,
+):
+    """
+    Get a schema with all of its $refs resolved into one document.
+    """
+    console = get_console()
+
+    data = get_schema(name).bundled_data
+    with _stats.phase("serialize"):
+        if fmt == SingleObjectFormat.JSON:
+            lexer = "json"
+            if minify:
+                data = json.dumps(data, separators=(",", ":"))
+            else:
+                data = json.dumps(data, indent=indent)
+        else:
+            lexer = "yaml"
+            data = yaml.dump(data, default_flow_style=False, sort_keys=False, indent=indent)
+    if raw:
+        typer.echo(data)
+        return
+    _print_syntax(console, data, lexer)
+
+
+@app.command("save", help="Save a schema to a file.")
+def save_schema(
+    name: Annotated[
+        str,
+        typer.Argument(
+            ..., help="The name of the schema to save.", autocompletion=name_completion
+        ),
+    ],
+    outfile: Annotated[
+        str | None,
+        typer.Option("-o", "--outfile", help="The output file."),
+    ] = None,
+    indent: Annotated[
+        int, typer.Option("-i", "--indent", help="Indentation level.")
+    ] = 2,
+    minify: Annotated[
+        bool, typer.Option("-m", "--minify", help="Write compact JSON.")
+    ] = False,
+):
+    """
+    Save a schema to a file.
+    """
+    console = get_console()
+
+    schema = get_schema(name)
+    assert isinstance(schema, SchemaRecord)
+
+    if outfile:
+        out: Path = Path(str(outfile))
+    else:
+        out = Path(schema.url_filename)
+
+    schema.to_json(out, indent=indent, minify=minify)
+    console.print(str(out))
+
+
+@app.command("match", help="Find the schemas that apply to files by fileMatch.")
+def match_schemas(
+    paths: Annotated[
+        list[str] | None,
+        typer.Argument(help="Files or directories to walk; '-' reads paths from stdin."),
+    ] = None,
+    fmt: Annotated[
+        OutputFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = OutputFormat.LIST,
+    all_paths: Annotated[
+        bool, typer.Option("-a", "--all", help="Also list paths without a schema.")
+    ] = False,
+):
+    """
+    Find the schemas that apply to files by fileMatch.
+    """
+    console = get_console()
+
+    if not paths:
+        paths = ["."] if sys.stdin.isatty() else ["-"]
+    results = (
+        (path, names)
+        for path, names in match_files(iter_paths(paths))
+        if names or all_paths
+    )
+
+    if fmt == OutputFormat.LIST:
+        for path, names in results:
+            typer.echo(f"{path}\t{', '.join(names)}")
+    elif fmt == OutputFormat.NDJSON:
+        _write_ndjson({"path": path, "schemas": names} for path, names in results)
+    elif fmt == OutputFormat.JSON:
+        _print_syntax(console, json.dumps(dict(results), indent=2), "json")
+    elif fmt == OutputFormat.YAML:
+        data = yaml.dump(dict(results), default_flow_style=False, sort_keys=False)
+        _print_syntax(console, data, "yaml")
+    elif fmt == OutputFormat.TABLE:
+        _print_rows(
+            console, "Matches", ["Path", "Schemas"], ((p, ", ".join(n)) for p, n in results)
+        )
+
+
+@app.command("grep", help="Search property names, titles, descriptions and enums of cached schemas.")
+def grep_schema_contents(
+    query: Annotated[str, typer.Argument(help="The search terms.")],
+    kind: Annotated[
+        str | None,
+        typer.Option(
+            "-k",
+            "--kind",
+            help=f"Only match one kind of entry: {', '.join(CONTENT_KINDS)}.",
+            click_type=click.Choice(CONTENT_KINDS),
+        ),
+    ] = None,
+    limit: Annotated[
+        int | None, typer.Option("-l", "--limit", help="Maximum number of results.")
+    ] = None,
+    fmt: Annotated[
+        OutputFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = OutputFormat.LIST,
+):
+    """
+    Search property names, titles, descriptions and enums of cached schemas.
+    """
+    console = get_console()
+
+    results = grep_schemas(query, kind=kind, limit=limit)
+    if not results:
+        raise typer.Exit(1)
+
+    if fmt == OutputFormat.LIST:
+        _print_lines(
+            console,
+            (f"{m.schema}\t{m.pointer or '/'}\t{m.kind}\t{m.text}" for m in results),
+        )
+    elif fmt == OutputFormat.NDJSON:
+        _write_ndjson(asdict(m) for m in results)
+    elif fmt == OutputFormat.JSON:
+        _print_syntax(console, json.dumps([asdict(m) for m in results], indent=2), "json")
+    elif fmt == OutputFormat.YAML:
+        data = yaml.dump(
+            [asdict(m) for m in results], default_flow_style=False, sort_keys=False
+        )
+        _print_syntax(console, data, "yaml")
+    elif fmt == OutputFormat.TABLE:
+        _print_rows(
+            console,
+            f"Schema contents matching {query!r}",
+            ["Schema", "Pointer", "Kind", "Text"],
+            ((m.schema, m.pointer or "/", m.kind, m.text) for m in results),
+        )
+
+
+@app.command("serve", help="Serve the catalog and cached schemas over HTTP.")
+def serve(
+    host: Annotated[
+        str, typer.Option("-H", "--host", help="The address to listen on.")
+    ] = "127.0.0.1",
+    port: Annotated[int, typer.Option("-p", "--port", help="The TCP port.")] = 7878,
+    unix_socket: Annotated[
+        Path | None, typer.Option("--unix", help="Listen on a unix socket instead.")
+    ] = None,
+    base_url: Annotated[
+        str | None,
+        typer.Option("--base-url", help="The URL written into the served catalog."),
+    ] = None,
+    quiet: Annotated[
+        bool, typer.Option("-q", "--quiet", help="Don't log requests.")
+    ] = False,
+):
+    """
+    Serve the catalog and cached schemas over HTTP.
+    """
+    from schemastore_server import SchemaServer, make_server
+
+    console = get_console()
+
+    server = make_server(host, port, unix_socket, base_url, quiet)
+    schema_server: SchemaServer = server.schema_server  # type: ignore[attr-defined]
+    where = unix_socket or schema_server.base_url
+    console.print(f"Serving {schema_server.base_url}/catalog.json on {where}", highlight=False)
+    try:
+        with suppress(KeyboardInterrupt):
+            server.serve_forever()
+    finally:
+        server.server_close()
+        if unix_socket is not None:
+            unix_socket.unlink(missing_ok=True)
+
+
+@app.command("changes", help="Show what changed in the catalog at its last refresh.")
+def show_changes(
+    refresh: Annotated[
+        bool, typer.Option("-r", "--refresh", help="Refresh the catalog now.")
+    ] = False,
+    prefetch: Annotated[
+        bool,
+        typer.Option("-p", "--prefetch", help="Download the invalidated schemas right away."),
+    ] = False,
+    fmt: Annotated[
+        OutputFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = OutputFormat.TABLE,
+):
+    """
+    Show what changed in the catalog at its last refresh.
+    """
+    console = get_console()
+
+    if get_bundle() is not None:
+        console.print("The catalog is served from a bundle and is never refreshed.")
+        raise typer.Exit(1)
+    if refresh:
+        catalog_file = get_cache_dir() / "catalog.json"
+        if catalog_file.exists():
+            os.utime(catalog_file, (0, 0))
+        _ensure_catalog(prefetch=prefetch, background=False)
+
+    delta = get_changes()
+    if delta is None:
+        console.print("No catalog refresh has been recorded yet.")
+        return
+    rows = [
+        (change, name)
+        for change, names in (
+            ("added", delta.added),
+            ("removed", delta.removed),
+            ("changed", delta.changed),
+        )
+        for name in names
+    ]
+
+    if fmt == OutputFormat.LIST:
+        _print_lines(console, (f"{change}\t{name}" for change, name in rows))
+    elif fmt == OutputFormat.NDJSON:
+        _write_ndjson({"change": change, "name": name} for change, name in rows)
+    elif fmt == OutputFormat.JSON:
+        _print_syntax(console, json.dumps(asdict(delta), indent=2), "json")
+    elif fmt == OutputFormat.YAML:
+        data = yaml.dump(asdict(delta), default_flow_style=False, sort_keys=False)
+        _print_syntax(console, data, "yaml")
+    elif fmt == OutputFormat.TABLE:
+        fetched = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(delta.fetched))
+        _print_rows(console, f"Catalog changes ({fetched})", ["Change", "Name"], rows)
+        if console.is_terminal:
+            console.print(
+                f"{len(delta.invalidated)} cached schemas invalidated, "
+                f"{len(delta.deleted)} deleted."
+            )
+
+
+@app.command("validate", help="Validate JSON, YAML and TOML files against their schemas.")
+def validate(
+    paths: Annotated[
+        list[str],
+        typer.Argument(help="Files or directories to walk; '-' reads paths from stdin."),
+    ],
+    schema: Annotated[
+        str | None,
+        typer.Option(
+            "-s",
+            "--schema",
+            help="Validate against this schema instead of matching by fileMatch.",
+            autocompletion=name_completion,
+        ),
+    ] = None,
+    jobs: Annotated[
+        int | None, typer.Option("-j", "--jobs", help="Worker processes.")
+    ] = None,
+    fmt: Annotated[
+        OutputFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = OutputFormat.LIST,
+    quiet: Annotated[
+        bool, typer.Option("-q", "--quiet", help="Only report invalid files.")
+    ] = False,
+    watch: Annotated[
+        bool,
+        typer.Option(
+            "-w",
+            "--watch",
+            help=(
+                "Keep running and re-validate files as they change "
+                "(list and ndjson formats)."
+            ),
+        ),
+    ] = False,
+    debounce: Annotated[
+        float,
+        typer.Option("--debounce", help="Seconds of quiet before re-validating in watch mode."),
+    ] = 0.2,
 ):
     """
-    List all schemas names.
+    Validate JSON, YAML and TOML files against their schemas.
     """
     console = get_console()
 
-    schemas = get_schemas()
-    if names:
-        schema_names = sorted([s.name for s in schemas])
-        if fmt == OutputFormat.JSON:
-            data = json.dumps(schema_names, indent=2)
-            s = Syntax(data, lexer="json", line_numbers=False)
-            console.print(s)
-        elif fmt == OutputFormat.YAML:
-            data = yaml.dump(schema_names, default_flow_style=False, sort_keys=False)
-            s = Syntax(data, lexer="yaml", line_numbers=False)
-            console.print(s)
-        elif fmt == OutputFormat.LIST:
-            for name in schema_names:
-                console.print(name)
-        elif fmt == OutputFormat.TABLE:
-            table = Table(title="Schema Names")
-            table.add_column("Name")
-            for name in schema_names:
-                table.add_row(name)
-            console.print(table)
+    if watch:
+        if fmt not in (OutputFormat.LIST, OutputFormat.NDJSON):
+            console.print("[red]--watch supports the list and ndjson formats.[/red]")
+            raise typer.Exit(code=2)
+        _validate_watch(paths, schema, jobs, fmt, quiet, debounce)
+        return
+
+    invalid = 0
+
+    def results() -> Iterator[dict]:
+        nonlocal invalid
+        for result in validate_files(iter_paths(paths), schema=schema, jobs=jobs):
+            if result["valid"] is False:
+                invalid += 1
+            elif quiet:
+                continue
+            yield result
+
+    if fmt == OutputFormat.NDJSON:
+        _write_ndjson(results())
+    elif fmt == OutputFormat.JSON:
+        _print_syntax(console, json.dumps(list(results()), indent=2), "json")
+    elif fmt == OutputFormat.YAML:
+        data = yaml.dump(list(results()), default_flow_style=False, sort_keys=False)
+        _print_syntax(console, data, "yaml")
+    elif fmt == OutputFormat.TABLE:
+        _print_rows(
+            console,
+            "Validation",
+            ["Path", "Schema", "Valid", "Errors"],
+            (
+                (
+                    r["path"],
+                    r["schema"],
+                    r["valid"],
+                    "\n".join(f"{e['pointer'] or '/'}: {e['message']}" for e in r["errors"]),
+                )
+                for r in results()
+            ),
+        )
     else:
-        if fmt == OutputFormat.JSON:
-            data = json.dumps([s.to_dict() for s in schemas], indent=2)
-            s = Syntax(data, lexer="json", line_numbers=False)
-            console.print(s)
-        elif fmt == OutputFormat.YAML:
-            data = yaml.dump(
-                [s.to_dict() for s in schemas],
-                default_flow_style=False,
-                sort_keys=False,
-            )
-            s = Syntax(data, lexer="yaml", line_numbers=False)
-            console.print(s)
-        elif fmt == OutputFormat.LIST:
-            for schema in schemas:
-                console.print(schema)
-        elif fmt == OutputFormat.TABLE:
-            table = Table(title="Schemas")
-            table.highlight = True
-            table.add_column("Name")
-            table.add_column("Description")
-            table.add_column("URL")
-            for schema in schemas:
-                table.add_row(schema.name, schema.description, str(schema.url))
-            console.print(table)
+        for r in results():
+            _echo_result(r, fmt)
 
+    if invalid:
+        raise typer.Exit(code=1)
 
-@app.command("search", help="Search for a schema by name.")
-def search_schema(
-    name: Annotated[
-        str,
-        typer.Argument(
-            ...,
-            help="The name of the schema to search for.",
-            autocompletion=name_completion,
-        ),
-    ],
-    fuzzy: Annotated[bool, typer.Option("--fuzzy", help="Fuzzy search.")] = False,
-    fmt: Annotated[
-        OutputFormat, typer.Option("-f", "--format", help="Output format.")
-    ] = OutputFormat.YAML,
-    indent: Annotated[
-        int, typer.Option("-i", "--indent", help="Indentation level.")
+
+def _echo_result(result: dict, fmt: OutputFormat) -> None:
+    if fmt == OutputFormat.NDJSON:
+        sys.stdout.write(json.dumps(result) + "\n")
+        return
+    valid = result["valid"]
+    status = "no schema" if valid is None else "ok" if valid else "invalid"
+    schema = f" ({result['schema']})" if result["schema"] else ""
+    typer.echo(f"{result['path']}: {status}{schema}")
+    for e in result["errors"]:
+        typer.echo(f"  {e['pointer'] or '/'}: {e['message']}")
+
+
+def _validate_watch(
+    paths: list[str],
+    schema: str | None,
+    jobs: int | None,
+    fmt: OutputFormat,
+    quiet: bool,
+    debounce: float,
+) -> None:
+    """
+    Validate everything once, then each batch of changed files as it comes.
+
+    The catalog index, fileMatch index, schemas and validators stay loaded,
+    so a re-validation only costs parsing and checking the changed files.
+    Files without a schema are not reported after the first pass.
+    """
+    for result in validate_files(iter_paths(paths), schema=schema, jobs=jobs):
+        if not quiet or result["valid"] is False:
+            _echo_result(result, fmt)
+    sys.stdout.flush()
+    from schemastore_watch import watch_files
+
+    with suppress(KeyboardInterrupt):
+        for batch in watch_files(paths, debounce=debounce):
+            existing = [path for path in batch if os.path.isfile(path)]
+            for result in validate_files(existing, schema=schema, jobs=1):
+                if result["valid"] is not None:
+                    _echo_result(result, fmt)
+            sys.stdout.flush()
+
+
+@app.command("mirror", help="Fetch all (or matching) schemas into the cache.")
+def mirror(
+    pattern: Annotated[
+        str | None,
+        typer.Argument(help="Only mirror schemas whose name matches this glob."),
+    ] = None,
+    versions: Annotated[
+        bool, typer.Option("-V", "--versions", help="Include versioned schemas.")
+    ] = False,
+    workers: Annotated[
+        int, typer.Option("-j", "--workers", help="Concurrent downloads.")
+    ] = 16,
+    retries: Annotated[
+        int, typer.Option("--retries", help="Retries per schema.")
     ] = 2,
-    raw: Annotated[
-        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
+    force: Annotated[
+        bool, typer.Option("--force", help="Revalidate schemas that are still fresh.")
     ] = False,
-) -> None:
+):
     """
-    Search for a schema by name.
+    Fetch all (or matching) schemas into the cache.
     """
     console = get_console()
 
-    if fuzzy:
-        result = fuzzy_search(name)
-    else:
-        schemas = get_schemas_raw()
-        result = [s for s in schemas if name.lower() in s["name"].lower()]
+    urls = mirror_urls(pattern, include_versions=versions)
+    start = time.perf_counter()
+    with Progress(console=console, transient=True) as progress:
+        task = progress.add_task("Mirroring", total=len(urls))
+        results = mirror_schemas(
+            urls,
+            workers=workers,
+            retries=retries,
+            force=force,
+            callback=lambda _: progress.advance(task),
+        )
+    elapsed = time.perf_counter() - start
 
-    if not result:
-        typer.Exit(code=1)
+    failed = [r for r in results if r.error]
+    downloaded = [r for r in results if r.downloaded]
+    size = sum(r.size for r in downloaded)
+    for r in failed:
+        console.print(f"[red]failed[/red] {r.url}: {r.error}")
 
-    if fmt == OutputFormat.JSON:
-        data = json.dumps(result, indent=indent)
-        if raw:
-            typer.echo(data)
-            return
-        s = Syntax(data, lexer="json", line_numbers=False)
-        console.print(s)
-    elif fmt == OutputFormat.YAML:
-        data = yaml.dump(
-            result, default_flow_style=False, sort_keys=False, indent=indent
-        )
-        if raw:
-            typer.echo(data)
-            return
-        s = Syntax(data, lexer="yaml", line_numbers=False)
-        console.print(s)
-    elif fmt == OutputFormat.LIST:
-        console.print(["\n".join(s["name"] for s in result)])
-    elif fmt == OutputFormat.TABLE:
-        table = Table(title="Schema")
-        table.add_column("Name")
-        table.add_column("Description")
-        table.add_column("URL")
-        for schema in result:
-            table.add_row(schema["name"], schema.get("description", ""), schema["url"])
-        console.print(table)
+    table = Table(title="Mirror", show_header=False)
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_row("Schemas", str(len(results)))
+    table.add_row("Downloaded", str(len(downloaded)))
+    table.add_row("Up to date", str(len(results) - len(downloaded) - len(failed)))
+    table.add_row("Failed", str(len(failed)))
+    table.add_row("Retries", str(sum(r.retries for r in results)))
+    table.add_row("Bytes", f"{size:,}")
+    table.add_row("Time", f"{elapsed:.2f}s")
+    if elapsed:
+        table.add_row("Throughput", f"{len(results) / elapsed:.1f} schemas/s")
+        table.add_row("Bandwidth", f"{size / elapsed / 1e6:.2f} MB/s")
+    console.print(table)
+    if failed:
+        raise typer.Exit(code=1)
 
 
-@app.command("show", help="Show a schemastore entry.")
-def show_entry(
-    name: Annotated[
-        str,
+@app.command("lock", help="Pin schemas to their current content in a lockfile.")
+def lock_command(
+    names: Annotated[
+        list[str] | None,
         typer.Argument(
-            ...,
-            help="The name of the schema to show.",
+            help="Schema names to add, as NAME or NAME@VERSION.",
             autocompletion=name_completion,
-            case_sensitive=False,
-            shell_complete=True,
-            atomic=True,
-            parser=None,
         ),
-    ],
+    ] = None,
+    scan: Annotated[
+        list[str] | None,
+        typer.Option(
+            "-s", "--scan", help="Also add the schemas matching files under this path."
+        ),
+    ] = None,
+    output: Annotated[
+        Path | None,
+        typer.Option("-o", "--output", help="The lockfile to write."),
+    ] = None,
+    workers: Annotated[
+        int, typer.Option("-j", "--workers", help="Concurrent downloads.")
+    ] = 16,
+):
+    """
+    Pin schemas to their current content in a lockfile.
+    """
+    from schemastore_lock import lock_schemas
+
+    console = get_console()
+
+    names = list(names or [])
+    if scan:
+        for _, matched in match_files(iter_paths(scan)):
+            names.extend(matched)
+    try:
+        lockfile = lock_schemas(names, output, workers=workers)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+    for name, entry in sorted(lockfile.schemas.items()):
+        console.print(f"{name}\t{entry['sha256'][:12]}\t{entry['url']}")
+    console.print(
+        f"Locked {len(lockfile.schemas)} schemas and {len(lockfile.refs)} referenced "
+        f"documents in {lockfile.path}."
+    )
+
+
+@app.command("sync", help="Populate the cache with the schemas pinned by the lockfile.")
+def sync_command(
+    workers: Annotated[
+        int, typer.Option("-j", "--workers", help="Concurrent downloads.")
+    ] = 16,
+):
+    """
+    Populate the cache with the schemas pinned by the lockfile.
+    """
+    from schemastore_lock import sync_lockfile
+
+    console = get_console()
+
+    try:
+        result = sync_lockfile(workers=workers)
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+    for r in result.fetched:
+        if r.error:
+            console.print(f"[red]failed[/red] {r.url}: {r.error}")
+    for url in result.mismatched:
+        console.print(f"[red]does not match the lockfile[/red] {url}")
+    console.print(
+        f"{len(result.verified)} up to date, "
+        f"{sum(1 for r in result.fetched if r.downloaded)} fetched, "
+        f"{len(result.mismatched)} not matching."
+    )
+    if result.mismatched:
+        raise typer.Exit(code=1)
+
+
+bundle_app = typer.Typer(
+    name="bundle",
+    help="Pack the cache into a single offline bundle, or unpack one.",
+    no_args_is_help=True,
+)
+app.add_typer(bundle_app)
+
+
+@bundle_app.command("export", help="Pack the cached catalog and schemas into a bundle.")
+def bundle_export(
+    path: Annotated[Path, typer.Argument(help="The bundle to write.")],
+    level: Annotated[
+        int, typer.Option("-l", "--level", min=0, max=9, help="zlib compression level.")
+    ] = 9,
+):
+    """
+    Pack the cached catalog and schemas into a bundle.
+    """
+    from schemastore_bundle import export_bundle
+
+    console = get_console()
+
+    bundle = export_bundle(path, level=level)
+    size = sum(f[2] for f in bundle.files.values())
+    console.print(
+        f"{path}: {len(bundle.files)} files, {size:,} bytes "
+        f"-> {bundle.path.stat().st_size:,} bytes"
+    )
+
+
+@bundle_app.command("import", help="Unpack a bundle into the cache.")
+def bundle_import(
+    path: Annotated[Path, typer.Argument(help="The bundle to read.")],
+):
+    """
+    Unpack a bundle into the cache.
+    """
+    from schemastore_bundle import import_bundle
+
+    console = get_console()
+
+    count = import_bundle(path)
+    console.print(f"{count} files imported into {get_cache_dir()}")
+
+
+cache_app = typer.Typer(
+    name="cache",
+    help="Inspect and trim the schema cache.",
+    no_args_is_help=True,
+)
+app.add_typer(cache_app)
+
+
+def _parse_size(value: str) -> int:
+    """
+    Parse a byte count with an optional K, M or G suffix.
+    """
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    value = value.strip().upper().removesuffix("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+@cache_app.command("stats", help="Show cache sizes, compression, freshness and last use.")
+def cache_stats_command(
     fmt: Annotated[
-        SingleObjectFormat, typer.Option("-f", "--format", help="Output format.")
-    ] = SingleObjectFormat.JSON,
-    raw: Annotated[
-        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
-    ] = False,
-    indent: Annotated[
-        int, typer.Option("-i", "--indent", help="Indentation level.")
-    ] = 2,
+        OutputFormat, typer.Option("-f", "--format", help="Output format.")
+    ] = OutputFormat.TABLE,
 ):
     """
-    Show a schemastore entry.
+    Show cache sizes, compression, freshness and last use.
     """
     console = get_console()
 
-    schema = get_schema(name, raw=True)
-    if fmt == SingleObjectFormat.JSON:
-        data = json.dumps(schema, indent=indent)
-        if raw:
-            typer.echo(data)
-            return
+    stats = cache_stats()
+    if fmt == OutputFormat.JSON:
+        _print_syntax(console, json.dumps(stats, indent=2), "json")
+        return
+    if fmt == OutputFormat.YAML:
+        _print_syntax(console, yaml.dump(stats, sort_keys=False), "yaml")
+        return
+    if fmt == OutputFormat.NDJSON:
+        _write_ndjson([stats])
+        return
 
-        s = Syntax(data, lexer="json", line_numbers=False)
-        console.print(s)
-    elif fmt == SingleObjectFormat.YAML:
-        data = yaml.dump(
-            schema, default_flow_style=False, sort_keys=False, indent=indent
-        )
-        if raw:
-            typer.echo(data)
-            return
-        s = Syntax(data, lexer="yaml", line_numbers=False)
-        console.print(s)
-    elif fmt == OutputFormat.LIST:
-        console.print(schema)
+    ratio = stats["schema_json_bytes"] / stats["schema_bytes"] if stats["schema_bytes"] else 0
+    rows = [
+        ("Directory", stats["cache_dir"]),
+        ("Total", f"{stats['total_bytes']:,} bytes"),
+        ("Evictable", f"{stats['evictable_bytes']:,} / {stats['max_bytes']:,} bytes"),
+        ("Schemas", f"{stats['schemas']} ({stats['compressed']} compressed)"),
+        ("Schema files", f"{stats['schema_bytes']:,} bytes"),
+        ("Schema JSON", f"{stats['schema_json_bytes']:,} bytes ({ratio:.1f}x)"),
+        ("Sidecars", f"{stats['sidecar_bytes']:,} bytes"),
+        ("Catalog", f"{stats['catalog_bytes']:,} bytes"),
+        ("Indexes", f"{stats['index_bytes']:,} bytes"),
+        ("Fresh", f"{stats['fresh']} of {stats['schemas']}"),
+        *((f"Last used {bucket}", str(n)) for bucket, n in stats["last_used"].items()),
+    ]
+    if fmt == OutputFormat.TABLE and console.is_terminal:
+        table = Table(title="Cache", show_header=False)
+        table.add_column("Metric")
+        table.add_column("Value", justify="right")
+        for row in rows:
+            table.add_row(*row)
+        console.print(table)
     else:
-        raise ValueError(f"Invalid output format: {fmt}")
+        _print_rows(console, "Cache", ["Metric", "Value"], rows)
 
 
-@app.command("schema", help="Get a schema by name.")
-def get_schema_entry(
-    name: Annotated[
-        str,
-        typer.Argument(
-            ..., help="The name of the schema to get.", autocompletion=name_completion
+@cache_app.command(
+    "prune", help="Evict least recently used schemas and derived files to fit a size bound."
+)
+def cache_prune_command(
+    max_size: Annotated[
+        str | None,
+        typer.Option(
+            "-s",
+            "--max-size",
+            help="Size bound, e.g. 200M (default: SCHEMASTORE_CACHE_MAX_SIZE or 512M).",
         ),
-    ],
-    fmt: Annotated[
-        SingleObjectFormat, typer.Option("-f", "--format", help="Output format.")
-    ] = SingleObjectFormat.JSON,
-    raw: Annotated[
-        bool, typer.Option("-r", "--raw", help="Show raw schema data.")
+    ] = None,
+    dry_run: Annotated[
+        bool, typer.Option("-n", "--dry-run", help="Only list what would be evicted.")
     ] = False,
-    indent: Annotated[
-        int, typer.Option("-i", "--indent", help="Indentation level.")
-    ] = 2,
 ):
     """
-    Get a schema by name.
+    Evict least recently used schemas and derived files to fit a size bound.
     """
     console = get_console()
 
-    schema = get_schema(name)
-    data = schema.schema_data
+    evicted = prune_cache(_parse_size(max_size) if max_size else None, dry_run=dry_run)
+    _print_lines(console, (path.name for path in evicted))
+    verb = "Would evict" if dry_run else "Evicted"
+    typer.echo(f"{verb} {len(evicted)} files.", err=True)
 
-    if fmt == SingleObjectFormat.JSON:
-        data = json.dumps(data, indent=indent)
-        if raw:
-            typer.echo(data)
-            return
-        s = Syntax(data, lexer="json", line_numbers=False)
-        console.print(s)
-    elif fmt == SingleObjectFormat.YAML:
-        data: str = yaml.dump(
-            data, default_flow_style=False, sort_keys=False, indent=indent
+
+@cache_app.command("migrate", help="Convert cached schemas to the current format.")
+def cache_migrate_command():
+    """
+    Convert cached schemas to the current format.
+    """
+    console = get_console()
+
+    count = migrate_cache()
+    console.print(f"{count} schemas converted.")
+
+
+bench_app = typer.Typer(
+    name="bench",
+    help="Benchmark schemastore internals.",
+    no_args_is_help=True,
+)
+app.add_typer(bench_app)
+
+
+@bench_app.command(
+    "complete",
+    help="Time schema name completion from process start to output.",
+)
+def bench_complete(
+    term: Annotated[str, typer.Argument(help="The text being completed.")] = "ts",
+    runs: Annotated[int, typer.Option("-n", "--runs", help="Runs per variant.")] = 20,
+):
+    """
+    Time schema name completion from process start to output.
+    """
+    import statistics
+    import subprocess
+
+    console = get_console()
+
+    get_index()
+    script = Path(__file__).resolve().with_name("schemastore_complete.py")
+    complete_var = f"_{script.name}_COMPLETE".replace("-", "_").upper()
+    env = {
+        **os.environ,
+        complete_var: "complete_bash",
+        "COMP_WORDS": f"{script.name} schema {term}",
+        "COMP_CWORD": "2",
+    }
+
+    table = Table(title=f"Completing {term!r} ({runs} runs)")
+    table.add_column("Variant")
+    table.add_column("Results", justify="right")
+    table.add_column("Median", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Max", justify="right")
+    for label, extra in (
+        ("fast path", {}),
+        ("full CLI", {"SCHEMASTORE_NO_FAST_COMPLETE": "1"}),
+    ):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, str(script)],
+                env={**env, **extra},
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            times.append((time.perf_counter() - start) * 1000)
+        table.add_row(
+            label,
+            str(len(proc.stdout.splitlines())),
+            f"{statistics.median(times):.1f} ms",
+            f"{min(times):.1f} ms",
+            f"{max(times):.1f} ms",
         )
-        if raw:
-            typer.echo(data)
-            return
-        s = Syntax(data, lexer="yaml", line_numbers=False)
-        console.print(s)
-    else:
-        raise ValueError(f"Invalid output format: {fmt}")
+    console.print(table)
 
 
-@app.command("save", help="Save a schema to a file.")
-def save_schema(
-    name: Annotated[
-        str,
-        typer.Argument(
-            ..., help="The name of the schema to save.", autocompletion=name_completion
-        ),
-    ],
-    outfile: Annotated[
-        Optional[str],
-        typer,
-        Option("-o", "--outfile", help="The output file.", type=click.File("w")),
-    ] = None,
+@bench_app.command(
+    "catalog",
+    help="Time catalog materialization and measure memory per record.",
+)
+def bench_catalog(
+    runs: Annotated[int, typer.Option("-n", "--runs", help="Runs per variant.")] = 5,
 ):
     """
-    Save a schema to a file.
+    Compare `SchemaRecord` with the pydantic `Schema` model for the whole catalog.
     """
+    import gc
+    import statistics
+    import tracemalloc
+
     console = get_console()
 
-    schema = get_schema(name)
-    assert isinstance(schema, Schema)
+    entries = list(iter_schemas_raw())
+    table = Table(title=f"Materializing {len(entries)} catalog entries ({runs} runs)")
+    table.add_column("Variant")
+    table.add_column("Median", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Bytes/record", justify="right")
+    table.add_column("hash() x1000", justify="right")
+    for label, factory in (
+        ("pydantic Schema", Schema.from_dict),
+        ("SchemaRecord", SchemaRecord.from_dict),
+    ):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            records = [factory(entry) for entry in entries]
+            times.append((time.perf_counter() - start) * 1000)
 
-    if outfile:
-        out: Path = Path(str(outfile))
-    else:
-        out = Path(schema.url_filename)
+        del records
+        gc.collect()
+        tracemalloc.start()
+        records = [factory(entry) for entry in entries]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
 
-    schema.to_json(out)
-    console.print(str(out))
+        start = time.perf_counter()
+        for _ in range(1000):
+            hash(records[0])
+        hash_time = (time.perf_counter() - start) * 1000
+        table.add_row(
+            label,
+            f"{statistics.median(times):.1f} ms",
+            f"{min(times):.1f} ms",
+            f"{size // max(len(records), 1)}",
+            f"{hash_time:.2f} ms",
+        )
+    console.print(table)
+
+
+@bench_app.command(
+    "snapshot",
+    help="Compare json.load with the binary snapshot for cached files.",
+)
+def bench_snapshot(
+    runs: Annotated[int, typer.Option("-n", "--runs", help="Runs per variant.")] = 20,
+):
+    """
+    Compare json.load with the binary snapshot for the catalog and large schemas.
+    """
+    import statistics
+
+    console = get_console()
+
+    cache_dir = get_cache_dir()
+    _ensure_catalog()
+    files = [cache_dir / "catalog.json"]
+    schemas_dir = cache_dir / "schemas"
+    if schemas_dir.is_dir():
+        files += sorted(
+            (p for p in schemas_dir.glob("*.json") if p.stat().st_size >= SNAPSHOT_MIN_SIZE),
+            key=lambda p: p.stat().st_size,
+            reverse=True,
+        )[:5]
+
+    table = Table(title=f"Loading cached files ({runs} runs)")
+    table.add_column("File")
+    table.add_column("Size", justify="right")
+    table.add_column("json.load", justify="right")
+    table.add_column("Snapshot", justify="right")
+    table.add_column("Speedup", justify="right")
+    for path in files:
+        _load_cached_json(path)
+        timings = []
+        for load in (_load_json, _load_cached_json):
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                load(path)
+                times.append((time.perf_counter() - start) * 1000)
+            timings.append(statistics.median(times))
+        table.add_row(
+            path.relative_to(cache_dir).as_posix(),
+            f"{path.stat().st_size / 1024:.0f} KiB",
+            f"{timings[0]:.2f} ms",
+            f"{timings[1]:.2f} ms",
+            f"{timings[0] / timings[1]:.1f}x",
+        )
+    console.print(table)
 
 
 if __name__ == "__main__":
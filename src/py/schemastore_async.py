@@ -0,0 +1,459 @@
+"""
+Async counterpart of the schemastore library API.
+
+Uses the same cache directory, cross-process locking and storage format as
+schemastore.py, so sync and async callers share one cache. Only the transport
+is async: every decision of a cached fetch (freshness, conditional requests,
+stale fallbacks, what to store) is made by the helpers schemastore.py's own
+requests transport calls. Downloads go through a pooled `httpx.AsyncClient`,
+one per event loop; without httpx they run the synchronous implementation in
+worker threads. Disk and index work is moved off the event loop.
+
+Every coroutine is safe to run concurrently, e.g. under `asyncio.gather`:
+fetches of the same URL are coalesced, and the batch helpers bound their own
+concurrency.
+"""
+
+import asyncio
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+from schemastore import (
+    CATALOG_POLICY,
+    CATALOG_URL,
+    SCHEMA_POLICY,
+    CachePolicy,
+    CatalogDelta,
+    SchemaRecord,
+    SchemaStoreRecord,
+    _begin_catalog_refresh,
+    _download_failed,
+    _ensure_cache_format,
+    _file_lock,
+    _load_cached_json,
+    _load_schema_url,
+    _not_modified,
+    _parse_download,
+    _plan_request,
+    _PlannedRequest,
+    _prefetch_urls,
+    _record_catalog_delta,
+    _schema_cache_path,
+    _stats,
+    _store_download,
+    _touch_access,
+    _use_cached,
+    get_bundle,
+    get_cache_dir,
+    get_lockfile,
+    prune_cache,
+)
+from schemastore import _fetch_cached as _fetch_cached_sync
+from schemastore import get_schema as _get_schema
+from schemastore import get_schemas as _get_schemas
+from schemastore import search_index as _search_index
+
+T = TypeVar("T")
+
+# Connections kept per event loop, and concurrent fetches per batch helper.
+MAX_CONNECTIONS: int = 16
+
+
+@dataclass
+class _PathLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    users: int = 0
+
+
+@dataclass
+class _LoopState:
+    client: Any = None
+    # Only paths with a task holding or waiting for their lock.
+    locks: dict[Path, _PathLock] = field(default_factory=dict)
+
+
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None:
+        state = _loop_states[loop] = _LoopState()
+    return state
+
+
+def get_client() -> Any:
+    """
+    Get the pooled HTTP client of the running event loop.
+
+    Returns:
+        httpx.AsyncClient | None: The client, or None if httpx isn't installed.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+
+    state = _loop_state()
+    if state.client is None:
+        state.client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS
+            ),
+        )
+    return state.client
+
+
+async def aclose() -> None:
+    """
+    Close the HTTP client of the running event loop.
+    """
+    state = _loop_state()
+    if state.client is not None:
+        client, state.client = state.client, None
+        await client.aclose()
+
+
+@asynccontextmanager
+async def _cache_lock(path: Path) -> AsyncIterator[None]:
+    """
+    Hold the lock `_fetch_cached` takes on a cache file, without blocking the
+    event loop. Tasks on this loop queue on an asyncio lock, so only one of
+    them at a time waits for the file lock in a worker thread.
+    """
+    locks = _loop_state().locks
+    entry = locks.get(path)
+    if entry is None:
+        entry = locks[path] = _PathLock()
+    entry.users += 1
+    try:
+        async with entry.lock:
+            file_lock = _file_lock(path)
+            await asyncio.to_thread(file_lock.__enter__)
+            try:
+                yield
+            finally:
+                file_lock.__exit__(None, None, None)
+    finally:
+        entry.users -= 1
+        if not entry.users:
+            del locks[path]
+
+
+async def download_json(
+    url: str,
+    timeout: float = 10,
+    headers: dict[str, str] | None = None,
+) -> dict:
+    """
+    Download a JSON file from a URL, bypassing the cache.
+
+    Args:
+        url (str): The URL of the JSON file.
+        timeout (float): Request timeout in seconds.
+        headers (dict[str, str] | None): Extra request headers.
+
+    Returns:
+        dict: The JSON data.
+    """
+    client = get_client()
+    if client is None:
+        from schemastore import download_json as download_json_sync
+
+        return await asyncio.to_thread(
+            download_json_sync.__wrapped__, url, timeout=timeout, headers=headers
+        )
+    with _stats.phase("http"):
+        r = await client.get(url, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    _stats.count("bytes_downloaded", len(r.content))
+    return r.json()
+
+
+async def _fetch_cached(
+    url: str,
+    path: Path,
+    policy: CachePolicy,
+    timeout: float = 10,
+    background: bool = False,
+    compress: bool = False,
+) -> bool:
+    """
+    Make sure `path` holds an up to date copy of the JSON document at `url`.
+
+    Same rules as `schemastore._fetch_cached`, made by the same helpers.
+
+    Returns:
+        bool: True if new content was written to `path`.
+    """
+    client = get_client()
+    if client is None:
+        return await asyncio.to_thread(
+            _fetch_cached_sync,
+            url,
+            path,
+            policy,
+            timeout=timeout,
+            background=background,
+            compress=compress,
+        )
+
+    if _use_cached(url, path, policy, background):
+        return False
+    async with _cache_lock(path):
+        request = await asyncio.to_thread(_plan_request, url, path, policy)
+        if request is None:
+            return False
+        return await _download_cached(url, path, policy, request, client, timeout, compress)
+
+
+async def _download_cached(
+    url: str,
+    path: Path,
+    policy: CachePolicy,
+    request: _PlannedRequest,
+    client: Any,
+    timeout: float,
+    compress: bool,
+) -> bool:
+    import httpx
+
+    try:
+        with _stats.phase("http"):
+            r = await client.get(url, headers=request.headers, timeout=timeout)
+        if _not_modified(path, request, r.status_code):
+            return False
+        r.raise_for_status()
+        data = _parse_download(r.content)
+    except (httpx.HTTPError, ValueError) as e:
+        return _download_failed(policy, request, e)
+
+    await asyncio.to_thread(_store_download, url, path, data, r.headers, compress)
+    return True
+
+
+async def ensure_catalog(prefetch: bool | None = None) -> CatalogDelta | None:
+    """
+    Ensure the catalog is downloaded and up to date.
+
+    Same rules as `schemastore._ensure_catalog`, made by the same helpers.
+
+    Args:
+        prefetch (bool | None): Download the invalidated schemas right away;
+            defaults to the SCHEMASTORE_PREFETCH_CHANGED environment variable.
+
+    Returns:
+        CatalogDelta | None: The delta, if the catalog was refreshed.
+    """
+    if get_bundle() is not None:
+        return None
+    catalog_cache_file = get_cache_dir() / "catalog.json"
+
+    refresh, previous = await asyncio.to_thread(
+        _begin_catalog_refresh, catalog_cache_file, True
+    )
+    if not refresh:
+        return None
+    if not await _fetch_cached(CATALOG_URL, catalog_cache_file, CATALOG_POLICY):
+        return None
+    if previous is None:
+        return None
+    delta = await asyncio.to_thread(_record_catalog_delta, previous, catalog_cache_file)
+    urls = _prefetch_urls(delta, prefetch)
+    if urls:
+        await mirror_schemas(urls)
+    return delta
+
+
+async def _with_catalog(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a synchronous catalog or index lookup in a worker thread once the
+    catalog is up to date, so it never waits on the network itself.
+    """
+    await ensure_catalog()
+    return await asyncio.to_thread(func, *args)
+
+
+async def get_catalog() -> dict:
+    """
+    Get the catalog of schemas.
+
+    Returns:
+        dict: The catalog.
+    """
+    bundle = get_bundle()
+    if bundle is not None:
+        return await asyncio.to_thread(bundle.load_json, "catalog.json")
+    return await _with_catalog(_load_cached_json, get_cache_dir() / "catalog.json")
+
+
+async def get_schemas() -> list[SchemaRecord]:
+    """
+    Get all schemas in the catalog.
+
+    Returns:
+        list[SchemaRecord]: The schemas.
+    """
+    return await _with_catalog(_get_schemas)
+
+
+async def get_schema(name: str, raise_error: bool = False) -> SchemaRecord | None:
+    """
+    Get a schema by name.
+
+    Args:
+        name (str): The name of the schema.
+        raise_error (bool): Raise ValueError instead of returning None if
+            there is no such schema.
+
+    Returns:
+        SchemaRecord | None: The schema.
+    """
+    lock = get_lockfile()
+    if lock is not None and lock.find(name) is not None:
+        return await asyncio.to_thread(_get_schema, name, False, raise_error)
+    return await _with_catalog(_get_schema, name, False, raise_error)
+
+
+async def search(query: str, limit: int | None = None) -> list[SchemaStoreRecord]:
+    """
+    Full-text search over schema names, descriptions and fileMatch patterns.
+
+    Args:
+        query (str): The search terms.
+        limit (int | None): Maximum number of results.
+
+    Returns:
+        list[SchemaStoreRecord]: Matching entries, best first.
+    """
+    return await _with_catalog(_search_index, query, limit)
+
+
+async def schema_data(url: str) -> dict:
+    """
+    Get the content of a schema, fetching it into the cache if needed.
+
+    Args:
+        url (str): The schema URL.
+
+    Returns:
+        dict: The schema.
+    """
+    lock = get_lockfile()
+    if get_bundle() is not None or (lock is not None and lock.digest(url) is not None):
+        # Offline, or pinned by the lockfile: checked against local content.
+        return await asyncio.to_thread(_load_schema_url, url)
+    await asyncio.to_thread(_ensure_cache_format)
+    path = _schema_cache_path(url)
+    await _fetch_cached(url, path, SCHEMA_POLICY, background=True, compress=True)
+    _touch_access(path)
+    return await asyncio.to_thread(_load_cached_json, path)
+
+
+async def fetch_schema(name: str) -> dict:
+    """
+    Get the content of a schema by name.
+
+    Args:
+        name (str): The name of the schema.
+
+    Returns:
+        dict: The schema.
+
+    Raises:
+        ValueError: If there is no such schema.
+    """
+    schema = await get_schema(name, raise_error=True)
+    return await schema_data(str(schema.url))
+
+
+async def _bounded(
+    items: Iterable[str],
+    func: Callable[[str], Awaitable[T]],
+    concurrency: int,
+    return_exceptions: bool,
+) -> list[T | BaseException]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: str) -> T:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(
+        *(run(item) for item in items), return_exceptions=return_exceptions
+    )
+
+
+async def fetch_many(
+    names: Iterable[str],
+    concurrency: int = MAX_CONNECTIONS,
+    return_exceptions: bool = False,
+) -> list[dict | BaseException]:
+    """
+    Get the content of many schemas by name, concurrently.
+
+    Args:
+        names (Iterable[str]): The schema names.
+        concurrency (int): Maximum number of schemas fetched at once.
+        return_exceptions (bool): As for `asyncio.gather`: return failures in
+            place of their schema instead of raising the first one.
+
+    Returns:
+        list[dict | BaseException]: The schemas, in the order of `names`.
+    """
+    names = list(names)
+    lock = get_lockfile()
+    if lock is None or any(lock.find(name) is None for name in names):
+        await ensure_catalog()
+    return await _bounded(names, fetch_schema, concurrency, return_exceptions)
+
+
+async def fetch_many_urls(
+    urls: Iterable[str],
+    concurrency: int = MAX_CONNECTIONS,
+    return_exceptions: bool = False,
+) -> list[dict | BaseException]:
+    """
+    Get the content of many schemas by URL, concurrently.
+
+    Args:
+        urls (Iterable[str]): The schema URLs.
+        concurrency (int): Maximum number of schemas fetched at once.
+        return_exceptions (bool): As for `asyncio.gather`.
+
+    Returns:
+        list[dict | BaseException]: The schemas, in the order of `urls`.
+    """
+    return await _bounded(urls, schema_data, concurrency, return_exceptions)
+
+
+async def mirror_schemas(
+    urls: Iterable[str], concurrency: int = MAX_CONNECTIONS
+) -> list[bool | BaseException]:
+    """
+    Fetch many schemas into the cache concurrently, without loading them.
+
+    Args:
+        urls (Iterable[str]): The schema URLs.
+        concurrency (int): Maximum number of downloads at once.
+
+    Returns:
+        list[bool | BaseException]: Whether new content was written, or the
+        error, for each URL in order.
+    """
+    await asyncio.to_thread(_ensure_cache_format)
+
+    async def fetch(url: str) -> bool:
+        return await _fetch_cached(url, _schema_cache_path(url), SCHEMA_POLICY, compress=True)
+
+    results = await _bounded(urls, fetch, concurrency, return_exceptions=True)
+    await asyncio.to_thread(prune_cache)
+    return results
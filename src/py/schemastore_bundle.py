@@ -0,0 +1,161 @@
+"""
+Offline bundles: the catalog and cached schemas in one memory-mapped file.
+
+`export_bundle` packs the cache, `import_bundle` unpacks a bundle into it,
+and `schemastore.use_bundle` (or SCHEMASTORE_BUNDLE) serves lookups straight
+from a `Bundle` without network access.
+"""
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+
+from schemastore import (
+    COMPRESS_LEVEL,
+    _atomic_open,
+    _ensure_catalog,
+    _meta_path,
+    _read_cache_bytes,
+    get_cache_dir,
+)
+
+BUNDLE_MAGIC: bytes = b"SSBUNDL1"
+BUNDLE_VERSION: int = 2
+_BUNDLE_HEADER = struct.Struct("<8sQQ")
+
+
+class Bundle:
+    """
+    A read-only, memory-mapped schemastore bundle.
+
+    A bundle is a single file holding the catalog and cached schemas. Each
+    member is zlib-compressed on its own and located through a JSON table of
+    contents, so any member can be read without touching the others:
+
+        header: magic (8 bytes), TOC offset (u64), TOC length (u64)
+        members: compressed member data
+        TOC: {"version": 2, "files": {name: [offset, length, size, sha256]}}
+
+    Member names are paths relative to the cache directory, e.g.
+    `catalog.json` or `schemas/ruff-<url hash>.json`. Version 1 bundles named
+    schemas by the URL's file name and are not readable.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, toc_offset, toc_length = _BUNDLE_HEADER.unpack_from(self._mmap)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"{self.path} is not a schemastore bundle.")
+        self.toc: dict = json.loads(self._mmap[toc_offset : toc_offset + toc_length])
+        if self.toc.get("version") != BUNDLE_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"{self.path} was written by an older schemastore; export it again."
+            )
+
+    @property
+    def files(self) -> dict[str, list]:
+        return self.toc["files"]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.files
+
+    def digest(self, name: str) -> str:
+        return self.files[name][3]
+
+    def read(self, name: str) -> bytes:
+        """
+        Read one member.
+
+        Args:
+            name (str): The member name.
+
+        Returns:
+            bytes: The uncompressed content.
+        """
+        offset, length, _, _ = self.files[name]
+        return zlib.decompress(memoryview(self._mmap)[offset : offset + length])
+
+    def load_json(self, name: str) -> dict:
+        return json.loads(self.read(name))
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def export_bundle(path: str | Path, level: int = 9) -> Bundle:
+    """
+    Pack the cached catalog and schemas into a bundle.
+
+    Args:
+        path (str | Path): The bundle to write.
+        level (int): zlib compression level.
+
+    Returns:
+        Bundle: The written bundle.
+    """
+    cache_dir = get_cache_dir()
+    _ensure_catalog()
+    members = [cache_dir / "catalog.json"]
+    schemas_dir = cache_dir / "schemas"
+    if schemas_dir.is_dir():
+        members += sorted(
+            p for p in schemas_dir.iterdir() if p.is_file() and p.suffix == ".json"
+        )
+
+    path = Path(path)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    files = {}
+    with open(tmp_file, "wb") as f:
+        f.write(b"\0" * _BUNDLE_HEADER.size)
+        for member in members:
+            data = _read_cache_bytes(member)
+            blob = zlib.compress(data, level)
+            files[member.relative_to(cache_dir).as_posix()] = [
+                f.tell(),
+                len(blob),
+                len(data),
+                hashlib.sha256(data).hexdigest(),
+            ]
+            f.write(blob)
+        toc = json.dumps({"version": BUNDLE_VERSION, "files": files}).encode()
+        toc_offset = f.tell()
+        f.write(toc)
+        f.seek(0)
+        f.write(_BUNDLE_HEADER.pack(BUNDLE_MAGIC, toc_offset, len(toc)))
+    os.replace(tmp_file, path)
+    return Bundle(path)
+
+
+def import_bundle(path: str | Path) -> int:
+    """
+    Unpack a bundle into the cache directory, replacing existing copies.
+
+    Args:
+        path (str | Path): The bundle.
+
+    Returns:
+        int: Number of files written.
+    """
+    cache_dir = get_cache_dir()
+    bundle = Bundle(path)
+    try:
+        for name in bundle.files:
+            target = cache_dir / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            data = bundle.read(name)
+            if name.startswith("schemas/"):
+                data = gzip.compress(data, COMPRESS_LEVEL, mtime=0)
+            with _atomic_open(target, "wb") as f:
+                f.write(data)
+            _meta_path(target).unlink(missing_ok=True)
+        return len(bundle.files)
+    finally:
+        bundle.close()
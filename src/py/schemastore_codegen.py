@@ -0,0 +1,161 @@
+"""
+Ahead-of-time validator code generation for `schemastore validate`.
+
+Schemas are translated into Python by fastjsonschema once; the bytecode is
+kept in the cache so later runs, and every worker process, only load it.
+"""
+
+import functools
+import hashlib
+import marshal
+import os
+import re
+import sys
+from collections.abc import Callable
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+from schemastore import (
+    VALIDATORS_DIRNAME,
+    _atomic_open,
+    _load_source,
+    _schema_source,
+    _source_digest,
+    _stats,
+    _touch_access,
+    get_cache_dir,
+)
+
+# Drafts fastjsonschema implements; schemas declaring any other draft are
+# only validated by jsonschema.
+COMPILED_DRAFTS: tuple[str, ...] = ("draft-04", "draft-06", "draft-07")
+
+
+def _compile_validator(
+    url: str, source: Path | bytes, fastjsonschema: Any
+) -> tuple[dict[str, str], Any]:
+    """
+    Generate validation code for a schema with fastjsonschema.
+
+    Remote `$ref`s are resolved through the schema cache and inlined into the
+    generated code.
+
+    Args:
+        url (str): The schema URL.
+        source (Path | bytes): The schema's content, from `_schema_source`.
+        fastjsonschema (Any): The fastjsonschema module.
+
+    Returns:
+        tuple[dict[str, str], Any]: The digest of every referenced schema by
+        URL, and the code object defining `validate`, or None if the schema
+        can't be compiled.
+    """
+    from fastjsonschema.ref_resolver import RefResolver
+
+    schema = _load_source(source)
+    if not isinstance(schema, dict) or not any(
+        draft in schema.get("$schema", "draft-07") for draft in COMPILED_DRAFTS
+    ):
+        return {}, None
+    if "$id" not in schema and "id" not in schema:
+        schema = {**schema, "$id": url}
+
+    refs: dict[str, str] = {}
+
+    def handler(uri: str) -> dict:
+        uri = uri.partition("#")[0]
+        if uri == url:
+            return _load_source(source)
+        ref_source = _schema_source(uri)
+        refs[uri] = _source_digest(ref_source)
+        return _load_source(ref_source)
+
+    handlers = {"http": handler, "https": handler}
+    try:
+        code = fastjsonschema.compile_to_code(
+            schema, handlers=handlers, use_default=False, detailed_exceptions=False
+        )
+        # The entry point is named after the schema's id.
+        entry = RefResolver.from_schema(schema, handlers=handlers).get_scope_name()
+        code += f"\n\nvalidate = {entry}\n"
+        return refs, compile(code, f"<validator {url}>", "exec")
+    except OSError:
+        raise
+    except Exception:  # noqa: BLE001
+        # Not every schema can be translated (unsupported regex syntax,
+        # unresolvable local refs, ...); jsonschema handles those.
+        return refs, None
+
+
+@functools.cache
+def get_compiled_validator(url: str) -> Callable[[Any], bool] | None:
+    """
+    Get a generated validation function for a schema URL.
+
+    The schema is translated into specialized Python code by `fastjsonschema`
+    once. The code is kept in the cache as marshalled bytecode, keyed by a
+    hash of the schema and the generator version and checked against the
+    hashes of the schemas it references, so later runs only load it.
+
+    The function only tells whether a document is valid; `get_validator` is
+    still used to report errors.
+
+    Args:
+        url (str): The schema URL.
+
+    Returns:
+        Callable[[Any], bool] | None: The validation function, or None if
+        `fastjsonschema` is not installed, SCHEMASTORE_COMPILE_VALIDATORS is
+        0 or the schema can't be compiled.
+    """
+    if os.environ.get("SCHEMASTORE_COMPILE_VALIDATORS", "1") in ("", "0"):
+        return None
+    try:
+        import fastjsonschema
+    except ImportError:
+        return None
+
+    try:
+        source = _schema_source(url)
+        key = hashlib.sha256(f"{_source_digest(source)} {fastjsonschema.VERSION}".encode())
+        path = (
+            get_cache_dir()
+            / VALIDATORS_DIRNAME
+            / f"{key.hexdigest()}.{sys.implementation.cache_tag}.bin"
+        )
+        try:
+            with _stats.phase("validator_load"):
+                refs, code = marshal.loads(path.read_bytes())
+                if any(
+                    _source_digest(_schema_source(ref)) != digest
+                    for ref, digest in refs.items()
+                ):
+                    raise LookupError(path)
+            _stats.count("validator_hit")
+            _touch_access(path)
+        except (OSError, EOFError, ValueError, TypeError, LookupError):
+            with _stats.phase("validator_compile"):
+                refs, code = _compile_validator(url, source, fastjsonschema)
+            with suppress(OSError, ValueError):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with _atomic_open(path, "wb") as f:
+                    marshal.dump((refs, code), f)
+        if code is None:
+            return None
+        namespace: dict[str, Any] = {}
+        exec(code, namespace)
+    except (OSError, re.error):
+        return None
+
+    validate = namespace["validate"]
+    error = fastjsonschema.JsonSchemaValueException
+
+    def is_valid(document: Any) -> bool:
+        try:
+            validate(document)
+        except error:
+            return False
+        return True
+
+    return is_valid
@@ -0,0 +1,200 @@
+#!/home/tim/.local/share/micromamba/envs/py-default-313/bin/python
+
+"""
+Fast entry point for the schemastore CLI.
+
+Shell completion of schema names is answered from the precomputed names index
+without importing schemastore.py and its third-party dependencies; every other
+invocation is handed to the full CLI. Only cheap stdlib modules may be
+imported here.
+"""
+
+import bisect
+import os
+import sys
+
+NAMES_INDEX_FILENAME: str = "names.idx"
+
+# What completes with schemastore.name_completion; keep these in sync with
+# the commands and options that use it.
+# Commands whose first argument is a schema name.
+NAME_COMMANDS: tuple[str, ...] = ("search", "show", "schema", "save", "bundle-schema")
+# Commands whose every argument is a schema name, with the options that take
+# a value (the word after them is that value, not a name).
+NAME_LIST_COMMANDS: dict[str, tuple[str, ...]] = {
+    "lock": ("-s", "--scan", "-o", "--output", "-j", "--workers"),
+}
+# Options whose value is a schema name, by command.
+NAME_OPTIONS: dict[str, tuple[str, ...]] = {"validate": ("-s", "--schema")}
+
+
+def default_cache_dir() -> str | None:
+    """
+    Locate the schemastore cache directory without importing platformdirs.
+
+    Returns:
+        str | None: The cache directory, or None where it can't be derived cheaply.
+    """
+    if os.environ.get("SCHEMASTORE_CACHE_DIR"):
+        return os.environ["SCHEMASTORE_CACHE_DIR"]
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/schemastore")
+    if sys.platform.startswith("linux"):
+        base = os.environ.get("XDG_CACHE_HOME", "").strip() or os.path.expanduser("~/.cache")
+        return os.path.join(base, "schemastore")
+    return None
+
+
+def write_names_index(entries: list[tuple[str, str]], path: str | os.PathLike) -> None:
+    """
+    Write the names index read by `complete_names`.
+
+    Args:
+        entries (list[tuple[str, str]]): (lowercased name, name) pairs, sorted.
+        path (str | os.PathLike): The names index file.
+    """
+    import threading
+
+    # Per thread as well as per process: the async API builds indexes from
+    # worker threads.
+    tmp_file = f"{os.fspath(path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.writelines(f"{key}\t{name}\n" for key, name in entries)
+    os.replace(tmp_file, path)
+
+
+def complete_names(incomplete: str, names_file: str | os.PathLike | None = None) -> list[str]:
+    """
+    Complete schema names from the names index.
+
+    The index holds one `lowercased<TAB>name` line per schema, sorted by the
+    lowercased name, so prefix matches are found by bisection. Names that
+    contain `incomplete` elsewhere follow the prefix matches.
+
+    Args:
+        incomplete (str): The text typed so far.
+        names_file (str | os.PathLike | None): The names index; defaults to the
+            one in the cache directory.
+
+    Returns:
+        list[str]: The matching names.
+    """
+    if names_file is None:
+        cache_dir = default_cache_dir()
+        if cache_dir is None:
+            return []
+        names_file = os.path.join(cache_dir, NAMES_INDEX_FILENAME)
+    with open(names_file, encoding="utf-8") as f:
+        entries = [line.rstrip("\n").split("\t", 1) for line in f]
+    keys = [key for key, _ in entries]
+
+    term = incomplete.lower()
+    lo = bisect.bisect_left(keys, term)
+    hi = bisect.bisect_left(keys, term + "\U0010ffff", lo)
+    names = [name for _, name in entries[lo:hi]]
+    if term:
+        names.extend(name for key, name in entries[:lo] if term in key)
+        names.extend(name for key, name in entries[hi:] if term in key)
+    return names
+
+
+def _split_words(line: str) -> list[str]:
+    if "'" in line or '"' in line or "\\" in line:
+        import shlex
+
+        try:
+            return shlex.split(line)
+        except ValueError:  # noqa: S110
+            # An unterminated quote while the word is still being typed.
+            pass
+    return line.split()
+
+
+def _zsh_escape(s: str) -> str:
+    return (
+        s.replace('"', '""')
+        .replace("'", "''")
+        .replace("$", "\\$")
+        .replace("`", "\\`")
+        .replace(":", r"\\:")
+    )
+
+
+def _completes_name(args: list[str]) -> bool:
+    """
+    Tell whether the word after `args` (the words following the program
+    name) is a schema name.
+    """
+    if not args:
+        return False
+    command, last = args[0], args[-1]
+    if len(args) == 1 and command in NAME_COMMANDS:
+        return True
+    if command in NAME_LIST_COMMANDS:
+        return last not in NAME_LIST_COMMANDS[command]
+    return len(args) > 1 and last in NAME_OPTIONS.get(command, ())
+
+
+def fast_complete() -> int | None:
+    """
+    Answer typer's shell completion protocol for schema name arguments.
+
+    Handles bash, zsh and fish when the word being completed is the first
+    argument of a command in `NAME_COMMANDS`, any argument of a command in
+    `NAME_LIST_COMMANDS` or the value of an option in `NAME_OPTIONS`, in the
+    same output format as the full CLI. Anything else (other options and
+    commands, a missing names index) is left to the full CLI.
+
+    Returns:
+        int | None: The exit code, or None if the request was not handled.
+    """
+    prog_name = os.path.basename(sys.argv[0])
+    instruction = os.environ.get(f"_{prog_name}_COMPLETE".replace("-", "_").upper(), "")
+    if instruction == "complete_bash":
+        words = _split_words(os.environ.get("COMP_WORDS", ""))
+        cword = int(os.environ.get("COMP_CWORD", "0"))
+        args = words[1:cword]
+        incomplete = words[cword] if cword < len(words) else ""
+    elif instruction in ("complete_zsh", "complete_fish"):
+        line = os.environ.get("_TYPER_COMPLETE_ARGS", "")
+        args = _split_words(line)[1:]
+        incomplete = ""
+        if args and not line.endswith(" "):
+            incomplete = args.pop()
+    else:
+        return None
+
+    if not _completes_name(args) or incomplete.startswith("-"):
+        return None
+    try:
+        names = complete_names(incomplete)
+    except OSError:
+        return None
+
+    if instruction == "complete_bash":
+        out = "\n".join(names)
+    elif instruction == "complete_zsh":
+        items = "\n".join(f'"{_zsh_escape(name)}"' for name in names)
+        out = f"_arguments '*: :(({items}))'" if names else "_files"
+    else:
+        action = os.environ.get("_TYPER_COMPLETE_FISH_ACTION", "")
+        if action == "is-args":
+            return 0 if names else 1
+        out = "\n".join(names) if action == "get-args" else ""
+    sys.stdout.write(out + "\n")
+    return 0
+
+
+def main() -> None:
+    if not os.environ.get("SCHEMASTORE_NO_FAST_COMPLETE"):
+        exit_code = fast_complete()
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from schemastore import app
+
+    app()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Schema lockfiles behind `schemastore lock` and `schemastore sync`.
+
+A lockfile pins schemas, and the documents they reference, to the SHA-256
+of their content, so CI resolves the same bytes every run and needs no
+network once the cache holds them. Which lockfile is in use, and how pinned
+content is served, is decided by `schemastore.get_lockfile` and
+`schemastore._schema_source`.
+"""
+
+import json
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from schemastore import (
+    LOCKFILE_NAME,
+    MirrorResult,
+    _atomic_open,
+    _cached_digest,
+    _catalog_record,
+    _ensure_cache_format,
+    _schema_cache_path,
+    _schema_digest,
+    _stale_message,
+    _without_lockfile,
+    find_lockfile,
+    get_bundle,
+    get_lockfile,
+    mirror_schemas,
+)
+from schemastore_refs import _fetch_ref_closure
+
+# 2: hashes of schemas stored at CACHE_INDENT (version 1 hashed them minified).
+LOCKFILE_VERSION: int = 2
+
+
+class Lockfile:
+    """
+    Schemas pinned to the content they had when they were locked.
+
+    The lockfile is JSON:
+
+        {"version": 2,
+         "schemas": {name: {"url": str, "version": str | None, "sha256": str,
+                            "record": catalog entry}},
+         "refs": {url: sha256}}
+
+    `schemas` is keyed by `NAME` or `NAME@VERSION`; the catalog entry is kept
+    so names resolve without the catalog. `refs` pins the documents the
+    schemas reference through `$ref`. Hashes are SHA-256 of the JSON as stored
+    in the cache.
+
+    A lockfile of an older version loads as `stale`: its schema names are
+    kept, so `lock_schemas` can pin them again, but its hashes are dropped.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        schemas: dict | None = None,
+        refs: dict | None = None,
+        stale: bool = False,
+    ):
+        self.path = Path(path)
+        self.schemas: dict[str, dict] = schemas or {}
+        self.refs: dict[str, str] = refs or {}
+        self.stale = stale
+        self._digests: dict[str, str] | None = None
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Lockfile":
+        """
+        Read a lockfile.
+
+        Raises:
+            ValueError: If it is not a lockfile, or of a newer version.
+        """
+        data = json.loads(Path(path).read_text())
+        version = data.get("version")
+        if not isinstance(version, int) or version > LOCKFILE_VERSION:
+            raise ValueError(f"{path}: unsupported lockfile version {version}.")
+        if version < LOCKFILE_VERSION:
+            schemas = {
+                key: {k: v for k, v in entry.items() if k != "sha256"}
+                for key, entry in data["schemas"].items()
+            }
+            return cls(path, schemas, stale=True)
+        return cls(path, data["schemas"], data.get("refs"))
+
+    def save(self) -> None:
+        data = {"version": LOCKFILE_VERSION, "schemas": self.schemas, "refs": self.refs}
+        with _atomic_open(self.path) as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        self._digests = None
+
+    def digests(self) -> dict[str, str]:
+        """
+        Get the pinned hash of every URL in the lockfile.
+        """
+        if self._digests is None:
+            self._digests = {**self.refs}
+            for entry in self.schemas.values():
+                if "sha256" in entry:
+                    self._digests[entry["url"]] = entry["sha256"]
+        return self._digests
+
+    def digest(self, url: str) -> str | None:
+        return self.digests().get(url)
+
+    def find(self, name: str) -> dict | None:
+        name = name.lower()
+        return next(
+            (entry for key, entry in self.schemas.items() if key.lower() == name), None
+        )
+
+
+def lock_schemas(
+    names: Iterable[str], path: str | Path | None = None, workers: int = 16
+) -> Lockfile:
+    """
+    Pin schemas, and the documents they reference, to their current content.
+
+    The given names are added to the lockfile, and every schema in it is
+    resolved again against the catalog and revalidated upstream. A lockfile
+    of an older version keeps its schema names and gets new hashes.
+
+    Args:
+        names (Iterable[str]): Schema names, as `NAME` or `NAME@VERSION`.
+        path (str | Path | None): The lockfile; defaults to the one in use, or
+            `schemastore.lock` in the current directory.
+        workers (int): Number of concurrent downloads.
+
+    Returns:
+        Lockfile: The written lockfile.
+
+    Raises:
+        ValueError: If a schema or version is not in the catalog, or could
+            not be fetched.
+    """
+    path = Path(path) if path else find_lockfile() or Path(LOCKFILE_NAME)
+    previous = Lockfile.load(path) if path.exists() else Lockfile(path)
+    names = list(dict.fromkeys([*previous.schemas, *names]))
+
+    # Resolve against the catalog and upstream, not the current pins.
+    with _without_lockfile():
+        pinned = {}
+        for name in names:
+            base, _, version = name.partition("@")
+            record = _catalog_record(base)
+            if record is None:
+                raise ValueError(f"Schema '{base}' not found.")
+            url = record["url"]
+            if version:
+                url = (record.get("versions") or {}).get(version)
+                if url is None:
+                    raise ValueError(f"Schema '{base}' has no version '{version}'.")
+            key = f"{record['name']}@{version}" if version else record["name"]
+            pinned[key] = {"url": url, "version": version or None, "record": {**record, "url": url}}
+
+        urls = [entry["url"] for entry in pinned.values()]
+        if get_bundle() is not None:
+            digests = {url: _schema_digest(url) for url in urls}
+        else:
+            # Each digest is the one taken right after that URL's own fetch.
+            digests = {}
+            for result in mirror_schemas(urls, workers=workers, force=True):
+                if result.error is not None:
+                    raise ValueError(f"Could not fetch {result.url}: {result.error}")
+                digests[result.url] = result.sha256
+        documents: dict[str, None] = {}
+        for entry in pinned.values():
+            documents.update(dict.fromkeys(_fetch_ref_closure(entry["url"], workers, digests)))
+            entry["sha256"] = digests[entry["url"]]
+        refs = {
+            url: digests[url] if url in digests else _schema_digest(url)
+            for url in documents
+            if url not in urls
+        }
+
+    lock = Lockfile(path, pinned, refs)
+    lock.save()
+    get_lockfile.cache_clear()
+    return lock
+
+
+@dataclass
+class SyncResult:
+    """
+    Outcome of `sync_lockfile`.
+
+    Attributes:
+        verified (list[str]): URLs whose cached copy already had the pinned hash.
+        fetched (list[MirrorResult]): Downloads of the missing or different ones.
+        mismatched (list[str]): URLs still missing or not matching the lock.
+    """
+
+    verified: list[str] = field(default_factory=list)
+    fetched: list[MirrorResult] = field(default_factory=list)
+    mismatched: list[str] = field(default_factory=list)
+
+
+def sync_lockfile(
+    lock: Lockfile | None = None,
+    workers: int = 16,
+    callback: Callable[[MirrorResult], None] | None = None,
+) -> SyncResult:
+    """
+    Populate the cache with the content pinned by a lockfile.
+
+    Cached copies with the pinned hash are kept without a request; the rest
+    are fetched concurrently and checked.
+
+    Args:
+        lock (Lockfile | None): The lockfile; defaults to the one in use.
+        workers (int): Number of concurrent downloads.
+        callback (Callable[[MirrorResult], None] | None): Called as each
+            download finishes.
+
+    Returns:
+        SyncResult: What was verified, fetched and still doesn't match.
+
+    Raises:
+        FileNotFoundError: If there is no lockfile.
+        ValueError: If the lockfile is stale.
+    """
+    if lock is None:
+        path = find_lockfile()
+        if path is None:
+            raise FileNotFoundError(f"No {LOCKFILE_NAME} found.")
+        lock = Lockfile.load(path)
+    if lock.stale:
+        raise ValueError(_stale_message(lock.path))
+    _ensure_cache_format()
+    result = SyncResult()
+    pending = []
+    for url, digest in lock.digests().items():
+        if _cached_digest(_schema_cache_path(url)) == digest:
+            result.verified.append(url)
+        else:
+            pending.append(url)
+    if pending and get_bundle() is None:
+        result.fetched = mirror_schemas(
+            pending, workers=workers, force=True, callback=callback
+        )
+    digests = {fetched.url: fetched.sha256 for fetched in result.fetched}
+    result.mismatched = [url for url in pending if digests.get(url) != lock.digest(url)]
+    return result
@@ -0,0 +1,274 @@
+"""
+`$ref` resolution and bundling behind `schemastore bundle-schema`.
+
+Walks schemas for the documents they reference, fetches those through the
+schema cache, and embeds them into one self-contained schema with every
+`$ref` rewritten to a local JSON pointer.
+"""
+
+import hashlib
+import itertools
+from collections.abc import Iterator
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote, unquote, urldefrag, urljoin, urlsplit
+
+from schemastore import (
+    BUNDLED_DIRNAME,
+    _load_json,
+    _load_schema_url,
+    _pointer_token,
+    _save_json,
+    _schema_digest,
+    _schema_source,
+    _source_digest,
+    _stats,
+    _touch_access,
+    get_bundle,
+    get_cache_dir,
+    mirror_schemas,
+)
+
+# Bump when the bundled output changes for the same inputs.
+BUNDLED_FORMAT: int = 1
+
+# Keywords holding a subschema, a list of subschemas or a mapping of names to
+# subschemas. Other keywords (enum, const, default, examples, unknown ones)
+# hold data and are not searched for refs.
+_SUBSCHEMA_KEYWORDS: frozenset[str] = frozenset(
+    {
+        "additionalItems",
+        "additionalProperties",
+        "contains",
+        "contentSchema",
+        "else",
+        "if",
+        "items",
+        "not",
+        "propertyNames",
+        "then",
+        "unevaluatedItems",
+        "unevaluatedProperties",
+    }
+)
+_SUBSCHEMA_LIST_KEYWORDS: frozenset[str] = frozenset(
+    {"allOf", "anyOf", "items", "oneOf", "prefixItems"}
+)
+_SUBSCHEMA_MAP_KEYWORDS: frozenset[str] = frozenset(
+    {"$defs", "definitions", "dependencies", "dependentSchemas", "patternProperties", "properties"}
+)
+
+
+def _schema_id(node: dict) -> str | None:
+    ident = node.get("$id", node.get("id"))
+    return ident if isinstance(ident, str) else None
+
+
+def _subschemas(node: dict) -> Iterator[tuple[str, dict]]:
+    """
+    Yield the subschemas of a schema object with their JSON pointer suffixes.
+    """
+    for key, value in node.items():
+        token = _pointer_token(key)
+        if key in _SUBSCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            for name, child in value.items():
+                if isinstance(child, dict):
+                    yield f"/{token}/{_pointer_token(name)}", child
+        elif key in _SUBSCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            for i, child in enumerate(value):
+                if isinstance(child, dict):
+                    yield f"/{token}/{i}", child
+        elif key in _SUBSCHEMA_KEYWORDS and isinstance(value, dict):
+            yield f"/{token}", value
+
+
+def _walk_schema(node: dict, base: str, pointer: str = "") -> Iterator[tuple[dict, str, str]]:
+    """
+    Yield every schema object in a document with its base URI (after its own
+    `$id`) and JSON pointer. Children are visited after their parent is
+    yielded, so the parent may be modified in place.
+    """
+    ident = _schema_id(node)
+    if ident and not ident.startswith("#"):
+        base = urljoin(base, ident)
+    yield node, base, pointer
+    for suffix, child in _subschemas(node):
+        yield from _walk_schema(child, base, pointer + suffix)
+
+
+def _fetch_ref_closure(
+    url: str, workers: int = 16, digests: dict[str, str | None] | None = None
+) -> dict[str, Any]:
+    """
+    Load a schema and every document it references, directly or not.
+
+    Each round fetches the newly referenced documents concurrently through
+    the schema cache. Documents are fetched once, so reference cycles end
+    the search instead of looping.
+
+    Args:
+        url (str): The schema URL.
+        workers (int): Number of concurrent downloads.
+        digests (dict[str, str | None] | None): Filled with the SHA-256 of
+            each document fetched, as taken right after its own fetch; URLs
+            already in it are kept.
+
+    Returns:
+        dict[str, Any]: The documents by URL, the schema first.
+    """
+    docs: dict[str, Any] = {}
+    known: set[str] = set()
+    pending = [url]
+    while pending:
+        if get_bundle() is None:
+            for result in mirror_schemas(pending, workers=workers):
+                if digests is not None:
+                    digests.setdefault(result.url, result.sha256)
+        refs = set()
+        for doc_url in pending:
+            docs[doc_url] = doc = _load_schema_url(doc_url)
+            known.add(doc_url)
+            if not isinstance(doc, dict):
+                continue
+            for node, base, _ in _walk_schema(doc, doc_url):
+                if _schema_id(node):
+                    known.add(urldefrag(base)[0])
+                ref = node.get("$ref")
+                if isinstance(ref, str):
+                    refs.add(urldefrag(urljoin(base, ref))[0])
+        pending = sorted(
+            ref for ref in refs - known if urlsplit(ref).scheme in ("http", "https")
+        )
+    return docs
+
+
+def _bundle_documents(url: str, docs: dict[str, Any]) -> Any:
+    """
+    Combine a schema and the documents it references into one schema.
+
+    The other documents are embedded under the schema's `definitions` (or
+    `$defs` from draft 2019-09 on) and every `$ref` is rewritten to a JSON
+    pointer into the result. Nested `$id`s are dropped, since they would
+    change what those pointers resolve against. Refs that can't be resolved
+    are made absolute.
+
+    Args:
+        url (str): The schema URL.
+        docs (dict[str, Any]): The documents by URL, modified in place.
+
+    Returns:
+        Any: The bundled schema.
+    """
+    root = docs[url]
+    if not isinstance(root, dict):
+        return root
+    dialect = str(root.get("$schema", ""))
+    defs_key = "$defs" if "2019-09" in dialect or "2020-12" in dialect else "definitions"
+
+    names = set(root.get(defs_key, {}))
+    embedded: dict[str, str] = {}
+    placements = {url: ""}
+    for doc_url in docs:
+        if doc_url == url:
+            continue
+        stem = Path(urlsplit(doc_url).path).stem or "schema"
+        name = stem
+        for i in itertools.count(2):
+            if name not in names:
+                break
+            name = f"{stem}-{i}"
+        names.add(name)
+        embedded[doc_url] = name
+        placements[doc_url] = f"/{defs_key}/{_pointer_token(name)}"
+
+    # Where each resource and anchor ends up in the result.
+    resources: dict[str, str] = {}
+    anchors: dict[tuple[str, str], str] = {}
+    for doc_url, doc in docs.items():
+        resources.setdefault(doc_url, placements[doc_url])
+        if not isinstance(doc, dict):
+            continue
+        for node, base, pointer in _walk_schema(doc, doc_url):
+            pointer = placements[doc_url] + pointer
+            resource = urldefrag(base)[0]
+            ident = _schema_id(node)
+            if ident and not ident.startswith("#"):
+                resources.setdefault(resource, pointer)
+            if ident and "#" in ident:
+                anchors.setdefault((resource, ident.partition("#")[2]), pointer)
+            if isinstance(node.get("$anchor"), str):
+                anchors.setdefault((resource, node["$anchor"]), pointer)
+
+    def resolve(base: str, ref: str) -> str:
+        target = urljoin(base, ref)
+        resource, fragment = urldefrag(target)
+        fragment = unquote(fragment)
+        if fragment and not fragment.startswith("/"):
+            pointer = anchors.get((resource, fragment))
+        elif resource in resources:
+            pointer = resources[resource] + fragment
+        else:
+            pointer = None
+        if pointer is None:
+            return target
+        return "#" + quote(pointer, safe="/$!&'()*+,;=:@")
+
+    for doc_url, doc in docs.items():
+        if not isinstance(doc, dict):
+            continue
+        for node, base, pointer in _walk_schema(doc, doc_url):
+            if isinstance(node.get("$ref"), str):
+                node["$ref"] = resolve(base, node["$ref"])
+            if pointer or doc_url != url:
+                for key in ("$id", "id"):
+                    if isinstance(node.get(key), str):
+                        del node[key]
+        if doc_url != url:
+            doc.pop("$schema", None)
+
+    if embedded:
+        defs = root.setdefault(defs_key, {})
+        for doc_url, name in embedded.items():
+            defs[name] = docs[doc_url]
+    return root
+
+
+def bundle_schema(url: str, workers: int = 16) -> Any:
+    """
+    Resolve a schema's `$ref`s into a single self-contained schema.
+
+    Referenced documents are fetched concurrently through the schema cache
+    and embedded once each, so recursive refs, within a document or across
+    documents, stay refs. The result is kept in the cache together with the
+    content hashes of its inputs; later calls only read it back, as long as
+    none of the inputs changed.
+
+    Args:
+        url (str): The schema URL.
+        workers (int): Number of concurrent downloads.
+
+    Returns:
+        Any: The bundled schema.
+    """
+    digest = _source_digest(_schema_source(url))
+    key = hashlib.sha256(f"{BUNDLED_FORMAT} {url} {digest}".encode())
+    path = get_cache_dir() / BUNDLED_DIRNAME / f"{key.hexdigest()}.json"
+    with suppress(OSError, ValueError, KeyError, AttributeError):
+        cached = _load_json(path)
+        if all(
+            _source_digest(_schema_source(input)) == input_digest
+            for input, input_digest in cached["inputs"].items()
+            if input != url
+        ):
+            _stats.count("bundled_hit")
+            _touch_access(path)
+            return cached["schema"]
+
+    docs = _fetch_ref_closure(url, workers)
+    inputs = {doc_url: _schema_digest(doc_url) for doc_url in docs}
+    schema = _bundle_documents(url, docs)
+    with suppress(OSError):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _save_json({"inputs": inputs, "schema": schema}, path, compress=True)
+    return schema
@@ -0,0 +1,258 @@
+"""
+Local schema server behind `schemastore serve`.
+
+Serves the catalog, with every schema URL rewritten to point back at the
+server, and the schemas themselves through the schema cache (or the offline
+bundle), with ETags and Cache-Control derived from the cache policies.
+Editors and CI runners pointed at one server share its cache and downloads.
+"""
+
+import hashlib
+import json
+import socketserver
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+import requests
+from schemastore import (
+    CACHE_INDENT,
+    CATALOG_POLICY,
+    SCHEMA_POLICY,
+    _ensure_catalog,
+    _file_fingerprint,
+    _read_cache_bytes,
+    _schema_cache_name,
+    _schema_source,
+    _stats,
+    get_bundle,
+    get_cache_dir,
+    get_catalog,
+)
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; concurrent callers for the same
+    key wait for it and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            _stats.count("coalesced")
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class SchemaServer:
+    """
+    Serves the catalog, with URLs rewritten to `base_url`, and schemas through
+    the cache. Concurrent requests for an uncached schema share one fetch.
+
+    Args:
+        base_url (str): The URL clients reach the server at.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._catalog_key: str | None = None
+        self._catalog_body = b""
+        self._catalog_etag = ""
+        self._urls: dict[str, str] = {}
+
+    def _local_url(self, url: str, urls: dict[str, str]) -> str:
+        # Versions usually share the file name, so route by the cache file name.
+        name = _schema_cache_name(url)
+        urls[name] = url
+        return f"{self.base_url}/schemas/{name}"
+
+    def catalog(self) -> tuple[bytes, str]:
+        """
+        Get the rewritten catalog.
+
+        Returns:
+            tuple[bytes, str]: The body and its ETag.
+        """
+        _ensure_catalog()
+        bundle = get_bundle()
+        if bundle is not None:
+            key = f"bundle:{bundle.digest('catalog.json')}"
+        else:
+            key = _file_fingerprint(get_cache_dir() / "catalog.json")
+        with self._lock:
+            if key != self._catalog_key:
+                catalog = get_catalog()
+                urls: dict[str, str] = {}
+                schemas = [
+                    {
+                        **entry,
+                        "url": self._local_url(entry["url"], urls),
+                        **(
+                            {
+                                "versions": {
+                                    version: self._local_url(url, urls)
+                                    for version, url in entry["versions"].items()
+                                }
+                            }
+                            if entry.get("versions")
+                            else {}
+                        ),
+                    }
+                    for entry in catalog.get("schemas", [])
+                    if isinstance(entry.get("url"), str)
+                ]
+                self._catalog_body = json.dumps(
+                    {**catalog, "schemas": schemas}, indent=CACHE_INDENT
+                ).encode()
+                self._catalog_etag = _etag(self._catalog_body)
+                self._catalog_key = key
+                self._urls = urls
+            return self._catalog_body, self._catalog_etag
+
+    def schema(self, name: str) -> tuple[bytes, str] | None:
+        """
+        Get a schema by its name under /schemas/, as written into the catalog.
+
+        Returns:
+            tuple[bytes, str] | None: The body and its ETag, or None if no
+            catalog URL has that name.
+        """
+        self.catalog()
+        with self._lock:
+            url = self._urls.get(name)
+        if url is None:
+            return None
+        source = self._flight.do(url, lambda: _schema_source(url))
+        body = _read_cache_bytes(source)
+        return body, _etag(body)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, with the weak comparison
+    the header calls for: whole tags, ignoring `W/` prefixes, or `*`.
+    """
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+class _SchemaRequestHandler(BaseHTTPRequestHandler):
+    server_version = "schemastore"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def _respond(self, head: bool) -> None:
+        app: SchemaServer = self.server.schema_server  # type: ignore[attr-defined]
+        path = unquote(urlsplit(self.path).path)
+        try:
+            if path in ("/catalog.json", "/api/json/catalog.json"):
+                result = app.catalog()
+                max_age = CATALOG_POLICY.max_age
+            elif path.startswith("/schemas/"):
+                result = app.schema(path.removeprefix("/schemas/"))
+                max_age = SCHEMA_POLICY.max_age
+            else:
+                result = None
+        except (requests.RequestException, OSError, ValueError) as e:
+            self.send_error(502, explain=str(e))
+            return
+        if result is None:
+            self.send_error(404)
+            return
+
+        body, etag = result
+        not_modified = _etag_matches(self.headers.get("If-None-Match", ""), etag)
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"public, max-age={int(max_age)}")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def address_string(self) -> str:
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        Path(self.server_address).unlink(missing_ok=True)
+        super().server_bind()
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 7878,
+    unix_socket: str | Path | None = None,
+    base_url: str | None = None,
+    quiet: bool = False,
+) -> socketserver.BaseServer:
+    """
+    Create the schema server; call `serve_forever()` on the result.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The TCP port; 0 picks a free one.
+        unix_socket (str | Path | None): Listen on this unix socket instead.
+        base_url (str | None): The URL written into the served catalog;
+            defaults to the listening address (http://localhost for sockets).
+        quiet (bool): Don't log requests to stderr.
+
+    Returns:
+        socketserver.BaseServer: The bound server.
+    """
+    server: socketserver.BaseServer
+    if unix_socket is not None:
+        server = _UnixHTTPServer(str(unix_socket), _SchemaRequestHandler)
+        base_url = base_url or "http://localhost"
+    else:
+        server = ThreadingHTTPServer((host, port), _SchemaRequestHandler)
+        bound_host, bound_port = server.server_address[:2]
+        base_url = base_url or f"http://{bound_host}:{bound_port}"
+    server.schema_server = SchemaServer(base_url)  # type: ignore[attr-defined]
+    server.quiet = quiet  # type: ignore[attr-defined]
+    return server
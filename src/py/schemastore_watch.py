@@ -0,0 +1,196 @@
+"""
+File watching for `schemastore validate --watch`.
+
+Uses inotify(7) through ctypes where it is available, so a save costs one
+event instead of a rescan, and falls back to polling file metadata elsewhere.
+"""
+
+import os
+import select
+import struct
+import time
+from collections.abc import Iterable, Iterator
+
+from schemastore import iter_paths
+
+# inotify(7) constants.
+_IN_CLOSE_WRITE: int = 0x00000008
+_IN_MOVED_FROM: int = 0x00000040
+_IN_MOVED_TO: int = 0x00000080
+_IN_CREATE: int = 0x00000100
+_IN_DELETE: int = 0x00000200
+_IN_Q_OVERFLOW: int = 0x00004000
+_IN_IGNORED: int = 0x00008000
+_IN_ISDIR: int = 0x40000000
+_IN_CLOEXEC: int = 0o2000000
+# wd, mask, cookie, name length; the name follows, NUL-padded.
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class Inotify:
+    """
+    Recursive directory watches over inotify(7), through ctypes.
+
+    Reports files that were written and closed, created, moved or deleted.
+    Directories created under a watched tree are watched as they appear.
+
+    Raises:
+        OSError: If inotify is not available (e.g. not on Linux).
+    """
+
+    MASK: int = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+    def __init__(self, exclude: Iterable[str] = (".git", "node_modules")):
+        import ctypes
+        import ctypes.util
+
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self.fd = self._libc.inotify_init1(_IN_CLOEXEC)
+        except (AttributeError, OSError) as e:
+            raise OSError(f"inotify is not available: {e}") from e
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.exclude = set(exclude)
+        self.roots: list[str] = []
+        self._dirs: dict[int, str] = {}
+
+    def add_dir(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def add_tree(self, path: str) -> None:
+        """
+        Watch a directory and every directory under it.
+        """
+        self.roots.append(path)
+        for root, dirs, _ in os.walk(path):
+            dirs[:] = [d for d in dirs if d not in self.exclude]
+            self.add_dir(root)
+
+    def read(self, timeout: float | None = None) -> list[str] | None:
+        """
+        Wait for events.
+
+        Args:
+            timeout (float | None): Seconds to wait, or None to block.
+
+        Returns:
+            list[str] | None: The changed files, or None if nothing happened
+            before the timeout.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return None
+        data = os.read(self.fd, 64 * 1024)
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost; report everything.
+                changed.extend(iter_paths(self.roots, self.exclude))
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if not mask & _IN_ISDIR:
+                changed.append(path)
+            elif mask & (_IN_CREATE | _IN_MOVED_TO) and name not in self.exclude:
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = [d for d in dirs if d not in self.exclude]
+                    self.add_dir(root)
+                    # Files may have landed before the watch was added.
+                    changed.extend(os.path.join(root, f) for f in files)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _poll_files(paths: list[str], exclude: Iterable[str]) -> dict[str, tuple[int, int]]:
+    state = {}
+    for path in iter_paths(paths, exclude):
+        try:
+            st = os.stat(path)
+        except OSError:  # noqa: S112
+            # Removed since it was listed; the next poll reports it gone.
+            continue
+        state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def watch_files(
+    paths: Iterable[str],
+    debounce: float = 0.2,
+    poll_interval: float = 1.0,
+    exclude: Iterable[str] = (".git", "node_modules"),
+) -> Iterator[list[str]]:
+    """
+    Yield batches of files that changed under `paths`, until interrupted.
+
+    Changes are collected until none arrived for `debounce` seconds, so one
+    save (write, rename, attribute change) produces one batch. Uses inotify
+    where available and falls back to polling file metadata every
+    `poll_interval` seconds elsewhere.
+
+    Args:
+        paths (Iterable[str]): Files and directories to watch.
+        debounce (float): Quiet period, in seconds, that ends a batch.
+        poll_interval (float): Seconds between scans when polling.
+        exclude (Iterable[str]): Directory names not to descend into.
+
+    Yields:
+        list[str]: The changed (or deleted) files, sorted.
+    """
+    paths = list(paths)
+    # Single files are watched through their directory; events for their
+    # siblings are ignored.
+    files = {
+        os.path.join(os.path.dirname(p) or ".", os.path.basename(p)): p
+        for p in paths
+        if not os.path.isdir(p)
+    }
+    roots = [p for p in paths if os.path.isdir(p)]
+
+    def wanted(path: str) -> bool:
+        return path in files or any(
+            path.startswith(os.path.join(root, "")) for root in roots
+        )
+
+    try:
+        watcher = Inotify(exclude)
+    except OSError:
+        watcher = None
+    if watcher is None:
+        state = _poll_files(paths, exclude)
+        while True:
+            time.sleep(poll_interval)
+            current = _poll_files(paths, exclude)
+            changed = [p for p in current.keys() | state.keys() if current.get(p) != state.get(p)]
+            state = current
+            if changed:
+                yield sorted(changed)
+
+    try:
+        for root in roots:
+            watcher.add_tree(root)
+        for directory in {os.path.dirname(p) for p in files}:
+            watcher.add_dir(directory)
+        while True:
+            changed = set(watcher.read())
+            while (more := watcher.read(debounce)) is not None:
+                changed.update(more)
+            batch = sorted(files.get(p, p) for p in changed if wanted(p))
+            if batch:
+                yield batch
+    finally:
+        watcher.close()
@@ -0,0 +1,90 @@
+import functools
+import json
+import os
+import sys
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# The scripts under src/py are plain modules, not an installed package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "py"))
+
+import schemastore
+
+
+def _clear_caches() -> None:
+    schemastore.use_bundle(None)
+    schemastore.use_lockfile(None)
+    for name, module in list(sys.modules.items()):
+        if name.startswith("schemastore"):
+            for value in vars(module).values():
+                if hasattr(value, "cache_clear"):
+                    value.cache_clear()
+    schemastore.get_stats().reset()
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    An empty schemastore cache, with the per-process caches cleared around
+    the test.
+    """
+    path = tmp_path / "cache"
+    monkeypatch.setenv("SCHEMASTORE_CACHE_DIR", str(path))
+    monkeypatch.delenv("SCHEMASTORE_BUNDLE", raising=False)
+    monkeypatch.delenv("SCHEMASTORE_LOCKFILE", raising=False)
+    _clear_caches()
+    yield path
+    _clear_caches()
+
+
+class Upstream:
+    """
+    Files served over HTTP from a local directory, standing in for
+    schemastore.org.
+    """
+
+    def __init__(self, root: Path, base_url: str):
+        self.root = root
+        self.base_url = base_url
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path}"
+
+    def publish(self, path: str, data: Any) -> str:
+        file = self.root / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        previous = file.stat().st_mtime if file.exists() else None
+        file.write_text(json.dumps(data))
+        if previous is not None:
+            # Last-Modified has a resolution of one second; make sure
+            # conditional requests see the change.
+            os.utime(file, (previous + 1, previous + 1))
+        return self.url(path)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def upstream(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Upstream:
+    """
+    A local upstream; its catalog.json is the catalog the module fetches.
+    """
+    root = tmp_path / "upstream"
+    root.mkdir()
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(_QuietHandler, directory=str(root))
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    upstream = Upstream(root, f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(schemastore, "CATALOG_URL", upstream.url("catalog.json"))
+    yield upstream
+    server.shutdown()
+    server.server_close()
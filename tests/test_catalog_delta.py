@@ -0,0 +1,119 @@
+import os
+
+import schemastore
+from schemastore import CatalogDelta, diff_catalogs
+
+
+def _entry(name: str, url: str, **versions: str) -> dict:
+    return {"name": name, "description": name, "fileMatch": [], "url": url, "versions": versions}
+
+
+PREVIOUS = {
+    "schemas": [
+        _entry("Kept", "https://example.com/kept.json"),
+        _entry("Moved", "https://example.com/moved.json"),
+        _entry(
+            "Released",
+            "https://example.com/tool.json",
+            **{"1.0": "https://example.com/v1/tool.json"},
+        ),
+        _entry("Gone", "https://example.com/gone.json"),
+    ]
+}
+CURRENT = {
+    "schemas": [
+        _entry("Kept", "https://example.com/kept.json"),
+        _entry("Moved", "https://example.com/moved-v2.json"),
+        _entry(
+            "Released",
+            "https://example.com/tool.json",
+            **{
+                "1.0": "https://example.com/v1/tool.json",
+                "2.0": "https://example.com/v2/tool.json",
+            },
+        ),
+        _entry("New", "https://example.com/new.json"),
+    ]
+}
+
+
+def test_diff_catalogs_classifies_entries():
+    delta = diff_catalogs(PREVIOUS, CURRENT)
+
+    assert delta.added == ["New"]
+    assert delta.removed == ["Gone"]
+    assert delta.changed == ["Moved", "Released"]
+    assert delta
+
+
+def test_diff_catalogs_invalidates_changed_urls_only():
+    delta = diff_catalogs(PREVIOUS, CURRENT)
+
+    # The main URL of a changed entry and its new URLs; unchanged versions
+    # and unchanged entries keep their cached copies.
+    assert delta.invalidated == [
+        "https://example.com/moved-v2.json",
+        "https://example.com/tool.json",
+        "https://example.com/v2/tool.json",
+    ]
+    assert delta.deleted == ["https://example.com/gone.json", "https://example.com/moved.json"]
+
+
+def test_diff_catalogs_of_identical_catalogs_is_empty():
+    delta = diff_catalogs(PREVIOUS, PREVIOUS)
+
+    assert not delta
+    assert delta.invalidated == []
+    assert delta.deleted == []
+
+
+def _cache(url: str) -> os.stat_result:
+    path = schemastore._schema_cache_path(url)
+    schemastore._save_json({"url": url}, path, compress=True)
+    os.utime(path, ns=(1_000_000_000, 2_000_000_000))
+    return path.stat()
+
+
+def test_apply_delta_marks_cached_copies_stale(cache_dir):
+    cached = "https://example.com/tool.json"
+    before = _cache(cached)
+    delta = CatalogDelta(invalidated=[cached, "https://example.com/v2/tool.json"])
+
+    schemastore._apply_delta(delta)
+
+    after = schemastore._schema_cache_path(cached).stat()
+    assert delta.invalidated == [cached]
+    assert after.st_mtime_ns == 0
+    assert after.st_atime_ns == before.st_atime_ns
+    assert schemastore._cache_age(schemastore._schema_cache_path(cached)) > (
+        schemastore.SCHEMA_POLICY.max_age
+    )
+
+
+def test_apply_delta_deletes_removed_schemas(cache_dir):
+    removed = "https://example.com/gone.json"
+    _cache(removed)
+    path = schemastore._schema_cache_path(removed)
+    schemastore._meta_path(path).write_text("{}")
+    delta = CatalogDelta(deleted=[removed, "https://example.com/moved.json"])
+
+    schemastore._apply_delta(delta)
+
+    assert delta.deleted == [removed]
+    assert not path.exists()
+    assert not schemastore._meta_path(path).exists()
+
+
+def test_catalog_refresh_records_delta(cache_dir, upstream):
+    upstream.publish("catalog.json", PREVIOUS)
+    schemastore._ensure_catalog(background=False)
+    catalog_file = cache_dir / "catalog.json"
+    _cache("https://example.com/moved-v2.json")
+    upstream.publish("catalog.json", CURRENT)
+    os.utime(catalog_file, (0, 0))
+
+    delta = schemastore._ensure_catalog(background=False)
+
+    assert delta is not None
+    assert schemastore.get_changes() == delta
+    assert delta.invalidated == ["https://example.com/moved-v2.json"]
@@ -0,0 +1,109 @@
+import pytest
+from schemastore import FileMatchIndex, _classify_file_match, _glob_to_regex
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "matches"),
+    [
+        ("tsconfig.json", "tsconfig.json", True),
+        ("tsconfig.json", "project/tsconfig.json", True),
+        ("tsconfig.json", "project/mytsconfig.json", False),
+        ("*.json", "a/b.json", True),
+        ("*.json", "a/b.jsonc", False),
+        ("src/*.json", "src/a.json", True),
+        ("src/*.json", "src/a/b.json", False),
+        ("src/**/*.json", "src/a/b.json", True),
+        ("**/.vscode/settings.json", ".vscode/settings.json", True),
+        ("**/.vscode/settings.json", "repo/.vscode/settings.json", True),
+        ("?.txt", "a.txt", True),
+        ("?.txt", "ab.txt", False),
+        ("[ab].txt", "b.txt", True),
+        ("[ab].txt", "c.txt", False),
+        ("[!ab].txt", "c.txt", True),
+        ("[!ab].txt", "a.txt", False),
+        (".eslintrc.{json,yml}", ".eslintrc.yml", True),
+        (".eslintrc.{json,yml}", ".eslintrc.yaml", False),
+        ("a+b.json", "a+b.json", True),
+        ("a+b.json", "aab.json", False),
+    ],
+)
+def test_glob_to_regex(pattern, path, matches):
+    assert bool(_glob_to_regex(pattern).search(path)) is matches
+
+
+@pytest.mark.parametrize(
+    ("pattern", "bucket"),
+    [
+        ("package.json", ("name", "package.json", None)),
+        ("./package.json", ("name", "package.json", None)),
+        (".github/workflows/*.yml", ("suffix", ".yml", "workflows")),
+        ("*.schema.json", ("suffix", ".schema.json", None)),
+        ("**/*.tsconfig.json", ("suffix", ".tsconfig.json", None)),
+        ("*/settings.json", ("name", "settings.json", None)),
+        ("*rc", ("glob", None, None)),
+        ("Dockerfile.*", ("glob", None, None)),
+        (".eslintrc.{json,yml}", ("glob", None, None)),
+    ],
+)
+def test_classify_file_match(pattern, bucket):
+    assert _classify_file_match(pattern) == bucket
+
+
+PATTERNS = [
+    "package.json",
+    "tsconfig.json",
+    "*.tsconfig.json",
+    "tsconfig.*.json",
+    ".github/workflows/*.yml",
+    ".github/workflows/*.yaml",
+    "*.schema.json",
+    "**/.vscode/settings.json",
+    "*rc",
+    ".eslintrc.{json,yml}",
+    "docker-compose.yml",
+    "compose/*.yml",
+]
+PATHS = [
+    "package.json",
+    "app/package.json",
+    "app/tsconfig.json",
+    "app/base.tsconfig.json",
+    "app/tsconfig.build.json",
+    "repo/.github/workflows/ci.yml",
+    "repo/.github/workflows/ci.yaml",
+    "repo/.github/ci.yml",
+    "schemas/a.schema.json",
+    "repo/.vscode/settings.json",
+    "settings.json",
+    ".npmrc",
+    ".eslintrc.json",
+    "compose/app.yml",
+    "deploy/docker-compose.yml",
+    "README.md",
+]
+
+
+def test_file_match_index_agrees_with_every_glob():
+    index = FileMatchIndex(
+        (pattern, schema_id, *_classify_file_match(pattern))
+        for schema_id, pattern in enumerate(PATTERNS)
+    )
+
+    for path in PATHS:
+        expected = [
+            schema_id
+            for schema_id, pattern in enumerate(PATTERNS)
+            if _glob_to_regex(pattern).search(path)
+        ]
+        assert index.match(path) == expected, path
+
+
+def test_file_match_index_uses_buckets():
+    index = FileMatchIndex(
+        (pattern, schema_id, *_classify_file_match(pattern))
+        for schema_id, pattern in enumerate(PATTERNS)
+    )
+
+    assert index.residual == [("tsconfig.*.json", 3), ("*rc", 8), (".eslintrc.{json,yml}", 9)]
+    candidates = {pattern for pattern, _ in index.candidates("app", "tsconfig.json")}
+    assert candidates == {"tsconfig.json", "tsconfig.*.json", "*rc", ".eslintrc.{json,yml}"}
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from pathdedupe import Merge, dedupe_paths, path_key
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    """
+    A directory, a symlink to it and an unrelated directory.
+    """
+    real = tmp_path / "usr" / "bin"
+    real.mkdir(parents=True)
+    link = tmp_path / "bin"
+    link.symlink_to(real)
+    other = tmp_path / "opt"
+    other.mkdir()
+    return str(real), str(link), str(other)
+
+
+def test_lexical_merges_spellings_only(dirs):
+    real, link, other = dirs
+
+    result = dedupe_paths([real, f"{real}/", link, f"{real}//.", other, real])
+
+    assert result.paths == [real, link, other]
+    assert result.merged == [
+        Merge(path=f"{real}/", kept=real, index=1),
+        Merge(path=f"{real}//.", kept=real, index=3),
+        Merge(path=real, kept=real, index=5),
+    ]
+    assert result.duplicates == [real]
+
+
+@pytest.mark.parametrize("level", ["realpath", "inode"])
+def test_symlinks_merge_from_realpath_on(dirs, level):
+    real, link, other = dirs
+
+    result = dedupe_paths([link, other, real], level=level)
+
+    assert result.paths == [link, other]
+    assert result.merged == [Merge(path=real, kept=link, index=2)]
+
+
+def test_inode_falls_back_to_realpath_for_missing_entries(tmp_path):
+    missing = str(tmp_path / "missing")
+
+    assert path_key(missing, "inode") == os.path.realpath(missing)
+    assert dedupe_paths([missing, f"{missing}/"], level="inode").paths == [missing]
+
+
+def test_empty_entry_is_the_current_directory(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    assert dedupe_paths(["", str(tmp_path)]).paths == [""]
+
+
+@pytest.mark.parametrize("level", ["lexical", "realpath", "inode"])
+def test_exclude_is_compared_at_the_same_level(dirs, level):
+    real, link, other = dirs
+
+    result = dedupe_paths([real, other, link], level=level, exclude=[f"{real}/"])
+
+    expected = [other, link] if level == "lexical" else [other]
+    assert result.paths == expected
+    assert result.merged == []
+
+
+def test_invalid_level_is_rejected():
+    with pytest.raises(ValueError, match="Invalid level"):
+        dedupe_paths(["/usr/bin"], level="text")
+    with pytest.raises(ValueError, match="Invalid level"):
+        path_key("/usr/bin", "text")
@@ -0,0 +1,118 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+import schemastore
+from schemastore_lock import LOCKFILE_VERSION, Lockfile, lock_schemas, sync_lockfile
+
+DRAFT_07 = "http://json-schema.org/draft-07/schema#"
+
+
+@pytest.fixture
+def tool(upstream):
+    """
+    A catalog with one schema and an older version of it, sharing its file name.
+    """
+    current = upstream.publish(
+        "schemas/tool.json", {"$schema": DRAFT_07, "title": "tool", "type": "object"}
+    )
+    v1 = upstream.publish(
+        "schemas/v1/tool.json",
+        {"$schema": DRAFT_07, "title": "tool v1", "type": "object", "required": ["v1only"]},
+    )
+    upstream.publish(
+        "catalog.json",
+        {
+            "schemas": [
+                {
+                    "name": "Tool",
+                    "description": "A tool",
+                    "fileMatch": ["tool.json"],
+                    "url": current,
+                    "versions": {"1.0": v1},
+                }
+            ]
+        },
+    )
+    return current, v1
+
+
+def _write_v1_lockfile(path: Path, current: str, v1: str) -> None:
+    # Version 1 hashed the minified JSON; the hashes no longer match anything.
+    entry = {"record": {"name": "Tool", "url": current}, "sha256": "0" * 64}
+    path.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "schemas": {
+                    "Tool": {**entry, "url": current, "version": None},
+                    "Tool@1.0": {**entry, "url": v1, "version": "1.0"},
+                },
+                "refs": {"https://example.com/ref.json": "1" * 64},
+            }
+        )
+    )
+
+
+def _stored_digest(url: str) -> str:
+    path = schemastore._schema_cache_path(url)
+    return hashlib.sha256(schemastore._read_cache_bytes(path)).hexdigest()
+
+
+def test_older_lockfile_loads_stale(tmp_path, tool):
+    path = tmp_path / "schemastore.lock"
+    _write_v1_lockfile(path, *tool)
+
+    lock = Lockfile.load(path)
+
+    assert lock.stale
+    assert set(lock.schemas) == {"Tool", "Tool@1.0"}
+    assert lock.digests() == {}
+
+
+def test_newer_lockfile_is_rejected(tmp_path):
+    path = tmp_path / "schemastore.lock"
+    path.write_text(json.dumps({"version": LOCKFILE_VERSION + 1, "schemas": {}}))
+
+    with pytest.raises(ValueError, match="unsupported lockfile version"):
+        Lockfile.load(path)
+
+
+def test_stale_lockfile_is_ignored_with_a_warning(cache_dir, tmp_path, tool):
+    path = tmp_path / "schemastore.lock"
+    _write_v1_lockfile(path, *tool)
+    schemastore.use_lockfile(path)
+
+    with pytest.warns(UserWarning, match="run 'schemastore lock'"):
+        assert schemastore.get_lockfile() is None
+    with pytest.raises(ValueError, match="older version"):
+        sync_lockfile()
+
+
+def test_lock_pins_older_lockfile_again(cache_dir, tmp_path, tool):
+    current, v1 = tool
+    path = tmp_path / "schemastore.lock"
+    _write_v1_lockfile(path, current, v1)
+
+    lock_schemas([], path)
+
+    data = json.loads(path.read_text())
+    assert data["version"] == LOCKFILE_VERSION
+    assert data["refs"] == {}
+    pins = {name: entry["sha256"] for name, entry in data["schemas"].items()}
+    assert pins == {"Tool": _stored_digest(current), "Tool@1.0": _stored_digest(v1)}
+    assert pins["Tool"] != pins["Tool@1.0"]
+    assert not Lockfile.load(path).stale
+
+
+def test_pinned_schemas_are_served_as_locked(cache_dir, tmp_path, upstream, tool):
+    current, v1 = tool
+    path = tmp_path / "schemastore.lock"
+    lock_schemas(["Tool", "Tool@1.0"], path)
+    upstream.publish("schemas/tool.json", {"$schema": DRAFT_07, "title": "tool v2"})
+    schemastore.use_lockfile(path)
+
+    assert schemastore._load_schema_url(current)["title"] == "tool"
+    assert schemastore._load_schema_url(v1)["title"] == "tool v1"
+    assert sync_lockfile().mismatched == []
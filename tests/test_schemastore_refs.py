@@ -0,0 +1,84 @@
+import schemastore
+from schemastore_refs import _bundle_documents, bundle_schema
+
+DRAFT_07 = "http://json-schema.org/draft-07/schema#"
+DRAFT_2020_12 = "https://json-schema.org/draft/2020-12/schema"
+
+
+def test_bundle_embeds_referenced_documents_under_definitions():
+    url = "https://example.com/root.json"
+    docs = {
+        url: {
+            "$schema": DRAFT_07,
+            "$id": url,
+            "properties": {
+                "item": {"$ref": "item.json#/definitions/name"},
+                "self": {"$ref": "#"},
+            },
+            # Taken already, so the embedded document gets another name.
+            "definitions": {"item": {"type": "null"}},
+        },
+        "https://example.com/item.json": {
+            "$schema": DRAFT_07,
+            "$id": "https://example.com/item.json",
+            "definitions": {"name": {"type": "string"}},
+            "items": {"$ref": "#"},
+        },
+    }
+
+    schema = _bundle_documents(url, docs)
+
+    assert schema["$id"] == url
+    assert schema["properties"]["item"] == {"$ref": "#/definitions/item-2/definitions/name"}
+    assert schema["properties"]["self"] == {"$ref": "#"}
+    embedded = schema["definitions"]["item-2"]
+    assert "$id" not in embedded
+    assert "$schema" not in embedded
+    # A recursive ref within the embedded document stays a ref.
+    assert embedded["items"] == {"$ref": "#/definitions/item-2"}
+
+
+def test_bundle_resolves_anchors_and_nested_ids():
+    url = "https://example.com/root.json"
+    docs = {
+        url: {
+            "$schema": DRAFT_2020_12,
+            "properties": {
+                "a": {"$ref": "other.json#thing"},
+                "b": {"$ref": "https://example.com/nested.json"},
+                "c": {"$ref": "https://example.org/missing.json#/x"},
+            },
+            "$defs": {"nested": {"$id": "nested.json", "type": "integer"}},
+        },
+        "https://example.com/other.json": {
+            "$defs": {"thing": {"$anchor": "thing", "type": "boolean"}},
+        },
+    }
+
+    schema = _bundle_documents(url, docs)
+
+    assert schema["properties"] == {
+        "a": {"$ref": "#/$defs/other/$defs/thing"},
+        "b": {"$ref": "#/$defs/nested"},
+        "c": {"$ref": "https://example.org/missing.json#/x"},
+    }
+    assert schema["$defs"]["nested"] == {"type": "integer"}
+
+
+def test_bundle_schema_follows_cycles_and_caches_result(cache_dir, upstream):
+    root = upstream.url("schemas/a.json")
+    upstream.publish(
+        "schemas/a.json",
+        {"$schema": DRAFT_07, "properties": {"b": {"$ref": "b.json"}}},
+    )
+    upstream.publish(
+        "schemas/b.json",
+        {"$schema": DRAFT_07, "properties": {"a": {"$ref": "a.json"}}},
+    )
+
+    schema = bundle_schema(root)
+
+    assert schema["properties"]["b"] == {"$ref": "#/definitions/b"}
+    assert schema["definitions"]["b"]["properties"]["a"] == {"$ref": "#"}
+    assert bundle_schema(root) == schema
+    assert schemastore.get_stats().counters["bundled_hit"] == 1